@@ -1,7 +1,20 @@
+import asyncio
+import hashlib
 import jwt
-from jwt.exceptions import InvalidSignatureError
+import secrets
+from jwt.exceptions import InvalidTokenError
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from app.settings.config import JWT_KEY, JWT_ALGORITHM, JWT_EXPIRATION_TIME_MINUTES
+from app.settings.config import (
+    ARGON2_MEMORY_COST_KIB,
+    ARGON2_PARALLELISM,
+    ARGON2_TIME_COST,
+    JWT_KEY,
+    JWT_ALGORITHM,
+    JWT_EXPIRATION_TIME_MINUTES,
+    PASSWORD_HASHING_THREADS,
+)
 from graphql import GraphQLError
 from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError
@@ -10,24 +23,46 @@ from app.errors.error_messages import (
     INVALID_PASSWORD,
     EXPIRED_TOKEN,
     INVALID_TOKEN,
+    REVOKED_TOKEN,
     INVALID_AUTHORIZATION_HEADER,
     MISSING_CONTEXT,
     INSUFFICIENT_PRIVILEGES,
 )
 from .roles import Role
-from typing import List, Callable
+from typing import Any, List, Callable
 from functools import wraps
 from strawberry.types import Info
-from app.db.repositories.user_repository import UserRepository
+from .token_versions import token_versions
+
+
+@dataclass(frozen=True)
+class TokenUser:
+    """
+    The user of a request, as described by the claims of their token.
+    """
+
+    id: int
+    email: str
+    role: str
 
 
-def generate_jwt_token(email: str) -> str:
+def generate_jwt_token(
+    user_id: int, email: str, role: str, token_version: int = 0
+) -> str:
+    """
+    The token carries the user's id, email and role, so that requests can be
+    authenticated without reading the user, and the user's token version,
+    so that it can be revoked (see token_versions.py).
+    """
     expiration_time = datetime.now(timezone.utc) + timedelta(
         minutes=JWT_EXPIRATION_TIME_MINUTES
     )
 
     payload = {
+        "sub": str(user_id),
         "email": email,
+        "role": role,
+        "ver": token_version,
         "expiration_time": expiration_time.timestamp(),
     }
 
@@ -35,20 +70,71 @@ def generate_jwt_token(email: str) -> str:
     return token
 
 
+def generate_refresh_token() -> str:
+    """
+    Refresh tokens are random rather than signed, and are looked up by their
+    hash (see hash_refresh_token) when used.
+    """
+    return secrets.token_urlsafe(32)
+
+
+def hash_refresh_token(refresh_token: str) -> str:
+    # The token is random, so a fast hash is enough to make a stolen
+    # refresh_tokens table useless.
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+
+# Shared by all requests. Argon2 releases the GIL, so hashing in threads
+# keeps the event loop free and runs several hashes at once.
+password_hasher = PasswordHasher(
+    time_cost=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST_KIB,
+    parallelism=ARGON2_PARALLELISM,
+)
+hashing_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASHING_THREADS,
+    thread_name_prefix="password-hashing",
+)
+
+
 def hash_password(password: str) -> str:
-    hasher = PasswordHasher()
-    return hasher.hash(password)
+    return password_hasher.hash(password)
 
 
 def verify_password(stored_hash: str, input_password: str) -> bool:
-    hasher = PasswordHasher()
     try:
-        hasher.verify(stored_hash, input_password)
+        password_hasher.verify(stored_hash, input_password)
         return True
     except VerifyMismatchError:
         raise GraphQLError(INVALID_PASSWORD)
 
 
+def password_needs_rehash(stored_hash: str) -> bool:
+    """
+    Whether the hash was made with other parameters than the current ones.
+    """
+    return password_hasher.check_needs_rehash(stored_hash)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    hash_password, run on the hashing threads, so that the event loop keeps
+    serving other requests meanwhile.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(hashing_executor, hash_password, password)
+
+
+async def verify_password_async(stored_hash: str, input_password: str) -> bool:
+    """
+    verify_password, run on the hashing threads.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        hashing_executor, verify_password, stored_hash, input_password
+    )
+
+
 def extract_token_from_request(request: Request) -> str:
     """
     Args:
@@ -66,6 +152,25 @@ def extract_token_from_request(request: Request) -> str:
     return jwt_token
 
 
+def decode_jwt_token(jwt_token: str) -> dict:
+    """
+    Returns:
+        dict: The claims of the token.
+
+    Raises:
+        GraphQLError: If the token is invalid or expired.
+    """
+    try:
+        payload = jwt.decode(jwt_token, JWT_KEY, algorithms=[JWT_ALGORITHM])
+    except InvalidTokenError:
+        raise GraphQLError(INVALID_TOKEN)
+    if datetime.now(timezone.utc) > datetime.fromtimestamp(
+        payload["expiration_time"], tz=timezone.utc
+    ):
+        raise GraphQLError(EXPIRED_TOKEN)
+    return payload
+
+
 def decode_jwt_token_return_email(jwt_token: str) -> str:
     """
     Returns:
@@ -74,14 +179,16 @@ def decode_jwt_token_return_email(jwt_token: str) -> str:
     Raises:
         GraphQLError: If the token is invalid or expired.
     """
+    return decode_jwt_token(jwt_token)["email"]
+
+
+def get_token_user(claims: dict) -> TokenUser:
     try:
-        payload = jwt.decode(jwt_token, JWT_KEY, algorithms=[JWT_ALGORITHM])
-        if datetime.now(timezone.utc) > datetime.fromtimestamp(
-            payload["expiration_time"], tz=timezone.utc
-        ):
-            raise GraphQLError(EXPIRED_TOKEN)
-        return payload["email"]
-    except InvalidSignatureError:
+        return TokenUser(
+            id=int(claims["sub"]), email=claims["email"], role=claims["role"]
+        )
+    except (KeyError, ValueError):
+        # Issued before tokens carried the user's id and role.
         raise GraphQLError(INVALID_TOKEN)
 
 
@@ -91,18 +198,78 @@ def get_user_email_from_request_token(request: Request) -> str:
     return email
 
 
+def get_token_claims(context: Any) -> dict:
+    """
+    Returns the claims of the request's token, verifying it on the first
+    call of the request only. Doesn't check the token's version, see
+    authenticate.
+
+    Raises:
+        GraphQLError: If the token is missing or invalid.
+    """
+    if not context.claims_decoded:
+        try:
+            token = extract_token_from_request(context["request"])
+            context.claims = decode_jwt_token(token)
+        except GraphQLError as e:
+            context.claims_error = e.message
+        context.claims_decoded = True
+
+    if context.claims_error is not None:
+        raise GraphQLError(context.claims_error)
+    return context.claims
+
+
+async def authenticate(context: Any) -> TokenUser:
+    """
+    Returns the user of the request's token, trusting the token's claims
+    once it is checked against the user's current token version, which is
+    usually cached (see token_versions.py). The token is verified on the
+    first call of the request only; later calls, e.g. by require_role on
+    each item of a list, return the cached user.
+
+    Raises:
+        GraphQLError: If the token is missing, invalid or revoked.
+    """
+    if not context.authenticated:
+        # Concurrent resolvers wait for the first one's check.
+        async with context.auth_lock:
+            if not context.authenticated:
+                try:
+                    claims = get_token_claims(context)
+                    user = get_token_user(claims)
+                    # Read from the primary: queries' db_session may be a
+                    # replica, which lags behind revocations.
+                    version = await token_versions.get_version(
+                        context.sessionmaker, user.id
+                    )
+                    if claims.get("ver") != version:
+                        raise GraphQLError(REVOKED_TOKEN)
+                    context.user = user
+                except GraphQLError as e:
+                    context.auth_error = e.message
+                context.authenticated = True
+
+    if context.auth_error is not None:
+        raise GraphQLError(context.auth_error)
+    return context.user
+
+
 # Decorator which I hope will work for queries/mutations.
+# The decorated resolver must be async.
+# The user is authenticated once per request (see authenticate), so that
+# checking the role of each item of a list is an in-memory check.
 def require_role(allowed_roles: List[Role]):
     def decorator(wrapped_func: Callable):
         @wraps(wrapped_func)
-        def wrapper(*args, **kwargs):
+        async def wrapper(*args, **kwargs):
             # Check if info was passed as a kw arg.
             info: Info = kwargs.get("info")
 
             if not info:
                 # Check if info was passed as a normal arg.
                 for arg in args:
-                    if isinstance(arg, info):
+                    if isinstance(arg, Info):
                         info = arg
                         break
 
@@ -110,27 +277,19 @@ def require_role(allowed_roles: List[Role]):
             if not info:
                 raise GraphQLError(MISSING_CONTEXT)
 
-            # Try to retrieve the user.
-            user = None
             try:
-                request = info.context["request"]
-                email = get_user_email_from_request_token(request)
-
-                db_session = info.context["db_session"]
-                user = UserRepository.get_user_by_email(db_session, email)
+                user = await authenticate(info.context)
             except GraphQLError as e:
                 # If we were not able to retrieve a user but unauth is in
                 # allowed_roles, allow call.
                 if Role.UNAUTHENTICATED in allowed_roles:
-                    info.context["user"] = user
-                    return wrapped_func(*args, **kwargs)
+                    return await wrapped_func(*args, **kwargs)
                 else:
                     raise e
 
-            info.context["user"] = user
             if user and user.role in allowed_roles:
                 # We retrieved a user and his role is in allowed_roles.
-                return wrapped_func(*args, **kwargs)
+                return await wrapped_func(*args, **kwargs)
 
             # In all other cases, raise an error.
             raise GraphQLError(INSUFFICIENT_PRIVILEGES)
@@ -0,0 +1,69 @@
+import asyncio
+import time
+from typing import Dict, Optional
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.db.repositories.user_repository import UserRepository
+from app.settings.config import TOKEN_VERSIONS_REFRESH_SECONDS
+
+
+class TokenVersionCache:
+    """
+    Current token versions of the users whose tokens have been revoked, so
+    that a token can be checked against its user's version without reading
+    the user. Users who aren't in the cache have version 0.
+    Kept in process memory and reloaded from the database at most every
+    refresh_seconds: revocations made by this worker apply at once, the
+    others within refresh_seconds.
+    The versions are read from the primary, given as a sessionmaker, since a
+    replica may not have the latest revocations yet.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._versions: Dict[int, int] = dict()
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def is_stale(self) -> bool:
+        return (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at >= self.refresh_seconds
+        )
+
+    async def get_version(self, sessionmaker: async_sessionmaker, user_id: int) -> int:
+        if self.is_stale():
+            await self.refresh(sessionmaker)
+        return self._versions.get(user_id, 0)
+
+    async def refresh(self, sessionmaker: async_sessionmaker):
+        if self._loaded_at is not None and self._lock.locked():
+            # Concurrent requests keep using the current versions meanwhile,
+            # instead of waiting for the reload.
+            return
+
+        async with self._lock:
+            # Requests waiting for the first load find it done.
+            if not self.is_stale():
+                return
+
+            loaded_at = time.monotonic()
+            async with sessionmaker() as db_session:
+                versions = await UserRepository.get_revoked_token_versions(db_session)
+
+            # Versions only increase, so revocations recorded during the
+            # reload are kept.
+            for user_id, version in self._versions.items():
+                versions[user_id] = max(version, versions.get(user_id, 0))
+            self._versions = versions
+            self._loaded_at = loaded_at
+
+    def record_version(self, user_id: int, version: int):
+        if version > self._versions.get(user_id, 0):
+            self._versions[user_id] = version
+
+    def clear(self):
+        self._versions = dict()
+        self._loaded_at = None
+
+
+token_versions = TokenVersionCache(refresh_seconds=TOKEN_VERSIONS_REFRESH_SECONDS)
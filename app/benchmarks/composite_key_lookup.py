@@ -0,0 +1,149 @@
+"""
+Compares the SQL Postgres gets for a batch of (job_id, user_id) lookups, as
+issued by UserApplicationsFromJobLoader:
+- or_of_ands: (job_id = a AND user_id = b) OR ... (the previous approach);
+- tuple_in: (job_id, user_id) IN ((a, b), ...);
+- unnest: (job_id, user_id) IN (SELECT * FROM unnest(:job_ids, :user_ids)),
+  the statement used by Base.get_where_tuple_in.
+Reports planning and execution times from EXPLAIN ANALYZE, and how many
+distinct SQL strings each approach sent to Postgres (one per batch size,
+unless the statement is stable).
+
+Runs against the database configured in settings. The benchmark tables and
+rows are created in a transaction which is rolled back at the end.
+Usage: python -m app.benchmarks.composite_key_lookup
+"""
+
+import json
+import random
+from sqlalchemy import and_, create_engine, insert, or_, select, tuple_
+from sqlalchemy.engine import Connection
+from app.db.models import (
+    Base,
+    Employer as Employer_sql,
+    Job as Job_sql,
+    User as User_sql,
+    Application as Application_sql,
+)
+from app.db.statements import select_where_tuple_in
+from app.settings.config import DATABASE_URL
+
+NUM_JOBS = 200
+NUM_USERS = 500
+NUM_APPLICATIONS = 50_000
+# The 10k keys OR of ANDs takes tens of seconds to plan.
+BATCH_SIZES = [1, 10, 100, 1_000, 10_000]
+
+
+def seed(connection: Connection) -> list:
+    employer_id = connection.execute(
+        insert(Employer_sql).returning(Employer_sql.id),
+        [{"name": "Bench", "contact_email": "bench@example.com", "industry": "X"}],
+    ).scalar_one()
+    job_ids = (
+        connection.execute(
+            insert(Job_sql).returning(Job_sql.id),
+            [
+                {"title": f"Job {i}", "description": "", "employer_id": employer_id}
+                for i in range(NUM_JOBS)
+            ],
+        )
+        .scalars()
+        .all()
+    )
+    user_ids = (
+        connection.execute(
+            insert(User_sql).returning(User_sql.id),
+            [
+                {
+                    "username": f"user{i}",
+                    "email": f"bench-user-{i}@example.com",
+                    "password_hash": "",
+                    "role": "user",
+                }
+                for i in range(NUM_USERS)
+            ],
+        )
+        .scalars()
+        .all()
+    )
+
+    all_keys = [(job_id, user_id) for job_id in job_ids for user_id in user_ids]
+    keys = random.sample(all_keys, NUM_APPLICATIONS)
+    connection.execute(
+        insert(Application_sql),
+        [{"job_id": job_id, "user_id": user_id} for job_id, user_id in keys],
+    )
+    connection.exec_driver_sql("ANALYZE")
+    return all_keys
+
+
+def build_statements(keys: list) -> dict:
+    job_ids, user_ids = zip(*keys)
+    return {
+        "or_of_ands": select(Application_sql).where(
+            or_(
+                *[
+                    and_(
+                        Application_sql.job_id == job_id,
+                        Application_sql.user_id == user_id,
+                    )
+                    for job_id, user_id in keys
+                ]
+            )
+        ),
+        "tuple_in": select(Application_sql).where(
+            tuple_(Application_sql.job_id, Application_sql.user_id).in_(keys)
+        ),
+        "unnest": select_where_tuple_in(Application_sql, "job_id", "user_id").params(
+            job_id_values=list(job_ids),
+            user_id_values=list(user_ids),
+        ),
+    }
+
+
+def explain(connection: Connection, statement) -> tuple:
+    compiled = statement.compile(
+        dialect=connection.dialect,
+        compile_kwargs={"render_postcompile": True},
+    )
+    plan = connection.exec_driver_sql(
+        f"EXPLAIN (ANALYZE, FORMAT JSON) {compiled.string}",
+        compiled.params,
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Planning Time"], plan[0]["Execution Time"], compiled.string
+
+
+def main():
+    engine = create_engine(DATABASE_URL)
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            Base.metadata.create_all(connection)
+            all_keys = seed(connection)
+
+            distinct_sql = {}
+            print(
+                f"{'keys':>8} {'method':>12} {'planning ms':>12} {'execution ms':>13}"
+            )
+            for batch_size in BATCH_SIZES:
+                keys = random.sample(all_keys, batch_size)
+                for method, statement in build_statements(keys).items():
+                    planning, execution, sql = explain(connection, statement)
+                    distinct_sql.setdefault(method, set()).add(sql)
+                    print(
+                        f"{batch_size:>8} {method:>12} "
+                        f"{planning:>12.2f} {execution:>13.2f}"
+                    )
+
+            for method, sqls in distinct_sql.items():
+                print(f"{method}: {len(sqls)} distinct SQL statement(s)")
+        finally:
+            transaction.rollback()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Compares the two ways list queries can build their Strawberry objects:
+- orm: ORM select into Employer/Job instances (identity map, state
+  tracking), then employer_to_gql/job_to_gql;
+- core: Core select of plain rows, built straight into
+  Employer_gql/Job_gql (the repositories' gql=True read mode).
+Reports the best wall time out of REPEATS runs, for lists of NUM_ROWS
+employers and jobs (plus any rows already in the database).
+
+Runs against the database configured in settings. The benchmark rows are
+created in a transaction which is rolled back at the end.
+Usage: python -m app.benchmarks.core_read_path
+"""
+
+import asyncio
+import time
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.db.models import Base, Employer as Employer_sql, Job as Job_sql
+from app.db.repositories.employer_repository import EmployerRepository
+from app.db.repositories.job_repository import JobRepository
+from app.sql_to_gql import employer_to_gql, job_to_gql
+from app.settings.config import DATABASE_URL
+
+NUM_ROWS = 100_000
+REPEATS = 5
+
+
+async def seed(session: AsyncSession):
+    employer_ids = (
+        await session.scalars(
+            insert(Employer_sql).returning(Employer_sql.id),
+            [
+                {
+                    "name": f"Employer {i}",
+                    "contact_email": f"bench-employer-{i}@example.com",
+                    "industry": "Benchmarking",
+                }
+                for i in range(NUM_ROWS)
+            ],
+        )
+    ).all()
+    await session.execute(
+        insert(Job_sql),
+        [
+            {
+                "title": f"Job {i}",
+                "description": "Benchmarks read paths. " * 20,
+                "employer_id": employer_ids[i],
+            }
+            for i in range(NUM_ROWS)
+        ],
+    )
+
+
+async def read_employers_orm(session: AsyncSession) -> list:
+    employers = await EmployerRepository.get_all_employers(session, gql=False)
+    return [employer_to_gql(employer) for employer in employers]
+
+
+async def read_employers_core(session: AsyncSession) -> list:
+    return await EmployerRepository.get_all_employers(session, gql=True)
+
+
+async def read_jobs_orm(session: AsyncSession) -> list:
+    jobs = await JobRepository.get_all_jobs(session, gql=False)
+    return [job_to_gql(job) for job in jobs]
+
+
+async def read_jobs_core(session: AsyncSession) -> list:
+    return await JobRepository.get_all_jobs(session, gql=True)
+
+
+async def time_read(session: AsyncSession, read) -> tuple:
+    best = float("inf")
+    for _ in range(REPEATS):
+        # Objects left in the identity map from a previous run would not be
+        # hydrated again.
+        session.expunge_all()
+        start = time.perf_counter()
+        objects = await read(session)
+        best = min(best, time.perf_counter() - start)
+    return len(objects), best
+
+
+async def main():
+    engine = create_async_engine(DATABASE_URL)
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        try:
+            await connection.run_sync(Base.metadata.create_all)
+            session = AsyncSession(bind=connection, expire_on_commit=False)
+            await seed(session)
+
+            reads = {
+                ("employers", "orm"): read_employers_orm,
+                ("employers", "core"): read_employers_core,
+                ("jobs", "orm"): read_jobs_orm,
+                ("jobs", "core"): read_jobs_core,
+            }
+            print(f"{'list':>10} {'path':>6} {'rows':>8} {'best ms':>9}")
+            for (name, path), read in reads.items():
+                num_rows, best = await time_read(session, read)
+                print(f"{name:>10} {path:>6} {num_rows:>8} {best * 1000:>9.1f}")
+
+            await session.close()
+        finally:
+            await transaction.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,27 +1,137 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session
-from app.db.models import Base
-from app.settings.config import DATABASE_URL
-from app.tests.utils import load_test_tables
+import asyncio
+from typing import List
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from app.db.pool import InstrumentedAsyncQueuePool
+from app.db.statements import compiled_cache_stats
+from app.db.migrations import MIGRATIONS, get_pending_versions, run_migrations
+from app.settings.config import (
+    DATABASE_URL,
+    REPLICA_DATABASE_URL,
+    DB_ECHO,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_TIMEOUT,
+)
 
-# Create engine.
-engine = create_engine(DATABASE_URL, echo=True)
 
+class SerializedAsyncSession(AsyncSession):
+    """
+    AsyncSession which can be shared by all the resolvers and DataLoaders
+    of a request.
+    Strawberry resolves sibling fields concurrently, but a session can only
+    run one operation at a time on its connection, so operations are queued
+    behind a lock.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = asyncio.Lock()
+
+    async def execute(self, *args, **kwargs):
+        async with self._lock:
+            return await super().execute(*args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        async with self._lock:
+            return await super().scalar(*args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        async with self._lock:
+            return await super().get(*args, **kwargs)
+
+    async def refresh(self, *args, **kwargs):
+        async with self._lock:
+            return await super().refresh(*args, **kwargs)
+
+    async def delete(self, *args, **kwargs):
+        async with self._lock:
+            return await super().delete(*args, **kwargs)
+
+    async def flush(self, *args, **kwargs):
+        async with self._lock:
+            return await super().flush(*args, **kwargs)
+
+    async def commit(self):
+        async with self._lock:
+            return await super().commit()
+
+    async def rollback(self):
+        async with self._lock:
+            return await super().rollback()
+
+
+def create_pooled_engine(url: str) -> AsyncEngine:
+    # postgresql+psycopg resolves to psycopg's async driver for async engines.
+    engine = create_async_engine(
+        url,
+        echo=DB_ECHO,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    compiled_cache_stats.listen(engine.sync_engine)
+    return engine
 
-def get_session():
-    with Session(engine) as session:
+
+# Create engines.
+# Without a configured replica, reads go to the primary.
+engine = create_pooled_engine(DATABASE_URL)
+replica_engine = (
+    create_pooled_engine(REPLICA_DATABASE_URL) if REPLICA_DATABASE_URL else engine
+)
+
+# Objects are not expired on commit, since attribute access after a commit
+# would otherwise need to lazily reload them (implicit IO is not allowed
+# with asyncio).
+SessionLocal = async_sessionmaker(
+    engine,
+    class_=SerializedAsyncSession,
+    expire_on_commit=False,
+)
+ReplicaSessionLocal = async_sessionmaker(
+    replica_engine,
+    class_=SerializedAsyncSession,
+    expire_on_commit=False,
+)
+
+
+def get_sessionmaker() -> async_sessionmaker:
+    return SessionLocal
+
+
+def get_replica_sessionmaker() -> async_sessionmaker:
+    return ReplicaSessionLocal
+
+
+async def get_session():
+    async with SessionLocal() as session:
+        yield session
+
+
+async def get_replica_session():
+    async with ReplicaSessionLocal() as session:
         yield session
 
 
-# Drop tables on rerun.
-def prepare_database():
+async def prepare_database(engine: AsyncEngine = engine) -> List[int]:
     """
     Runs on application start.
-    Drops previous tables and loads in dummy data.
+    Applies the pending migrations, if any, without touching existing data.
+    An up to date schema is detected with one read-only check, so restarts
+    and extra workers run no DDL. Sample data is only loaded by the seed
+    command (python -m app.db.seed).
+    Returns the versions of the applied migrations.
     """
-    Base.metadata.drop_all(engine)
-    Base.metadata.create_all(engine)
-
-    with Session(engine) as session:
-        load_test_tables(session)
-        session.commit()
+    if not await get_pending_versions(engine, MIGRATIONS):
+        return []
+    return await run_migrations(engine, MIGRATIONS)
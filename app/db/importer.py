@@ -0,0 +1,275 @@
+"""
+Bulk imports employers, jobs, users or applications from a CSV (with a
+header row) or JSONL file, with Postgres COPY FROM STDIN.
+Usage: python -m app.db.importer TABLE FILE [--format csv|jsonl]
+       [--batch-size N]
+
+All rows have the same fields: the table's columns, except that foreign
+keys can be given by natural key instead of id (see REFERENCES), e.g. a
+job row can have an employer_email instead of an employer_id. Users can
+have a plaintext password instead of a password_hash, which is hashed on
+import (slowly, so prefer importing hashes when loading many users).
+If rows have ids, the table's id sequence is moved past the largest one.
+
+Rows are read lazily and imported batch_size rows at a time: the natural
+keys of a batch are resolved with one query, then the batch is sent by
+one COPY. The whole import runs in one transaction, so a failed import
+leaves the database unchanged.
+"""
+
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+from psycopg import Error as DriverError
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.auth.auth_utils import hash_password_async
+from app.db.database import engine
+from app.db.models import (
+    Application as Application_sql,
+    Base,
+    Employer as Employer_sql,
+    Job as Job_sql,
+    User as User_sql,
+)
+from app.db.statements import select_ids_by_key
+from app.settings.config import IMPORT_BATCH_SIZE
+
+FORMATS = ("csv", "jsonl")
+
+
+class InvalidImportError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Reference:
+    """
+    Foreign key column given as the natural key field of the referenced
+    object, e.g. employer_id given as employer_email (Employer.contact_email).
+    """
+
+    column: str
+    field: str
+    model: type
+    attr_name: str
+
+
+MODELS = {
+    "employers": Employer_sql,
+    "jobs": Job_sql,
+    "users": User_sql,
+    "applications": Application_sql,
+}
+
+REFERENCES: Dict[str, Tuple[Reference, ...]] = {
+    "employers": (),
+    "jobs": (
+        Reference("employer_id", "employer_email", Employer_sql, "contact_email"),
+    ),
+    "users": (),
+    "applications": (Reference("user_id", "user_email", User_sql, "email"),),
+}
+
+
+def read_rows(path: Path, format: str) -> Iterator[dict]:
+    with open(path, newline="") as file:
+        if format == "csv":
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def get_format(path: Path) -> str:
+    format = path.suffix.removeprefix(".").lower()
+    if format not in FORMATS:
+        raise InvalidImportError(f"Unknown format of {path}, use --format.")
+    return format
+
+
+def batched(rows: Iterable[dict], batch_size: int) -> Iterator[List[dict]]:
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, batch_size)):
+        yield batch
+
+
+class KeyResolver:
+    """
+    Resolves the natural keys of a reference to ids, with one query for all
+    the keys of a batch which haven't been resolved before.
+    """
+
+    def __init__(self, reference: Reference):
+        self.reference = reference
+        self.ids: Dict[str, int] = dict()
+
+    async def resolve(self, connection: AsyncConnection, rows: List[dict]):
+        field, column = self.reference.field, self.reference.column
+        keys = {row[field] for row in rows if field in row} - self.ids.keys()
+        if keys:
+            statement = select_ids_by_key(
+                self.reference.model, self.reference.attr_name
+            )
+            result = await connection.execute(statement, {"values": list(keys)})
+            self.ids.update(result.tuples().all())
+
+        for row in rows:
+            if field not in row:
+                continue
+            key = row.pop(field)
+            if key not in self.ids:
+                raise InvalidImportError(f"No object with {field} {key!r}.")
+            row[column] = self.ids[key]
+
+
+def get_columns(model: Base, row: dict) -> Tuple[str, ...]:
+    columns = tuple(row.keys())
+    unknown_columns = set(columns) - set(model.__table__.c.keys())
+    if unknown_columns:
+        raise InvalidImportError(f"Unknown columns: {sorted(unknown_columns)}.")
+    return columns
+
+
+def check_columns(columns: Tuple[str, ...], rows: List[dict]):
+    """
+    Checks that the rows have exactly the columns of the first row, so that
+    no value is silently left out of the COPY.
+    """
+    for row in rows:
+        if row.keys() != set(columns):
+            raise InvalidImportError(
+                f"Row has columns {sorted(row)} instead of {list(columns)}: {row}."
+            )
+
+
+async def copy_rows(
+    connection: AsyncConnection,
+    model: Base,
+    columns: Tuple[str, ...],
+    rows: List[dict],
+):
+    # COPY is run on the driver's connection, which is in the same
+    # transaction as the SQLAlchemy connection.
+    raw_connection = await connection.get_raw_connection()
+    statement = f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN"
+    async with raw_connection.driver_connection.cursor() as cursor:
+        async with cursor.copy(statement) as copy:
+            for row in rows:
+                await copy.write_row([row[column] for column in columns])
+
+
+async def hash_passwords(rows: List[dict]):
+    """
+    Replaces the plaintext passwords of the rows by their hashes, hashed
+    concurrently on the password hashing threads.
+    """
+    rows = [row for row in rows if "password" in row]
+    password_hashes = await asyncio.gather(
+        *(hash_password_async(row["password"]) for row in rows)
+    )
+    for row, password_hash in zip(rows, password_hashes):
+        del row["password"]
+        row["password_hash"] = password_hash
+
+
+async def import_rows(
+    connection: AsyncConnection,
+    table_name: str,
+    rows: Iterable[dict],
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> int:
+    """
+    Imports the rows into table_name, batch_size rows at a time.
+    Returns the number of imported rows.
+    """
+    if table_name not in MODELS:
+        raise InvalidImportError(f"Unknown table {table_name!r}.")
+    model = MODELS[table_name]
+    resolvers = [KeyResolver(reference) for reference in REFERENCES[table_name]]
+
+    columns = None
+    num_rows = 0
+    for batch in batched(rows, batch_size):
+        for resolver in resolvers:
+            await resolver.resolve(connection, batch)
+        if model is User_sql:
+            await hash_passwords(batch)
+
+        if columns is None:
+            columns = get_columns(model, batch[0])
+        check_columns(columns, batch)
+        await copy_rows(connection, model, columns, batch)
+        num_rows += len(batch)
+
+    if columns is not None and "id" in columns:
+        # All the rows had ids. Objects created later get ids after the
+        # imported ones.
+        await connection.execute(
+            text(
+                "SELECT setval(pg_get_serial_sequence(:table_name, 'id'), "
+                f"(SELECT max(id) FROM {model.__tablename__}))"
+            ),
+            {"table_name": model.__tablename__},
+        )
+    return num_rows
+
+
+def parse_args(args: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.db.importer",
+        description="Bulk imports rows from a CSV or JSONL file with COPY.",
+    )
+    parser.add_argument("table", choices=MODELS.keys())
+    parser.add_argument("file", type=Path)
+    parser.add_argument(
+        "--format", choices=FORMATS, help="Defaults to the file's extension."
+    )
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    return parser.parse_args(args)
+
+
+async def main(args: List[str]) -> int:
+    args = parse_args(args)
+    try:
+        format = args.format or get_format(args.file)
+        start = time.perf_counter()
+        async with engine.begin() as connection:
+            num_rows = await import_rows(
+                connection,
+                args.table,
+                read_rows(args.file, format),
+                args.batch_size,
+            )
+        seconds = time.perf_counter() - start
+    except (
+        InvalidImportError,
+        DBAPIError,
+        DriverError,
+        FileNotFoundError,
+        json.JSONDecodeError,
+        csv.Error,
+    ) as error:
+        print(f"Import failed: {error}", file=sys.stderr)
+        return 1
+    finally:
+        await engine.dispose()
+
+    print(
+        f"Imported {num_rows} {args.table} in {seconds:.2f}s "
+        f"({num_rows / seconds:.0f} rows/s)."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(sys.argv[1:])))
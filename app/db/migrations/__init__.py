@@ -0,0 +1,25 @@
+# flake8: noqa F401
+from . import (
+    v0001_initial_schema,
+    v0002_hot_lookup_indexes,
+    v0003_keyset_indexes,
+    v0004_nested_page_indexes,
+    v0005_user_token_versions,
+    v0006_refresh_tokens,
+)
+from .runner import (
+    run_migrations,
+    stamp_migrations,
+    get_applied_versions,
+    get_pending_versions,
+)
+
+# In order of application.
+MIGRATIONS = [
+    v0001_initial_schema,
+    v0002_hot_lookup_indexes,
+    v0003_keyset_indexes,
+    v0004_nested_page_indexes,
+    v0005_user_token_versions,
+    v0006_refresh_tokens,
+]
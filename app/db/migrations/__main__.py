@@ -0,0 +1,24 @@
+"""
+Applies pending migrations to the database configured in settings.
+Usage: python -m app.db.migrations
+"""
+
+import asyncio
+from app.db.database import engine
+from . import MIGRATIONS, run_migrations
+
+
+async def main():
+    try:
+        applied_versions = await run_migrations(engine, MIGRATIONS)
+    finally:
+        await engine.dispose()
+
+    if applied_versions:
+        print(f"Applied migrations: {applied_versions}")
+    else:
+        print("Database is up to date.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
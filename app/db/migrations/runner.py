@@ -0,0 +1,185 @@
+from contextlib import asynccontextmanager
+from types import ModuleType
+from typing import List, Optional, Sequence, Set
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+# A migration is a module with:
+# VERSION: int, increasing with every migration;
+# DESCRIPTION: str;
+# TRANSACTIONAL: bool, False if upgrade runs statements which can't run in
+# a transaction block (e.g. CREATE INDEX CONCURRENTLY);
+# async def upgrade(connection: AsyncConnection).
+# Migrations must be safe to run against a live database: they never drop
+# data, and should be idempotent so that a failed run can be retried.
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+# Key of the advisory lock taken by migration runs (any constant bigint).
+MIGRATIONS_LOCK_KEY = 4_174_031_955
+
+
+async def ensure_migrations_table(engine: AsyncEngine):
+    async with engine.begin() as connection:
+        await connection.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+                "version INTEGER PRIMARY KEY, "
+                "description VARCHAR(254) NOT NULL, "
+                "applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+            )
+        )
+
+
+async def get_applied_versions(engine: AsyncEngine) -> Set[int]:
+    await ensure_migrations_table(engine)
+    async with engine.connect() as connection:
+        result = await connection.execute(
+            text(f"SELECT version FROM {MIGRATIONS_TABLE}")
+        )
+        return set(result.scalars().all())
+
+
+async def get_pending_versions(
+    engine: AsyncEngine,
+    migrations: Sequence[ModuleType],
+) -> List[int]:
+    """
+    Versions of the migrations which haven't been applied yet (all of them
+    if the migrations table doesn't exist), in order.
+    Unlike get_applied_versions, runs no DDL, so checking an up to date
+    schema is cheap and takes no locks.
+    """
+    async with engine.connect() as connection:
+        table_exists = await connection.scalar(
+            text("SELECT to_regclass(:name) IS NOT NULL"),
+            {"name": MIGRATIONS_TABLE},
+        )
+        applied_versions = set()
+        if table_exists:
+            result = await connection.execute(
+                text(f"SELECT version FROM {MIGRATIONS_TABLE}")
+            )
+            applied_versions = set(result.scalars().all())
+
+    return sorted(
+        migration.VERSION
+        for migration in migrations
+        if migration.VERSION not in applied_versions
+    )
+
+
+@asynccontextmanager
+async def migrations_lock(engine: AsyncEngine):
+    """
+    Serializes the migration runs of concurrent processes, e.g. of several
+    app workers starting at once.
+    The lock is held by a session-level advisory lock, on a connection
+    outside of any transaction so that concurrent index builds don't wait
+    for it.
+    """
+    async with engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await connection.execute(
+            text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATIONS_LOCK_KEY}
+        )
+        try:
+            yield
+        finally:
+            await connection.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATIONS_LOCK_KEY}
+            )
+
+
+async def record_migration(connection: AsyncConnection, migration: ModuleType):
+    await connection.execute(
+        text(
+            f"INSERT INTO {MIGRATIONS_TABLE} (version, description) "
+            "VALUES (:version, :description) ON CONFLICT (version) DO NOTHING"
+        ),
+        {"version": migration.VERSION, "description": migration.DESCRIPTION},
+    )
+
+
+async def run_migrations(
+    engine: AsyncEngine,
+    migrations: Sequence[ModuleType],
+) -> List[int]:
+    """
+    Applies the migrations which haven't been applied yet, in order.
+    Returns the versions of the applied migrations.
+    """
+    async with migrations_lock(engine):
+        # Read under the lock, so migrations applied by a concurrent run
+        # aren't applied again.
+        applied_versions = await get_applied_versions(engine)
+        newly_applied = []
+
+        for migration in sorted(migrations, key=lambda m: m.VERSION):
+            if migration.VERSION in applied_versions:
+                continue
+
+            if migration.TRANSACTIONAL:
+                async with engine.begin() as connection:
+                    await migration.upgrade(connection)
+                    await record_migration(connection, migration)
+            else:
+                async with engine.connect() as connection:
+                    connection = await connection.execution_options(
+                        isolation_level="AUTOCOMMIT"
+                    )
+                    await migration.upgrade(connection)
+                    await record_migration(connection, migration)
+
+            newly_applied.append(migration.VERSION)
+
+    return newly_applied
+
+
+async def stamp_migrations(engine: AsyncEngine, migrations: Sequence[ModuleType]):
+    """
+    Marks all migrations as applied, without running them.
+    Used when the schema has been created straight from the models.
+    """
+    await ensure_migrations_table(engine)
+    async with engine.begin() as connection:
+        for migration in migrations:
+            await record_migration(connection, migration)
+
+
+async def create_index_concurrently(
+    connection: AsyncConnection,
+    name: str,
+    table: str,
+    columns: List[str],
+    unique: bool = False,
+    where: Optional[str] = None,
+):
+    """
+    Builds an index without blocking writes to the table, partial if a
+    where condition is given.
+    Must run outside of a transaction block.
+    A failed concurrent build leaves an invalid index behind, which is
+    dropped and rebuilt.
+    """
+    result = await connection.execute(
+        text(
+            "SELECT i.indisvalid FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name"
+        ),
+        {"name": name},
+    )
+    is_valid = result.scalar()
+    if is_valid:
+        return
+    if is_valid is not None:
+        await connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+    unique_sql = "UNIQUE " if unique else ""
+    await connection.execute(
+        text(
+            f"CREATE {unique_sql}INDEX CONCURRENTLY IF NOT EXISTS {name} "
+            f"ON {table} ({', '.join(columns)})" + (f" WHERE {where}" if where else "")
+        )
+    )
@@ -0,0 +1,55 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+VERSION = 1
+DESCRIPTION = "Initial schema."
+TRANSACTIONAL = True
+
+# Schema as originally created by Base.metadata.create_all.
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS employers (
+        name VARCHAR(40) NOT NULL,
+        contact_email VARCHAR(254) NOT NULL,
+        industry VARCHAR(254) NOT NULL,
+        id SERIAL NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        username VARCHAR(30) NOT NULL,
+        email VARCHAR(254) NOT NULL,
+        password_hash VARCHAR(128) NOT NULL,
+        role VARCHAR NOT NULL,
+        id SERIAL NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        title VARCHAR(150) NOT NULL,
+        description VARCHAR(1000) NOT NULL,
+        employer_id INTEGER NOT NULL,
+        id SERIAL NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(employer_id) REFERENCES employers (id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS applications (
+        user_id INTEGER NOT NULL,
+        job_id INTEGER NOT NULL,
+        id SERIAL NOT NULL,
+        PRIMARY KEY (id),
+        CONSTRAINT unique_user_job UNIQUE (user_id, job_id),
+        FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE,
+        FOREIGN KEY(job_id) REFERENCES jobs (id) ON DELETE CASCADE
+    )
+    """,
+]
+
+
+async def upgrade(connection: AsyncConnection):
+    for statement in STATEMENTS:
+        await connection.execute(text(statement))
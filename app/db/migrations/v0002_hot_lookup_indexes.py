@@ -0,0 +1,22 @@
+from sqlalchemy.ext.asyncio import AsyncConnection
+from .runner import create_index_concurrently
+
+VERSION = 2
+DESCRIPTION = "Indexes on foreign keys and unique emails."
+TRANSACTIONAL = False
+
+# applications.user_id lookups are already served by the unique_user_job
+# index, since user_id is its leading column.
+# The unique email indexes fail to build if the table already holds
+# duplicate emails; these have to be cleaned up before retrying.
+INDEXES = [
+    ("ix_jobs_employer_id", "jobs", ["employer_id"], False),
+    ("ix_applications_job_id", "applications", ["job_id"], False),
+    ("ix_users_email", "users", ["email"], True),
+    ("ix_employers_contact_email", "employers", ["contact_email"], True),
+]
+
+
+async def upgrade(connection: AsyncConnection):
+    for name, table, columns, unique in INDEXES:
+        await create_index_concurrently(connection, name, table, columns, unique=unique)
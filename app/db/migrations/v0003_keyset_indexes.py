@@ -0,0 +1,17 @@
+from sqlalchemy.ext.asyncio import AsyncConnection
+from .runner import create_index_concurrently
+
+VERSION = 3
+DESCRIPTION = "Indexes for keyset pagination."
+TRANSACTIONAL = False
+
+# Pages are ordered by id, which the primary keys cover, except for a user's
+# applications (filtered by user_id, then ordered by id).
+INDEXES = [
+    ("ix_applications_user_id_id", "applications", ["user_id", "id"], False),
+]
+
+
+async def upgrade(connection: AsyncConnection):
+    for name, table, columns, unique in INDEXES:
+        await create_index_concurrently(connection, name, table, columns, unique=unique)
@@ -0,0 +1,27 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from .runner import create_index_concurrently
+
+VERSION = 4
+DESCRIPTION = "Indexes for the first children of each parent."
+TRANSACTIONAL = False
+
+# The first children of a parent are read by an index range scan in id
+# order, instead of reading and sorting all of its children.
+# (applications (user_id, id) was added by v0003.)
+INDEXES = [
+    ("ix_jobs_employer_id_id", "jobs", ["employer_id", "id"], False),
+    ("ix_applications_job_id_id", "applications", ["job_id", "id"], False),
+]
+
+
+# The indexes above also serve lookups by their leading column alone, which
+# makes v0002's single-column indexes on these columns redundant.
+DROPPED_INDEXES = ["ix_jobs_employer_id", "ix_applications_job_id"]
+
+
+async def upgrade(connection: AsyncConnection):
+    for name, table, columns, unique in INDEXES:
+        await create_index_concurrently(connection, name, table, columns, unique=unique)
+    for name in DROPPED_INDEXES:
+        await connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
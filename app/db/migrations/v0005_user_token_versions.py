@@ -0,0 +1,24 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from .runner import create_index_concurrently
+
+VERSION = 5
+DESCRIPTION = "Token versions of users."
+TRANSACTIONAL = False
+
+# Adding a column with a constant default doesn't rewrite the table.
+COLUMN_STATEMENT = """
+    ALTER TABLE users
+    ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0
+"""
+
+# The versions of the few users whose tokens have been revoked are reloaded
+# periodically by each worker, from this (small) partial index.
+INDEX = ("ix_users_revoked_tokens", "users", ["id", "token_version"])
+INDEX_WHERE = "token_version > 0"
+
+
+async def upgrade(connection: AsyncConnection):
+    await connection.execute(text(COLUMN_STATEMENT))
+    name, table, columns = INDEX
+    await create_index_concurrently(connection, name, table, columns, where=INDEX_WHERE)
@@ -0,0 +1,34 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+VERSION = 6
+DESCRIPTION = "Refresh tokens."
+TRANSACTIONAL = True
+
+# The table is new, so its indexes are built in the same transaction.
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS refresh_tokens (
+        user_id INTEGER NOT NULL,
+        token_hash VARCHAR(64) NOT NULL,
+        token_version INTEGER NOT NULL,
+        expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        id SERIAL NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS ix_refresh_tokens_token_hash
+    ON refresh_tokens (token_hash)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_refresh_tokens_user_id
+    ON refresh_tokens (user_id)
+    """,
+]
+
+
+async def upgrade(connection: AsyncConnection):
+    for statement in STATEMENTS:
+        await connection.execute(text(statement))
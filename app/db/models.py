@@ -7,14 +7,36 @@ from sqlalchemy.orm import (
     Mapped,
     relationship,
     class_mapper,
-    Session,
-    Query,
 )
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from sqlalchemy import and_, or_
+from app.db.statements import (
+    select_all,
+    select_where_equal,
+    select_where_in,
+    select_where_tuple_in,
+    select_page,
+    select_first_per_parent,
+    insert_returning,
+    insert_if_parent_exists,
+    delete_where,
+    update_by_id,
+    increment_by_id,
+    select_where_positive,
+)
 
-from sqlalchemy import String, ForeignKey, UniqueConstraint
-from typing import List, Dict, Self
+from sqlalchemy import (
+    DateTime,
+    Index,
+    Row,
+    Select,
+    String,
+    ForeignKey,
+    UniqueConstraint,
+    text,
+)
+from datetime import datetime
+from typing import List, Optional, Tuple, Self
 
 SQL_CLASS_NAME_TO_CLASS = {"Employer"}
 
@@ -33,104 +55,293 @@ class Base(DeclarativeBase):
             return []
 
     @classmethod
-    def apply_single_attr_multivalued_filter(
-        cls,
-        query: Query,
+    async def fetch(
+        cls: Self,
+        db_session: AsyncSession,
+        statement: Select,
+        params: Optional[dict] = None,
+        rows: bool = False,
+    ) -> List[Self] | List[Row]:
+        """
+        Executes a select of cls objects, or of plain rows if rows is set.
+        """
+        if rows:
+            result = await db_session.execute(statement, params)
+        else:
+            result = await db_session.scalars(statement, params)
+        return list(result.all())
+
+    @classmethod
+    async def get_all(
+        cls: Self,
+        db_session: AsyncSession,
+        columns: Optional[Tuple[str, ...]] = None,
+        rows: bool = False,
+    ) -> List[Self] | List[Row]:
+        statement = select_all(cls, columns, rows)
+        return await cls.fetch(db_session, statement, rows=rows)
+
+    @classmethod
+    async def get_where_equal(
+        cls: Self,
+        db_session: AsyncSession,
+        columns: Optional[Tuple[str, ...]] = None,
+        rows: bool = False,
+        **attrs,
+    ) -> List[Self] | List[Row]:
+        """
+        Finds all objects whose attributes are equal to the given values,
+        e.g. get_where_equal(db_session, user_id=1, job_id=2).
+        """
+        statement = select_where_equal(cls, *attrs.keys(), columns=columns, rows=rows)
+        return await cls.fetch(db_session, statement, attrs, rows)
+
+    @classmethod
+    async def get_where_in(
+        cls: Self,
+        db_session: AsyncSession,
         attr_name: str,
-        attr_values: list,
-    ) -> Query:
-        query = query.filter(getattr(cls, attr_name).in_(attr_values))
-        return query
+        values: list,
+        columns: Optional[Tuple[str, ...]] = None,
+        rows: bool = False,
+    ) -> List[Self] | List[Row]:
+        """
+        Finds all objects which have an attr_name equal to one of the values.
+        """
+        statement = select_where_in(cls, attr_name, columns, rows)
+        return await cls.fetch(db_session, statement, {"values": values}, rows)
 
     @classmethod
-    def apply_multi_attr_multivalued_filter(
-        cls,
-        query: Query,
-        attr_names: tuple[str, ...],
-        attr_values: list[tuple],
-    ) -> Query:
-        conditions = []
-        for values in attr_values:
-            condition_parts = []
-            for attr, value in zip(attr_names, values):
-                condition_parts.append(getattr(cls, attr) == value)
-            conditions.append(and_(*condition_parts))
-        return query.filter(or_(*conditions))
+    async def get_where_tuple_in(
+        cls: Self,
+        db_session: AsyncSession,
+        attr_names: Tuple[str, ...],
+        keys: List[tuple],
+        columns: Optional[Tuple[str, ...]] = None,
+        rows: bool = False,
+    ) -> List[Self] | List[Row]:
+        """
+        Finds all objects whose values of (attr_name1, attr_name2, ...) match
+        one of the tuples in keys.
+        """
+        statement = select_where_tuple_in(cls, *attr_names, columns=columns, rows=rows)
+        values = zip(*keys) if keys else [[] for _ in attr_names]
+        params = {
+            f"{attr_name}_values": list(attr_values)
+            for attr_name, attr_values in zip(attr_names, values)
+        }
+        return await cls.fetch(db_session, statement, params, rows)
 
     @classmethod
-    def apply_multi_attr_singlevalued_filter(
-        cls,
-        query: Query,
-        filter_by_attrs: dict,
-    ) -> Query:
-        for attr_name, attr_value in filter_by_attrs.items():
-            query = query.filter(getattr(cls, attr_name) == attr_value)
-        return query
+    async def get_page(
+        cls: Self,
+        db_session: AsyncSession,
+        limit: int,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+        backwards: bool = False,
+        columns: Optional[Tuple[str, ...]] = None,
+        rows: bool = False,
+        **attrs,
+    ) -> List[Self] | List[Row]:
+        """
+        Finds a keyset page of at most limit objects whose attributes are
+        equal to the given values, with after < id < before.
+        Backwards pages are the last objects before "before", in descending
+        id order.
+        """
+        statement = select_page(
+            cls,
+            *attrs.keys(),
+            columns=columns,
+            rows=rows,
+            after=after is not None,
+            before=before is not None,
+            backwards=backwards,
+        )
+        params = {**attrs, "limit": limit}
+        if after is not None:
+            params["after"] = after
+        if before is not None:
+            params["before"] = before
+        return await cls.fetch(db_session, statement, params, rows)
 
     @classmethod
-    def get_all(
+    async def get_first_per_parent(
         cls: Self,
-        db_session: Session,
-        filter_by_attrs: dict = {},
-    ) -> List[Self]:
-        """
-        cls: Current SQLAlchemy class.
-        db_session: Current session object.
-        filter_by_attrs: Attributes to filter on.
-        Dictionary, which can be:
-        1. Empty (no filtering needed);
-        2. In the format {attr_name: attr_val (scalar)};
-        Will add a filter for each (attr_name, attr_val) pair.
-        3. In the format {attr_name: [attr_val] (list)};
-        Must have only one entry. Finds all objects which have an attr_name
-        equal to one of the values in the list.
-        4. In the format {(attr_name1, attr_name2, ...): [(val1_ii, val2_ii, ...)]}
-        Must have only one entry.
-        Will find all objects whose values of (attr_name1, attr_name2, ...) match
-        one of the tuples in the list.
-        """
-        query = db_session.query(cls)
-
-        if len(filter_by_attrs) > 0:
-            first_attr_key = next(iter(filter_by_attrs))
-            if isinstance(filter_by_attrs[first_attr_key], list):
-                if len(filter_by_attrs) > 1:
-                    raise Exception("filter_by_attrs has incorrect format.")
-                if isinstance(first_attr_key, str):
-                    # Format 3.
-                    attr_name = first_attr_key
-                    attr_values = filter_by_attrs[attr_name]
-                    query = cls.apply_single_attr_multivalued_filter(
-                        query,
-                        attr_name,
-                        attr_values,
-                    )
-                else:
-                    # Format 4.
-                    attr_names = first_attr_key
-                    attr_values = filter_by_attrs[attr_names]
-                    query = cls.apply_multi_attr_multivalued_filter(
-                        query,
-                        attr_names,
-                        attr_values,
-                    )
-            else:
-                # Format 2.
-                query = cls.apply_multi_attr_singlevalued_filter(query, filter_by_attrs)
-
-        result_objs = query.all()
-        return result_objs
+        db_session: AsyncSession,
+        parent_attr_name: str,
+        parent_values: list,
+        limit: int,
+        after: Optional[int] = None,
+        columns: Optional[Tuple[str, ...]] = None,
+    ) -> List[Row]:
+        """
+        Rows of the first limit objects with id > after, for
+        each of the parent_values of parent_attr_name, in id order.
+        """
+        statement = select_first_per_parent(
+            cls,
+            parent_attr_name,
+            columns=columns,
+            after=after is not None,
+        )
+        params = {"parent_values": parent_values, "limit": limit}
+        if after is not None:
+            params["after"] = after
+        return await cls.fetch(db_session, statement, params, rows=True)
+
+    @classmethod
+    async def insert_many(
+        cls: Self,
+        db_session: AsyncSession,
+        values: List[dict],
+        conflict_attr_names: Tuple[str, ...] = (),
+        columns: Optional[Tuple[str, ...]] = None,
+    ) -> List[Row]:
+        """
+        Inserts one object per dict of values with multi-row INSERT
+        statements, and returns their rows (of the given columns, all if
+        None), in the order of values.
+        Objects conflicting with existing ones on conflict_attr_names (if
+        given) are skipped, and the rows of the others are returned in no
+        particular order.
+        """
+        if not values:
+            return []
+        statement = insert_returning(cls, *conflict_attr_names, columns=columns)
+        result = await db_session.execute(statement, values)
+        return list(result.all())
+
+    @classmethod
+    async def insert_if_parent_exists(
+        cls: Self,
+        db_session: AsyncSession,
+        parent_attr_name: str,
+        conflict_attr_names: Tuple[str, ...] = (),
+        **values,
+    ) -> Row:
+        """
+        Inserts one object with the given values if the parent referenced by
+        its parent_attr_name value exists, and unless it conflicts with an
+        existing object on conflict_attr_names, in one statement.
+        Returns the row (parent_exists, id), with id None if the object
+        wasn't inserted.
+        """
+        attr_names = tuple(name for name in values if name != parent_attr_name)
+        statement = insert_if_parent_exists(
+            cls,
+            parent_attr_name,
+            *attr_names,
+            conflict_attr_names=conflict_attr_names,
+        )
+        result = await db_session.execute(statement, values)
+        return result.one()
+
+    @classmethod
+    async def update_by_id(
+        cls: Self,
+        db_session: AsyncSession,
+        id: int,
+        **values,
+    ) -> Optional[Row]:
+        """
+        Updates only the given attributes of the object with the given id,
+        with one statement. Returns the updated row, or None if there is no
+        such object.
+        """
+        statement = update_by_id(cls, *values.keys())
+        params = {f"new_{name}": value for name, value in values.items()}
+        result = await db_session.execute(statement, {"target_id": id, **params})
+        return result.one_or_none()
+
+    @classmethod
+    async def increment_by_id(
+        cls: Self,
+        db_session: AsyncSession,
+        id: int,
+        attr_name: str,
+    ) -> Optional[int]:
+        """
+        Atomically adds one to attr_name of the object with the given id.
+        Returns its new value, or None if there is no such object.
+        """
+        statement = increment_by_id(cls, attr_name)
+        result = await db_session.execute(statement, {"target_id": id})
+        return result.scalar_one_or_none()
+
+    @classmethod
+    async def get_where_positive(
+        cls: Self,
+        db_session: AsyncSession,
+        attr_name: str,
+    ) -> List[Row]:
+        """
+        Returns the (id, attr) rows of the objects whose attr_name is positive.
+        """
+        result = await db_session.execute(select_where_positive(cls, attr_name))
+        return result.all()
+
+    @classmethod
+    async def delete_where(
+        cls: Self,
+        db_session: AsyncSession,
+        any_values: Optional[dict] = None,
+        columns: Optional[Tuple[str, ...]] = None,
+        **attrs,
+    ) -> List[int] | List[Row]:
+        """
+        Deletes, with one statement, the objects whose attributes are equal
+        to the given values, and whose any_values attributes are one of the
+        given lists' values, e.g.
+        delete_where(db_session, {"id": [1, 2]}, employer_id=1).
+        Returns the ids of the deleted objects, or their rows of the given
+        columns.
+        """
+        any_values = any_values or dict()
+        statement = delete_where(
+            cls,
+            *attrs.keys(),
+            any_attr_names=tuple(any_values.keys()),
+            columns=columns,
+        )
+        params = {
+            **attrs,
+            **{f"{name}_values": values for name, values in any_values.items()},
+        }
+        result = await db_session.execute(statement, params)
+        if columns:
+            return result.all()
+        return list(result.scalars().all())
+
+    @classmethod
+    def get_too_long_attrs(cls: Self, values: dict) -> List[str]:
+        """
+        Names of the string attributes whose value is longer than their
+        column allows.
+        """
+        columns = cls.__table__.c
+        return [
+            attr_name
+            for attr_name, value in values.items()
+            if isinstance(value, str)
+            and getattr(columns[attr_name].type, "length", None) is not None
+            and len(value) > columns[attr_name].type.length
+        ]
 
 
 class Employer(Base):
     __tablename__ = "employers"
 
     name: Mapped[str] = mapped_column(String(40))
-    contact_email: Mapped[str] = mapped_column(String(254))
+    contact_email: Mapped[str] = mapped_column(String(254), unique=True, index=True)
     industry: Mapped[str] = mapped_column(String(254))
+    # Children are deleted by the ON DELETE CASCADE foreign keys, without
+    # being loaded.
     jobs: Mapped[List["Job"]] = relationship(
         back_populates="employer",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     def __repr__(self) -> str:
@@ -145,8 +356,9 @@ class Job(Base):
     __tablename__ = "jobs"
     title: Mapped[str] = mapped_column(String(150))
     description: Mapped[str] = mapped_column(String(1000))
+    # employer_id lookups use the ix_jobs_employer_id_id index.
     employer_id: Mapped[int] = mapped_column(
-        ForeignKey("employers.id", ondelete="CASCADE")
+        ForeignKey("employers.id", ondelete="CASCADE"),
     )
     employer: Mapped["Employer"] = relationship(
         "Employer",
@@ -156,30 +368,71 @@ class Job(Base):
         "Application",
         back_populates="job",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
+    # First jobs of each employer, ordered by id.
+    __table_args__ = (Index("ix_jobs_employer_id_id", "employer_id", "id"),)
+
 
 class User(Base):
     __tablename__ = "users"
     username: Mapped[str] = mapped_column(String(30))
-    email: Mapped[str] = mapped_column(String(254))
+    email: Mapped[str] = mapped_column(String(254), unique=True, index=True)
 
     # Plaintext for now.
     password_hash: Mapped[str] = mapped_column(String(128))
     role: Mapped[str] = mapped_column(String[20])
+    # Incremented to revoke the user's tokens, which carry the version they
+    # were issued with (see app/auth/token_versions.py).
+    token_version: Mapped[int] = mapped_column(default=0, server_default="0")
     applications: Mapped[List["Application"]] = relationship(
         "Application",
         back_populates="user",
         cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    # Versions of the users whose tokens have been revoked.
+    __table_args__ = (
+        Index(
+            "ix_users_revoked_tokens",
+            "id",
+            "token_version",
+            postgresql_where=text("token_version > 0"),
+        ),
     )
 
 
 class Application(Base):
     __tablename__ = "applications"
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
-    job_id: Mapped[int] = mapped_column(ForeignKey("jobs.id", ondelete="CASCADE"))
+    # user_id lookups use the unique_user_job index, and job_id lookups the
+    # ix_applications_job_id_id index.
+    job_id: Mapped[int] = mapped_column(
+        ForeignKey("jobs.id", ondelete="CASCADE"),
+    )
 
     user: Mapped["User"] = relationship("User", back_populates="applications")
     job: Mapped["Job"] = relationship("Job", back_populates="applications")
 
-    __table_args__ = (UniqueConstraint("user_id", "job_id", name="unique_user_job"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "job_id", name="unique_user_job"),
+        # Keyset pages of a user's applications, ordered by id.
+        Index("ix_applications_user_id_id", "user_id", "id"),
+        # First applications of each job, ordered by id.
+        Index("ix_applications_job_id_id", "job_id", "id"),
+    )
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        index=True,
+    )
+    # SHA-256 of the token, which only the client knows.
+    token_hash: Mapped[str] = mapped_column(String(64), unique=True, index=True)
+    # The user's token version when the token was issued.
+    token_version: Mapped[int]
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
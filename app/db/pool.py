@@ -0,0 +1,106 @@
+import time
+from bisect import bisect_left
+from threading import Lock
+from contextvars import ContextVar
+from typing import List, Optional
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+from sqlalchemy.util.queue import AsyncAdaptedQueue
+
+# Upper bounds (in seconds) of the checkout wait time histogram buckets.
+WAIT_TIME_BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5]
+
+
+class PoolMetrics:
+    """
+    Counters for the connection checkouts of a pool.
+    The wait time histogram is cumulative (Prometheus style): the count of a
+    bucket includes all checkouts which waited at most that many seconds.
+    """
+
+    def __init__(self, buckets: List[float] = WAIT_TIME_BUCKETS):
+        self.buckets = sorted(buckets)
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_timeouts = 0
+            self.wait_time_sum = 0.0
+            # Last bucket counts the checkouts above the largest bound.
+            self._bucket_counts = [0] * (len(self.buckets) + 1)
+
+    def observe_checkout(self, wait_time: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.checkout_timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_time_sum += wait_time
+            self._bucket_counts[bisect_left(self.buckets, wait_time)] += 1
+
+    def wait_time_histogram(self) -> dict:
+        histogram = {}
+        total = 0
+        with self._lock:
+            for bound, count in zip(self.buckets, self._bucket_counts):
+                total += count
+                histogram[str(bound)] = total
+            histogram["+Inf"] = total + self._bucket_counts[-1]
+        return histogram
+
+
+# Seconds the current checkout has waited on the pool's queue. Connecting
+# and pre-pinging aren't counted, only waiting for a connection to be
+# returned.
+queue_wait_time: ContextVar[float] = ContextVar("queue_wait_time", default=0.0)
+
+
+class TimedAsyncAdaptedQueue(AsyncAdaptedQueue):
+    def get(self, block: bool = True, timeout: Optional[float] = None):
+        start = time.perf_counter()
+        try:
+            return super().get(block, timeout)
+        finally:
+            queue_wait_time.set(queue_wait_time.get() + time.perf_counter() - start)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool which records how long each checkout waited for a
+    connection to be available and how many checkouts timed out.
+    """
+
+    _queue_class = TimedAsyncAdaptedQueue
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self) -> PoolProxiedConnection:
+        token = queue_wait_time.set(0.0)
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.metrics.observe_checkout(queue_wait_time.get(), timed_out=True)
+            raise
+        else:
+            self.metrics.observe_checkout(queue_wait_time.get())
+        finally:
+            queue_wait_time.reset(token)
+        return connection
+
+
+def get_pool_status(pool: InstrumentedAsyncQueuePool) -> dict:
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        # SQLAlchemy reports a negative overflow until the pool has filled up.
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": pool.metrics.checkouts,
+        "checkout_timeouts": pool.metrics.checkout_timeouts,
+        "wait_time_seconds_sum": pool.metrics.wait_time_sum,
+        "wait_time_seconds_histogram": pool.metrics.wait_time_histogram(),
+    }
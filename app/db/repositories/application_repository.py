@@ -1,102 +1,220 @@
-from sqlalchemy.orm import Session
-from typing import List, Tuple
-from app.db.models import Application as Application_sql
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+from app.db.models import Application as Application_sql, Job as Job_sql
 from app.gql.types import Application_gql
+from app.gql.pagination import Page
+from app.gql.bulk import BulkResult, ItemError
 from graphql import GraphQLError
 from app.errors.error_messages import ALREADY_APPLIED
 from app.errors.custom_errors import ResourceNotFound
-from .job_repository import JobRepository
-from app.sql_to_gql import application_to_gql
+from app.sql_to_gql import rows_to_gql
 
 
 class ApplicationRepository:
+    # With gql=True, the read methods run Core selects and build
+    # Application_gql objects straight from the rows, without ORM instances.
+
     @staticmethod
-    def get_all_applications(
-        db_session: Session, gql: bool = False
+    async def get_all_applications(
+        db_session: AsyncSession, gql: bool = False
     ) -> List[Application_gql | Application_sql]:
-        applications = Application_sql.get_all(db_session)
-        if gql:
-            return [application_to_gql(app) for app in applications]
-        return applications
+        applications = await Application_sql.get_all(db_session, rows=gql)
+        return rows_to_gql(Application_gql, applications) if gql else applications
+
+    @staticmethod
+    async def get_applications_page(
+        db_session: AsyncSession,
+        page: Page,
+        user_id: Optional[int] = None,
+    ) -> List[Application_gql]:
+        """
+        Page of all applications, or only of the given user's applications.
+        """
+        attrs = dict(user_id=user_id) if user_id is not None else dict()
+        rows = await Application_sql.get_page(
+            db_session,
+            page.limit,
+            page.after,
+            page.before,
+            page.backwards,
+            rows=True,
+            **attrs,
+        )
+        return rows_to_gql(Application_gql, rows)
 
     @staticmethod
-    def get_all_applications_by_user_id(
-        db_session: Session, user_id: int, gql: bool = False
+    async def get_all_applications_by_user_id(
+        db_session: AsyncSession, user_id: int, gql: bool = False
     ) -> List[Application_gql | Application_sql]:
-        applications = Application_sql.get_all(
-            db_session=db_session,
-            filter_by_attrs={"user_id": user_id},
+        applications = await Application_sql.get_where_equal(
+            db_session,
+            rows=gql,
+            user_id=user_id,
         )
+        return rows_to_gql(Application_gql, applications) if gql else applications
 
-        if gql:
-            return [application_to_gql(app) for app in applications]
-        return applications
+    @staticmethod
+    async def get_all_applications_by_job_id(
+        db_session: AsyncSession, job_id: int, gql: bool = False
+    ) -> List[Application_gql | Application_sql]:
+        applications = await Application_sql.get_where_equal(
+            db_session,
+            rows=gql,
+            job_id=job_id,
+        )
+        return rows_to_gql(Application_gql, applications) if gql else applications
 
     @staticmethod
-    def get_all_applications_by_job_id(
-        db_session: Session, job_id: int, gql: bool = False
+    async def get_applications_from_job_ids(
+        db_session: AsyncSession,
+        job_ids: List[int],
+        gql: bool = False,
     ) -> List[Application_gql | Application_sql]:
-        applications = Application_sql.get_all(
-            db_session=db_session,
-            filter_by_attrs={"job_id": job_id},
+        applications = await Application_sql.get_where_in(
+            db_session,
+            "job_id",
+            job_ids,
+            rows=gql,
         )
+        return rows_to_gql(Application_gql, applications) if gql else applications
 
-        if gql:
-            return [application_to_gql(app) for app in applications]
-        return applications
+    @staticmethod
+    async def get_applications_from_user_ids(
+        db_session: AsyncSession,
+        user_ids: List[int],
+        gql: bool = False,
+    ) -> List[Application_gql | Application_sql]:
+        applications = await Application_sql.get_where_in(
+            db_session,
+            "user_id",
+            user_ids,
+            rows=gql,
+        )
+        return rows_to_gql(Application_gql, applications) if gql else applications
 
     @staticmethod
-    def get_applications_from_job_ids(
-        db_session: Session,
+    async def get_first_applications_from_job_ids(
+        db_session: AsyncSession,
         job_ids: List[int],
-    ) -> List[Application_sql]:
-        return Application_sql.get_all(
-            db_session=db_session,
-            filter_by_attrs={"job_id": job_ids},
+        first: int,
+        after: Optional[int] = None,
+    ) -> List[Application_gql]:
+        """
+        First applications with id > after of each job.
+        """
+        rows = await Application_sql.get_first_per_parent(
+            db_session, "job_id", job_ids, first, after
         )
+        return rows_to_gql(Application_gql, rows)
 
     @staticmethod
-    def get_applications_from_user_ids(
-        db_session: Session,
+    async def get_first_applications_from_user_ids(
+        db_session: AsyncSession,
         user_ids: List[int],
-    ) -> List[Application_sql]:
-        return Application_sql.get_all(
-            db_session=db_session,
-            filter_by_attrs={"user_id": user_ids},
+        first: int,
+        after: Optional[int] = None,
+    ) -> List[Application_gql]:
+        """
+        First applications with id > after of each user.
+        """
+        rows = await Application_sql.get_first_per_parent(
+            db_session, "user_id", user_ids, first, after
         )
+        return rows_to_gql(Application_gql, rows)
 
     @staticmethod
-    def get_all_applications_from_job_user_ids(
-        db_session: Session,
+    async def get_all_applications_from_job_user_ids(
+        db_session: AsyncSession,
         job_user_id_tuples: List[Tuple[int, int]],
-    ) -> List[Application_sql]:
-        return Application_sql.get_all(
-            db_session=db_session,
-            filter_by_attrs={("job_id", "user_id"): job_user_id_tuples},
+        gql: bool = False,
+    ) -> List[Application_gql | Application_sql]:
+        applications = await Application_sql.get_where_tuple_in(
+            db_session,
+            ("job_id", "user_id"),
+            job_user_id_tuples,
+            rows=gql,
         )
+        return rows_to_gql(Application_gql, applications) if gql else applications
 
     @staticmethod
-    def create_application(db_session: Session, user_id: int, job_id: int) -> bool:
-        job = JobRepository.get_job_by_id(
-            db_session=db_session,
-            id=job_id,
-            gql=False,
+    async def create_application(
+        db_session: AsyncSession, user_id: int, job_id: int
+    ) -> bool:
+        """
+        Checks that the job exists and inserts the application in one
+        statement, which can't race with concurrent applications since a
+        duplicate is skipped by the unique_user_job constraint.
+        """
+        row = await Application_sql.insert_if_parent_exists(
+            db_session,
+            "job_id",
+            ("user_id", "job_id"),
+            user_id=user_id,
+            job_id=job_id,
         )
-
-        if job is None:
+        if not row.parent_exists:
             raise ResourceNotFound("Job")
+        if row.id is None:
+            raise GraphQLError(ALREADY_APPLIED)
 
-        user_applications = Application_sql.get_all(
-            db_session=db_session,
-            filter_by_attrs={"user_id": user_id, "job_id": job_id},
+        await db_session.commit()
+        return True
+
+    @staticmethod
+    async def create_applications(
+        db_session: AsyncSession, user_id: int, job_ids: List[int]
+    ) -> BulkResult[Application_gql]:
+        """
+        Checks that the jobs exist and haven't been applied to (one query
+        each for all jobs), then inserts the applications with multi-row
+        INSERT ... RETURNING statements, in one transaction.
+        Applications created concurrently are skipped by the insert, and
+        reported as already existing.
+        """
+        unique_job_ids = list(dict.fromkeys(job_ids))
+        job_rows = await Job_sql.get_where_in(
+            db_session, "id", unique_job_ids, ("id",), rows=True
         )
+        existing_job_ids = {row.id for row in job_rows}
+        application_rows = await Application_sql.get_where_tuple_in(
+            db_session,
+            ("job_id", "user_id"),
+            [(job_id, user_id) for job_id in unique_job_ids],
+            ("job_id",),
+            rows=True,
+        )
+        applied_job_ids = {row.job_id for row in application_rows}
 
-        for application in user_applications:
-            if application.job_id == job_id:
-                raise GraphQLError(ALREADY_APPLIED)
+        valid_job_ids = []
+        errors = []
+        for index, job_id in enumerate(job_ids):
+            if job_id not in existing_job_ids:
+                message = ResourceNotFound.get_message("Job")
+            elif job_id in applied_job_ids:
+                message = ALREADY_APPLIED
+            else:
+                applied_job_ids.add(job_id)
+                valid_job_ids.append((index, job_id))
+                continue
+            errors.append(ItemError(index=index, message=message))
 
-        application_sql = Application_sql(user_id=user_id, job_id=job_id)
-        db_session.add(application_sql)
-        db_session.commit()
+        rows = await Application_sql.insert_many(
+            db_session,
+            [dict(user_id=user_id, job_id=job_id) for _, job_id in valid_job_ids],
+            ("user_id", "job_id"),
+        )
+        await db_session.commit()
 
-        return True
+        rows_by_job_id = {row.job_id: row for row in rows}
+        created_rows = []
+        for index, job_id in valid_job_ids:
+            row = rows_by_job_id.get(job_id)
+            if row is None:
+                errors.append(ItemError(index=index, message=ALREADY_APPLIED))
+            else:
+                created_rows.append(row)
+        errors.sort(key=lambda error: error.index)
+
+        return BulkResult(
+            created=rows_to_gql(Application_gql, created_rows), errors=errors
+        )
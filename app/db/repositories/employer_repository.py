@@ -1,60 +1,233 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
 from app.db.models import Employer as Employer_sql
 from app.gql.types import Employer_gql
-from app.sql_to_gql import employer_to_gql
+from app.gql.pagination import Page
+from app.gql.bulk import BulkResult, ItemError, get_too_long_message
+from app.errors.error_messages import EMPLOYER_ALREADY_EXISTS
+from app.errors.custom_errors import ResourceNotFound
+from graphql import GraphQLError
+from app.sql_to_gql import get_gql_field_names, rows_to_gql
 
 
 class EmployerRepository:
+    # With gql=True, the read methods run Core selects and build Employer_gql
+    # objects straight from the rows, without ORM instances.
+
     @staticmethod
-    def get_all_employers(
-        db_session: Session, gql: bool = False
+    async def get_all_employers(
+        db_session: AsyncSession,
+        gql: bool = False,
+        columns: Optional[Tuple[str, ...]] = None,
     ) -> List[Employer_gql | Employer_sql]:
-        employers = Employer_sql.get_all(db_session=db_session)
         if gql:
-            return [employer_to_gql(employer) for employer in employers]
-        return employers
+            rows = await Employer_sql.get_all(
+                db_session, columns or get_gql_field_names(Employer_gql), rows=True
+            )
+            return rows_to_gql(Employer_gql, rows)
+        return await Employer_sql.get_all(db_session, columns)
+
+    @staticmethod
+    async def get_employers_page(
+        db_session: AsyncSession,
+        page: Page,
+        columns: Optional[Tuple[str, ...]] = None,
+    ) -> List[Employer_gql]:
+        rows = await Employer_sql.get_page(
+            db_session,
+            page.limit,
+            page.after,
+            page.before,
+            page.backwards,
+            columns or get_gql_field_names(Employer_gql),
+            rows=True,
+        )
+        return rows_to_gql(Employer_gql, rows)
 
     @staticmethod
-    def get_employer_by_id(
-        db_session: Session,
+    async def get_employer_by_id(
+        db_session: AsyncSession,
         id: int,
         gql: bool = False,
+        columns: Optional[Tuple[str, ...]] = None,
     ) -> Optional[Employer_gql | Employer_sql]:
-        result = Employer_sql.get_all(
-            db_session=db_session,
-            filter_by_attrs={"id": id},
-        )
+        if gql:
+            rows = await Employer_sql.get_where_equal(
+                db_session,
+                columns or get_gql_field_names(Employer_gql),
+                rows=True,
+                id=id,
+            )
+            result = rows_to_gql(Employer_gql, rows)
+        else:
+            result = await Employer_sql.get_where_equal(
+                db_session,
+                columns,
+                id=id,
+            )
 
-        if len(result) == 0:
-            return None
-        elif gql:
-            return employer_to_gql(result[0])
-        return result[0]
+        return result[0] if len(result) > 0 else None
 
     @staticmethod
-    def get_employer_by_email(
-        db_session: Session,
+    async def get_employer_by_email(
+        db_session: AsyncSession,
         email: str,
         gql: bool = True,
     ) -> Optional[Employer_gql | Employer_sql]:
-        result = Employer_sql.get_all(
-            db_session=db_session,
-            filter_by_attrs={"contact_email": email},
-        )
+        if gql:
+            rows = await Employer_sql.get_where_equal(
+                db_session,
+                get_gql_field_names(Employer_gql),
+                rows=True,
+                contact_email=email,
+            )
+            result = rows_to_gql(Employer_gql, rows)
+        else:
+            result = await Employer_sql.get_where_equal(
+                db_session,
+                contact_email=email,
+            )
 
-        if len(result) == 0:
-            return None
-        elif gql:
-            return employer_to_gql(result[0])
-        return result[0]
+        return result[0] if len(result) > 0 else None
 
     @staticmethod
-    def get_employers_by_ids(
-        db_session: Session,
+    async def get_employers_by_ids(
+        db_session: AsyncSession,
         employer_ids: List[int],
-    ) -> List[Employer_sql]:
-        return Employer_sql.get_all(
-            db_session=db_session,
-            filter_by_attrs={"id": employer_ids},
+        columns: Optional[Tuple[str, ...]] = None,
+        gql: bool = False,
+    ) -> List[Employer_gql | Employer_sql]:
+        if gql:
+            rows = await Employer_sql.get_where_in(
+                db_session,
+                "id",
+                employer_ids,
+                columns or get_gql_field_names(Employer_gql),
+                rows=True,
+            )
+            return rows_to_gql(Employer_gql, rows)
+        return await Employer_sql.get_where_in(
+            db_session,
+            "id",
+            employer_ids,
+            columns,
+        )
+
+    @staticmethod
+    async def add_employer(
+        db_session: AsyncSession,
+        name: str,
+        contact_email: str,
+        industry: str,
+    ) -> Employer_gql:
+        """
+        Inserts the employer with one statement, which skips it if the email
+        is taken (ix_employers_contact_email).
+        """
+        rows = await Employer_sql.insert_many(
+            db_session,
+            [dict(name=name, contact_email=contact_email, industry=industry)],
+            ("contact_email",),
+        )
+        if not rows:
+            raise GraphQLError(EMPLOYER_ALREADY_EXISTS)
+
+        await db_session.commit()
+        return rows_to_gql(Employer_gql, rows)[0]
+
+    @staticmethod
+    async def add_employers(
+        db_session: AsyncSession, employers: List[dict]
+    ) -> BulkResult[Employer_gql]:
+        """
+        Validates the employers' values (one query for all emails), then
+        inserts the valid employers with multi-row INSERT ... RETURNING
+        statements, in one transaction.
+        Employers whose email was taken concurrently are skipped by the insert,
+        and reported as already existing.
+        """
+        emails = [employer["contact_email"] for employer in employers]
+        email_rows = await Employer_sql.get_where_in(
+            db_session, "contact_email", emails, ("contact_email",), rows=True
+        )
+        taken_emails = {row.contact_email for row in email_rows}
+
+        valid_employers = []
+        errors = []
+        for index, employer in enumerate(employers):
+            too_long_attrs = Employer_sql.get_too_long_attrs(employer)
+            if too_long_attrs:
+                message = get_too_long_message(too_long_attrs)
+            elif employer["contact_email"] in taken_emails:
+                message = EMPLOYER_ALREADY_EXISTS
+            else:
+                taken_emails.add(employer["contact_email"])
+                valid_employers.append((index, employer))
+                continue
+            errors.append(ItemError(index=index, message=message))
+
+        rows = await Employer_sql.insert_many(
+            db_session,
+            [employer for _, employer in valid_employers],
+            ("contact_email",),
+        )
+        await db_session.commit()
+
+        rows_by_email = {row.contact_email: row for row in rows}
+        created_rows = []
+        for index, employer in valid_employers:
+            row = rows_by_email.get(employer["contact_email"])
+            if row is None:
+                errors.append(ItemError(index=index, message=EMPLOYER_ALREADY_EXISTS))
+            else:
+                created_rows.append(row)
+        errors.sort(key=lambda error: error.index)
+
+        return BulkResult(
+            created=rows_to_gql(Employer_gql, created_rows), errors=errors
         )
+
+    @staticmethod
+    async def update_employer(
+        db_session: AsyncSession,
+        employer_id: int,
+        name: Optional[str] = None,
+        contact_email: Optional[str] = None,
+        industry: Optional[str] = None,
+    ) -> Employer_gql:
+        """
+        Updates only the given fields, with one UPDATE ... RETURNING.
+        """
+        values = dict(name=name, contact_email=contact_email, industry=industry)
+        values = {name: value for name, value in values.items() if value is not None}
+        if not values:
+            employer = await EmployerRepository.get_employer_by_id(
+                db_session, employer_id, gql=True
+            )
+            if employer is None:
+                raise ResourceNotFound("Employer")
+            return employer
+
+        try:
+            row = await Employer_sql.update_by_id(db_session, employer_id, **values)
+        except IntegrityError:
+            # contact_email belongs to another employer
+            # (ix_employers_contact_email).
+            await db_session.rollback()
+            raise GraphQLError(EMPLOYER_ALREADY_EXISTS)
+        if row is None:
+            raise ResourceNotFound("Employer")
+
+        await db_session.commit()
+        return rows_to_gql(Employer_gql, [row])[0]
+
+    @staticmethod
+    async def delete_employer(db_session: AsyncSession, employer_id: int) -> bool:
+        # The employer's jobs and their applications are deleted by the
+        # database.
+        if not await Employer_sql.delete_where(db_session, id=employer_id):
+            raise ResourceNotFound("Employer")
+
+        await db_session.commit()
+        return True
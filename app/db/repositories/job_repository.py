@@ -1,110 +1,235 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.db.models import Job as Job_sql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+from app.db.models import Employer as Employer_sql, Job as Job_sql
 from app.gql.types import Job_gql
+from app.gql.pagination import Page
+from app.gql.bulk import BulkResult, ItemError, get_too_long_message
 from app.errors.custom_errors import ResourceNotFound
-from app.sql_to_gql import job_to_gql
+from app.sql_to_gql import get_gql_field_names, job_to_gql, rows_to_gql
 
 
 class JobRepository:
+    # With gql=True, the read methods run Core selects and build Job_gql
+    # objects straight from the rows, without ORM instances.
+
     @staticmethod
-    def get_all_jobs(db_session: Session, gql: bool = False) -> List[Job_gql | Job_sql]:
-        jobs = Job_sql.get_all(db_session)
+    async def get_all_jobs(
+        db_session: AsyncSession,
+        gql: bool = False,
+        columns: Optional[Tuple[str, ...]] = None,
+    ) -> List[Job_gql | Job_sql]:
         if gql:
-            return [job_to_gql(job) for job in jobs]
-        return jobs
+            rows = await Job_sql.get_all(
+                db_session, columns or get_gql_field_names(Job_gql), rows=True
+            )
+            return rows_to_gql(Job_gql, rows)
+        return await Job_sql.get_all(db_session, columns)
+
+    @staticmethod
+    async def get_jobs_page(
+        db_session: AsyncSession,
+        page: Page,
+        columns: Optional[Tuple[str, ...]] = None,
+    ) -> List[Job_gql]:
+        rows = await Job_sql.get_page(
+            db_session,
+            page.limit,
+            page.after,
+            page.before,
+            page.backwards,
+            columns or get_gql_field_names(Job_gql),
+            rows=True,
+        )
+        return rows_to_gql(Job_gql, rows)
 
     @staticmethod
-    def get_job_by_id(
-        db_session: Session,
+    async def get_job_by_id(
+        db_session: AsyncSession,
         id: int,
         gql: bool = False,
+        columns: Optional[Tuple[str, ...]] = None,
     ) -> Optional[Job_gql | Job_sql]:
-        jobs = Job_sql.get_all(
-            db_session=db_session,
-            filter_by_attrs={"id": id},
-        )
-
-        if len(jobs) == 0:
-            return None
-        elif gql:
-            return job_to_gql(jobs[0])
-        return jobs[0]
+        if gql:
+            rows = await Job_sql.get_where_equal(
+                db_session,
+                columns or get_gql_field_names(Job_gql),
+                rows=True,
+                id=id,
+            )
+            jobs = rows_to_gql(Job_gql, rows)
+        else:
+            jobs = await Job_sql.get_where_equal(
+                db_session,
+                columns,
+                id=id,
+            )
+
+        return jobs[0] if len(jobs) > 0 else None
 
     @staticmethod
-    def add_job(
-        db_session: Session, title: str, description: str, employer_id: int
+    async def add_job(
+        db_session: AsyncSession, title: str, description: str, employer_id: int
     ) -> Job_gql:
         job_sql = Job_sql(title=title, description=description, employer_id=employer_id)
         db_session.add(job_sql)
-        db_session.commit()
-        db_session.refresh(job_sql)
+        await db_session.commit()
+        await db_session.refresh(job_sql)
 
         return job_to_gql(job_sql)
 
     @staticmethod
-    def update_job(
-        db_session: Session,
-        job_id: int,
-        title: str,
-        description: str,
-        employer_id: int,
-    ):
-        # Retrieve the job object.
-        job_sql = JobRepository.get_job_by_id(
-            db_session=db_session,
-            id=job_id,
-            gql=False,
+    async def add_jobs(
+        db_session: AsyncSession, jobs: List[dict]
+    ) -> BulkResult[Job_gql]:
+        """
+        Validates the jobs' values (one query for all employers), then inserts
+        the valid jobs with multi-row INSERT ... RETURNING statements, in one
+        transaction.
+        """
+        employer_ids = list({job["employer_id"] for job in jobs})
+        employer_rows = await Employer_sql.get_where_in(
+            db_session, "id", employer_ids, ("id",), rows=True
         )
+        existing_employer_ids = {row.id for row in employer_rows}
+
+        valid_jobs = []
+        errors = []
+        for index, job in enumerate(jobs):
+            too_long_attrs = Job_sql.get_too_long_attrs(job)
+            if too_long_attrs:
+                message = get_too_long_message(too_long_attrs)
+            elif job["employer_id"] not in existing_employer_ids:
+                message = ResourceNotFound.get_message("Employer")
+            else:
+                valid_jobs.append(job)
+                continue
+            errors.append(ItemError(index=index, message=message))
+
+        rows = await Job_sql.insert_many(db_session, valid_jobs)
+        await db_session.commit()
+
+        return BulkResult(created=rows_to_gql(Job_gql, rows), errors=errors)
 
-        if not job_sql:
+    @staticmethod
+    async def update_job(
+        db_session: AsyncSession,
+        job_id: int,
+        title: Optional[str] = None,
+        description: Optional[str] = None,
+        employer_id: Optional[int] = None,
+    ) -> Job_gql:
+        """
+        Updates only the given fields, with one UPDATE ... RETURNING.
+        """
+        values = dict(title=title, description=description, employer_id=employer_id)
+        values = {name: value for name, value in values.items() if value is not None}
+        if not values:
+            job = await JobRepository.get_job_by_id(db_session, job_id, gql=True)
+            if job is None:
+                raise ResourceNotFound("Job")
+            return job
+
+        try:
+            row = await Job_sql.update_by_id(db_session, job_id, **values)
+        except IntegrityError:
+            # employer_id is not the id of an employer (jobs_employer_id_fkey).
+            await db_session.rollback()
+            raise ResourceNotFound("Employer")
+        if row is None:
             raise ResourceNotFound("Job")
 
-        if title is not None:
-            job_sql.title = title
+        await db_session.commit()
+        return rows_to_gql(Job_gql, [row])[0]
 
-        if description is not None:
-            job_sql.description = description
+    @staticmethod
+    async def delete_job(db_session: AsyncSession, job_id: int) -> bool:
+        # The job's applications are deleted by the database.
+        if not await Job_sql.delete_where(db_session, id=job_id):
+            raise ResourceNotFound("Job")
 
-        if employer_id is not None:
-            job_sql.employer_id = employer_id
+        await db_session.commit()
+        return True
 
-        db_session.commit()
-        db_session.refresh(job_sql)
-        return job_to_gql(job_sql)
+    @staticmethod
+    async def delete_jobs(
+        db_session: AsyncSession,
+        ids: Optional[List[int]] = None,
+        employer_id: Optional[int] = None,
+    ) -> int:
+        """
+        Deletes the jobs matching all the given filters with one statement,
+        and returns how many were deleted.
+        """
+        any_values = dict(id=ids) if ids is not None else dict()
+        attrs = dict(employer_id=employer_id) if employer_id is not None else dict()
+        deleted_ids = await Job_sql.delete_where(db_session, any_values, **attrs)
+        await db_session.commit()
+        return len(deleted_ids)
 
     @staticmethod
-    def delete_job(db_session: Session, job_id: int) -> bool:
-        job_sql = JobRepository.get_job_by_id(
+    async def get_jobs_by_employer_ids(
+        db_session: AsyncSession,
+        employer_ids: List[int],
+        columns: Optional[Tuple[str, ...]] = None,
+        gql: bool = False,
+    ) -> List[Job_gql | Job_sql]:
+        if gql:
+            rows = await Job_sql.get_where_in(
+                db_session,
+                "employer_id",
+                employer_ids,
+                columns or get_gql_field_names(Job_gql),
+                rows=True,
+            )
+            return rows_to_gql(Job_gql, rows)
+        return await Job_sql.get_where_in(
             db_session,
-            id=job_id,
-            gql=False,
+            "employer_id",
+            employer_ids,
+            columns,
         )
 
-        if not job_sql:
-            raise ResourceNotFound("Job")
-
-        db_session.delete(job_sql)
-        db_session.commit()
-
-        return True
-
     @staticmethod
-    def get_jobs_by_employer_ids(
-        db_session: Session,
+    async def get_first_jobs_by_employer_ids(
+        db_session: AsyncSession,
         employer_ids: List[int],
-    ) -> List[Job_sql]:
-        return Job_sql.get_all(
-            db_session=db_session,
-            filter_by_attrs={"employer_id": employer_ids},
+        first: int,
+        after: Optional[int] = None,
+        columns: Optional[Tuple[str, ...]] = None,
+    ) -> List[Job_gql]:
+        """
+        First jobs with id > after of each employer.
+        """
+        rows = await Job_sql.get_first_per_parent(
+            db_session,
+            "employer_id",
+            employer_ids,
+            first,
+            after,
+            columns or get_gql_field_names(Job_gql),
         )
+        return rows_to_gql(Job_gql, rows)
 
     @staticmethod
-    def get_jobs_by_ids(
-        db_session: Session,
+    async def get_jobs_by_ids(
+        db_session: AsyncSession,
         job_ids: List[int],
-    ) -> List[Job_sql]:
-        return Job_sql.get_all(
-            db_session=db_session,
-            filter_by_attrs={"id": job_ids},
+        columns: Optional[Tuple[str, ...]] = None,
+        gql: bool = False,
+    ) -> List[Job_gql | Job_sql]:
+        if gql:
+            rows = await Job_sql.get_where_in(
+                db_session,
+                "id",
+                job_ids,
+                columns or get_gql_field_names(Job_gql),
+                rows=True,
+            )
+            return rows_to_gql(Job_gql, rows)
+        return await Job_sql.get_where_in(
+            db_session,
+            "id",
+            job_ids,
+            columns,
         )
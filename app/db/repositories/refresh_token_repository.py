@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import RefreshToken as RefreshToken_sql, User as User_sql
+from graphql import GraphQLError
+from app.errors.error_messages import INVALID_REFRESH_TOKEN, REVOKED_TOKEN
+from app.settings.config import REFRESH_TOKEN_EXPIRATION_DAYS
+
+
+class RefreshTokenRepository:
+    # Tokens are stored and looked up by their hash only.
+
+    @staticmethod
+    async def add_refresh_token(
+        db_session: AsyncSession, user: User_sql, token_hash: str
+    ):
+        expires_at = datetime.now(timezone.utc) + timedelta(
+            days=REFRESH_TOKEN_EXPIRATION_DAYS
+        )
+        await RefreshToken_sql.insert_many(
+            db_session,
+            [
+                dict(
+                    user_id=user.id,
+                    token_hash=token_hash,
+                    token_version=user.token_version,
+                    expires_at=expires_at,
+                )
+            ],
+            columns=("id",),
+        )
+        await db_session.commit()
+
+    @staticmethod
+    async def rotate_refresh_token(
+        db_session: AsyncSession, token_hash: str, new_token_hash: str
+    ) -> User_sql:
+        """
+        Replaces the refresh token by a new one of the same user, and returns
+        the user.
+        The old token is deleted by the first statement, so it can only be
+        used once, even by concurrent requests.
+
+        Raises:
+            GraphQLError: If there is no such token (e.g. it has already been
+            used), it has expired, or the user's tokens have been revoked
+            since it was issued.
+        """
+        rows = await RefreshToken_sql.delete_where(
+            db_session,
+            columns=("user_id", "token_version", "expires_at"),
+            token_hash=token_hash,
+        )
+        if not rows or rows[0].expires_at <= datetime.now(timezone.utc):
+            # An expired token is deleted all the same.
+            await db_session.commit()
+            raise GraphQLError(INVALID_REFRESH_TOKEN)
+
+        user_id, token_version, _ = rows[0]
+        users = await User_sql.get_where_equal(db_session, id=user_id)
+        if not users or users[0].token_version != token_version:
+            await db_session.commit()
+            raise GraphQLError(REVOKED_TOKEN)
+
+        await RefreshTokenRepository.add_refresh_token(
+            db_session, users[0], new_token_hash
+        )
+        return users[0]
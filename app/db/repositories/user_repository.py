@@ -1,48 +1,178 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models import User as User_sql
-from typing import Optional, List
-from app.sql_to_gql import user_to_gql
+from typing import TYPE_CHECKING, Dict, Optional, List, Tuple
+from app.gql.pagination import Page
+from app.sql_to_gql import get_gql_field_names, rows_to_gql
+from graphql import GraphQLError
+from app.errors.error_messages import USER_ALREADY_EXISTS
+
+if TYPE_CHECKING:
+    from app.gql.types import User_gql
+
+
+def get_user_gql():
+    # Imported on use, since app.gql.types imports this module (through
+    # app.auth.auth_utils).
+    from app.gql.types import User_gql
+
+    return User_gql
 
 
 class UserRepository:
+    # With gql=True, the read methods run Core selects and build User_gql
+    # objects straight from the rows, without ORM instances (nor password
+    # hashes).
+
     @staticmethod
-    def get_user_by_email(db_session: Session, email: str) -> Optional[User_sql]:
-        user = User_sql.get_all(
-            db_session=db_session,
-            filter_by_attrs={"email": email},
+    async def get_user_by_email(
+        db_session: AsyncSession, email: str
+    ) -> Optional[User_sql]:
+        user = await User_sql.get_where_equal(
+            db_session,
+            email=email,
         )
         return user[0] if len(user) > 0 else None
 
     @staticmethod
-    def get_all_users(db_session: Session, gql: bool = True) -> List[User_sql]:
-        users = User_sql.get_all(db_session)
+    async def update_password_hash(
+        db_session: AsyncSession, user_id: int, password_hash: str
+    ):
+        await User_sql.update_by_id(db_session, user_id, password_hash=password_hash)
+        await db_session.commit()
+
+    @staticmethod
+    async def revoke_tokens(db_session: AsyncSession, user_id: int) -> Optional[int]:
+        """
+        Revokes all the tokens issued to the user so far, by incrementing
+        their token version. Returns the new version, or None if there is no
+        such user.
+        """
+        token_version = await User_sql.increment_by_id(
+            db_session, user_id, "token_version"
+        )
+        await db_session.commit()
+        return token_version
+
+    @staticmethod
+    async def get_revoked_token_versions(db_session: AsyncSession) -> Dict[int, int]:
+        """
+        Returns the token versions of the users whose tokens have been revoked
+        at least once, by id. Other users' tokens have version 0.
+        """
+        rows = await User_sql.get_where_positive(db_session, "token_version")
+        return dict(rows)
+
+    @staticmethod
+    async def add_user(
+        db_session: AsyncSession,
+        username: str,
+        email: str,
+        password_hash: str,
+        role: str,
+    ) -> "User_gql":
+        """
+        Inserts the user with one statement, which skips it if the email is
+        taken (ix_users_email), so concurrent sign-ups can't both succeed.
+        """
+        User_gql = get_user_gql()
+        rows = await User_sql.insert_many(
+            db_session,
+            [
+                dict(
+                    username=username,
+                    email=email,
+                    password_hash=password_hash,
+                    role=role,
+                )
+            ],
+            ("email",),
+            get_gql_field_names(User_gql),
+        )
+        if not rows:
+            raise GraphQLError(USER_ALREADY_EXISTS)
+
+        await db_session.commit()
+        return rows_to_gql(User_gql, rows)[0]
+
+    @staticmethod
+    async def get_all_users(
+        db_session: AsyncSession,
+        gql: bool = True,
+        columns: Optional[Tuple[str, ...]] = None,
+    ) -> List["User_gql | User_sql"]:
         if gql:
-            return list(map(user_to_gql, users))
-        return users
+            rows = await User_sql.get_all(
+                db_session, columns or get_gql_field_names(get_user_gql()), rows=True
+            )
+            return rows_to_gql(get_user_gql(), rows)
+        return await User_sql.get_all(db_session, columns)
+
+    @staticmethod
+    async def get_users_page(
+        db_session: AsyncSession,
+        page: Page,
+        columns: Optional[Tuple[str, ...]] = None,
+        id: Optional[int] = None,
+    ) -> List["User_gql"]:
+        """
+        Page of all users, or only of the user with the given id.
+        """
+        attrs = dict(id=id) if id is not None else dict()
+        rows = await User_sql.get_page(
+            db_session,
+            page.limit,
+            page.after,
+            page.before,
+            page.backwards,
+            columns or get_gql_field_names(get_user_gql()),
+            rows=True,
+            **attrs,
+        )
+        return rows_to_gql(get_user_gql(), rows)
 
     @staticmethod
-    def get_user_by_id(
-        db_session: Session,
+    async def get_user_by_id(
+        db_session: AsyncSession,
         id: int,
         gql: bool = True,
-    ) -> Optional[User_sql]:
-        users = User_sql.get_all(
-            db_session=db_session,
-            filter_by_attrs={"id": id},
-        )
+        columns: Optional[Tuple[str, ...]] = None,
+    ) -> Optional["User_gql | User_sql"]:
+        if gql:
+            rows = await User_sql.get_where_equal(
+                db_session,
+                columns or get_gql_field_names(get_user_gql()),
+                rows=True,
+                id=id,
+            )
+            users = rows_to_gql(get_user_gql(), rows)
+        else:
+            users = await User_sql.get_where_equal(
+                db_session,
+                columns,
+                id=id,
+            )
 
-        if len(users) == 0:
-            return None
-        elif gql:
-            return user_to_gql(users[0])
-        return users[0]
+        return users[0] if len(users) > 0 else None
 
     @staticmethod
-    def get_users_by_ids(
-        db_session: Session,
+    async def get_users_by_ids(
+        db_session: AsyncSession,
         user_ids: List[int],
-    ) -> List[User_sql]:
-        return User_sql.get_all(
-            db_session=db_session,
-            filter_by_attrs={"id": user_ids},
+        columns: Optional[Tuple[str, ...]] = None,
+        gql: bool = False,
+    ) -> List["User_gql | User_sql"]:
+        if gql:
+            rows = await User_sql.get_where_in(
+                db_session,
+                "id",
+                user_ids,
+                columns or get_gql_field_names(get_user_gql()),
+                rows=True,
+            )
+            return rows_to_gql(get_user_gql(), rows)
+        return await User_sql.get_where_in(
+            db_session,
+            "id",
+            user_ids,
+            columns,
         )
@@ -0,0 +1,48 @@
+import time
+from threading import Lock
+from typing import Dict, Hashable
+from app.settings.config import READ_YOUR_WRITES_WINDOW_SECONDS
+
+
+class WriteTracker:
+    """
+    Remembers when each caller last wrote to the primary, so that their
+    reads can stick to the primary until the replica has caught up.
+    Kept in process memory, so it only covers the caller's requests served by
+    the same worker.
+    """
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._last_write_times: Dict[Hashable, float] = dict()
+        self._last_prune_time = time.monotonic()
+        self._lock = Lock()
+
+    def record_write(self, caller: Hashable):
+        now = time.monotonic()
+        with self._lock:
+            self._last_write_times[caller] = now
+            # Expired callers are forgotten at most once per window, so that
+            # writes don't scan all callers.
+            if now - self._last_prune_time >= self.window_seconds:
+                self._prune(now)
+                self._last_prune_time = now
+
+    def wrote_recently(self, caller: Hashable) -> bool:
+        with self._lock:
+            last_write_time = self._last_write_times.get(caller)
+        if last_write_time is None:
+            return False
+        return time.monotonic() - last_write_time < self.window_seconds
+
+    def _prune(self, now: float):
+        expired = [
+            caller
+            for caller, last_write_time in self._last_write_times.items()
+            if now - last_write_time >= self.window_seconds
+        ]
+        for caller in expired:
+            del self._last_write_times[caller]
+
+
+write_tracker = WriteTracker(window_seconds=READ_YOUR_WRITES_WINDOW_SECONDS)
@@ -0,0 +1,115 @@
+"""
+Loads the sample data of app/db/data.py into the database configured in
+settings, after bringing its schema up to date.
+Usage: python -m app.db.seed [--reset]
+
+Nothing is loaded if the database already has users or employers, so the
+command can be rerun safely. With --reset, all tables are dropped and
+recreated first, and all their data is lost.
+"""
+
+import argparse
+import asyncio
+import sys
+from functools import cache
+from typing import List
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from app.auth.auth_utils import hash_password
+from app.db.data import APPLICATIONS_DATA, EMPLOYERS_DATA, JOBS_DATA, USERS_DATA
+from app.db.database import engine, prepare_database
+from app.db.migrations.runner import MIGRATIONS_TABLE
+from app.db.models import (
+    Application as Application_sql,
+    Base,
+    Employer as Employer_sql,
+    Job as Job_sql,
+    User as User_sql,
+)
+
+
+@cache
+def get_sample_password_hash(password: str) -> str:
+    """
+    Argon2 hashes are deliberately slow (~0.2s each), so each sample password
+    is hashed once per process. The sample data is loaded by the seed command
+    and, for the tests, once into each new template database (see
+    app/tests/databases.py), not for every test.
+    """
+    return hash_password(password)
+
+
+async def load_sample_data(session: AsyncSession):
+    """
+    Inserts the sample data with one multi-row INSERT per table, in order,
+    so that the objects get the ids that the data refers to.
+    """
+    users = [
+        {
+            "username": user["username"],
+            "email": user["email"],
+            "password_hash": get_sample_password_hash(user["password"]),
+            "role": user["role"],
+        }
+        for user in USERS_DATA
+    ]
+    for model, rows in (
+        (Employer_sql, EMPLOYERS_DATA),
+        (Job_sql, JOBS_DATA),
+        (User_sql, users),
+        (Application_sql, APPLICATIONS_DATA),
+    ):
+        await session.execute(insert(model), rows)
+
+
+async def drop_database(engine: AsyncEngine):
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.execute(text(f"DROP TABLE IF EXISTS {MIGRATIONS_TABLE}"))
+
+
+async def seed_database(engine: AsyncEngine, reset: bool = False) -> bool:
+    """
+    Returns whether the sample data has been loaded.
+    """
+    if reset:
+        await drop_database(engine)
+    await prepare_database(engine)
+
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    async with sessionmaker() as session:
+        for model in (User_sql, Employer_sql):
+            if await model.get_page(session, limit=1, columns=("id",), rows=True):
+                return False
+
+        await load_sample_data(session)
+        await session.commit()
+    return True
+
+
+async def main(args: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.db.seed",
+        description="Loads the sample data into an empty database.",
+    )
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="Drop all tables (and their data) first.",
+    )
+    args = parser.parse_args(args)
+
+    try:
+        seeded = await seed_database(engine, args.reset)
+    finally:
+        await engine.dispose()
+
+    if seeded:
+        print("Loaded the sample data.")
+    else:
+        print("The database already has data, nothing was loaded.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(sys.argv[1:])))
@@ -0,0 +1,462 @@
+from typing import Callable, Dict, Hashable, Optional, Tuple
+from sqlalchemy import (
+    Delete,
+    Insert,
+    Select,
+    Update,
+    bindparam,
+    delete,
+    event,
+    exists,
+    func,
+    select,
+    true,
+    tuple_,
+    update,
+)
+from sqlalchemy.orm import load_only
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+
+
+def get_hit_rate(hits: int, misses: int) -> float:
+    total = hits + misses
+    return hits / total if total > 0 else 0.0
+
+
+class StatementCache:
+    """
+    Statements built once per (model, access pattern), with bound parameters.
+    Repository calls skip Python-side statement construction, and each access
+    pattern always maps to the same entry of SQLAlchemy's compiled SQL cache.
+    """
+
+    def __init__(self):
+        self._statements: Dict[Hashable, Select] = dict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, build: Callable[[], Select]) -> Select:
+        statement = self._statements.get(key)
+        if statement is None:
+            self.misses += 1
+            statement = build()
+            self._statements[key] = statement
+        else:
+            self.hits += 1
+        return statement
+
+    def stats(self) -> dict:
+        return {
+            "statements": len(self._statements),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": get_hit_rate(self.hits, self.misses),
+        }
+
+
+class CompiledCacheStats:
+    """
+    Counts whether executed statements were found in SQLAlchemy's compiled
+    SQL cache, or had to be compiled.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def listen(self, engine: Engine):
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _after_cursor_execute(self, conn, cursor, statement, params, context, many):
+        if context is None:
+            return
+        if context.cache_hit == CACHE_HIT:
+            self.hits += 1
+        elif context.cache_hit == CACHE_MISS:
+            self.misses += 1
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": get_hit_rate(self.hits, self.misses),
+        }
+
+
+statement_cache = StatementCache()
+compiled_cache_stats = CompiledCacheStats()
+
+
+def select_model(
+    model,
+    columns: Optional[Tuple[str, ...]] = None,
+    rows: bool = False,
+) -> Select:
+    """
+    Selects model objects, with only the given columns loaded
+    (all columns if None). The primary key is always loaded.
+    With rows, selects plain rows of the given columns from the model's table
+    instead (Core select, no ORM instances).
+    """
+    if rows:
+        table = model.__table__
+        if columns is None:
+            return select(table)
+        return select(*[table.c[column] for column in columns])
+
+    statement = select(model)
+    if columns is not None:
+        statement = statement.options(
+            load_only(*[getattr(model, column) for column in columns])
+        )
+    return statement
+
+
+def select_all(
+    model,
+    columns: Optional[Tuple[str, ...]] = None,
+    rows: bool = False,
+) -> Select:
+    return statement_cache.get(
+        (model, "all", columns, rows),
+        lambda: select_model(model, columns, rows),
+    )
+
+
+def select_where_equal(
+    model,
+    *attr_names: str,
+    columns: Optional[Tuple[str, ...]] = None,
+    rows: bool = False,
+) -> Select:
+    """
+    Rows whose attrs are equal to the parameters named after them,
+    e.g. by-id: select_where_equal(Job, "id") with {"id": 1}.
+    """
+
+    def build() -> Select:
+        statement = select_model(model, columns, rows)
+        for attr_name in attr_names:
+            statement = statement.where(
+                getattr(model, attr_name) == bindparam(attr_name)
+            )
+        return statement
+
+    return statement_cache.get((model, "equal", attr_names, columns, rows), build)
+
+
+def select_where_in(
+    model,
+    attr_name: str,
+    columns: Optional[Tuple[str, ...]] = None,
+    rows: bool = False,
+) -> Select:
+    """
+    Rows whose attr is one of the values of the "values" list parameter,
+    e.g. by-ids or by-fk-ids.
+    """
+    return statement_cache.get(
+        (model, "in", attr_name, columns, rows),
+        lambda: select_model(model, columns, rows).where(
+            getattr(model, attr_name).in_(bindparam("values", expanding=True))
+        ),
+    )
+
+
+def select_where_tuple_in(
+    model,
+    *attr_names: str,
+    columns: Optional[Tuple[str, ...]] = None,
+    rows: bool = False,
+) -> Select:
+    """
+    Rows whose (attr_1, attr_2, ...) is one of the keys (by-composite-key).
+    The keys are bound as one array parameter per attr, named
+    "<attr_name>_values", and unnested into rows. Unlike a tuple IN list or
+    an OR of ANDs, the SQL is the same for any number of keys, so it is
+    compiled (and planned, once prepared) only once.
+    """
+
+    def build() -> Select:
+        key_columns = [getattr(model, attr_name) for attr_name in attr_names]
+        keys = (
+            func.unnest(
+                *[
+                    bindparam(f"{attr_name}_values", type_=ARRAY(column.type))
+                    for attr_name, column in zip(attr_names, key_columns)
+                ]
+            )
+            .table_valued(*attr_names)
+            .render_derived(name="keys")
+        )
+        return select_model(model, columns, rows).where(
+            tuple_(*key_columns).in_(select(*[keys.c[name] for name in attr_names]))
+        )
+
+    return statement_cache.get(
+        (model, "tuple_in", attr_names, columns, rows),
+        build,
+    )
+
+
+def select_page(
+    model,
+    *attr_names: str,
+    columns: Optional[Tuple[str, ...]] = None,
+    rows: bool = False,
+    after: bool = False,
+    before: bool = False,
+    backwards: bool = False,
+) -> Select:
+    """
+    Keyset page ordered by id: rows whose attrs are equal to the parameters
+    named after them, with id > :after (if after) and id < :before
+    (if before), at most :limit of them.
+    Backwards pages are the last :limit rows, in descending id order.
+    """
+
+    def build() -> Select:
+        statement = select_model(model, columns, rows)
+        for attr_name in attr_names:
+            statement = statement.where(
+                getattr(model, attr_name) == bindparam(attr_name)
+            )
+        if after:
+            statement = statement.where(model.id > bindparam("after"))
+        if before:
+            statement = statement.where(model.id < bindparam("before"))
+        order_by = model.id.desc() if backwards else model.id.asc()
+        return statement.order_by(order_by).limit(bindparam("limit"))
+
+    return statement_cache.get(
+        (model, "page", attr_names, columns, rows, after, before, backwards),
+        build,
+    )
+
+
+def select_first_per_parent(
+    model,
+    parent_attr_name: str,
+    columns: Optional[Tuple[str, ...]] = None,
+    after: bool = False,
+) -> Select:
+    """
+    Rows (not ORM objects) of the first :limit children of each parent in
+    the "parent_values" array parameter, in id order, with id > :after
+    (if after).
+    Each parent's children are selected by a LATERAL subquery, so the page
+    of every parent is read with one (parent_attr, id) index range scan, and
+    all parents are still loaded by one statement.
+    """
+
+    def build() -> Select:
+        parent_column = getattr(model, parent_attr_name)
+        parents = (
+            func.unnest(bindparam("parent_values", type_=ARRAY(parent_column.type)))
+            .table_valued("value")
+            .render_derived(name="parents")
+        )
+        children = select_model(model, columns, rows=True).where(
+            parent_column == parents.c.value
+        )
+        if after:
+            children = children.where(model.id > bindparam("after"))
+        children = (
+            children.order_by(model.id).limit(bindparam("limit")).lateral("children")
+        )
+        return select(children).select_from(parents).join(children, true())
+
+    return statement_cache.get(
+        (model, "first_per_parent", parent_attr_name, columns, after),
+        build,
+    )
+
+
+def select_ids_by_key(model, attr_name: str) -> Select:
+    """
+    (attr, id) rows of the objects whose attr is in the "values" array
+    parameter. Unlike select_where_in, the values are sent as one array
+    parameter, so any number of them can be looked up at once.
+    """
+
+    def build() -> Select:
+        column = getattr(model, attr_name)
+        values = bindparam("values", type_=ARRAY(column.type))
+        return select(column, model.id).where(column == func.any(values))
+
+    return statement_cache.get((model, "ids_by_key", attr_name), build)
+
+
+def insert_returning(
+    model,
+    *conflict_attr_names: str,
+    columns: Optional[Tuple[str, ...]] = None,
+) -> Insert:
+    """
+    Insert of model rows, returning the given columns (all if None). When
+    executed with a list of rows, it is sent as multi-row INSERT ... VALUES
+    statements.
+    With conflict_attr_names, rows which conflict with existing ones on
+    these (unique) attrs are skipped and not returned. Otherwise, rows are
+    returned in the order of the parameters.
+    """
+
+    def build() -> Insert:
+        table = model.__table__
+        returned = [table.c[name] for name in columns] if columns else table.c
+        statement = insert(table)
+        if conflict_attr_names:
+            return statement.on_conflict_do_nothing(
+                index_elements=list(conflict_attr_names)
+            ).returning(*returned)
+        return statement.returning(*returned, sort_by_parameter_order=True)
+
+    return statement_cache.get(
+        (model, "insert", conflict_attr_names, columns),
+        build,
+    )
+
+
+def insert_if_parent_exists(
+    model,
+    parent_attr_name: str,
+    *attr_names: str,
+    conflict_attr_names: Tuple[str, ...] = (),
+) -> Select:
+    """
+    Inserts a model object whose parent_attr (a foreign key) is the
+    parameter of the same name, and whose attrs are the parameters of the
+    same names, if the parent exists. The object is skipped if it conflicts
+    with an existing one on conflict_attr_names.
+    Selects (parent_exists, id), with a NULL id if nothing was inserted, so
+    that the caller can tell why in the same round trip.
+    """
+
+    def build() -> Select:
+        table = model.__table__
+        parent_column = next(iter(table.c[parent_attr_name].foreign_keys)).column
+        parent = (
+            select(parent_column)
+            .where(
+                parent_column
+                == bindparam(parent_attr_name, type_=table.c[parent_attr_name].type)
+            )
+            .cte("parent")
+        )
+        values = select(
+            *[bindparam(name, type_=table.c[name].type) for name in attr_names],
+            parent.c[parent_column.name],
+        )
+        inserted = (
+            insert(table)
+            .from_select([*attr_names, parent_attr_name], values)
+            .on_conflict_do_nothing(index_elements=list(conflict_attr_names))
+            .returning(table.c.id)
+            .cte("inserted")
+        )
+        return select(
+            exists(parent.select()).label("parent_exists"),
+            select(inserted.c.id).scalar_subquery().label("id"),
+        )
+
+    return statement_cache.get(
+        (
+            model,
+            "insert_if_parent_exists",
+            parent_attr_name,
+            attr_names,
+            conflict_attr_names,
+        ),
+        build,
+    )
+
+
+def delete_where(
+    model,
+    *attr_names: str,
+    any_attr_names: Tuple[str, ...] = (),
+    columns: Optional[Tuple[str, ...]] = None,
+) -> Delete:
+    """
+    Deletes the objects whose attrs are equal to the parameters of the same
+    names, and whose any_attrs are in the "<attr_name>_values" array
+    parameters, returning their ids (or the given columns).
+    Children are deleted by the database through the ON DELETE CASCADE
+    foreign keys, in the same statement, without being loaded.
+    """
+
+    def build() -> Delete:
+        table = model.__table__
+        statement = delete(model)
+        for name in attr_names:
+            statement = statement.where(
+                getattr(model, name) == bindparam(name, type_=table.c[name].type)
+            )
+        for name in any_attr_names:
+            values = bindparam(f"{name}_values", type_=ARRAY(table.c[name].type))
+            statement = statement.where(getattr(model, name) == func.any(values))
+        if columns:
+            return statement.returning(*(table.c[name] for name in columns))
+        return statement.returning(model.id)
+
+    return statement_cache.get(
+        (model, "delete", attr_names, any_attr_names, columns),
+        build,
+    )
+
+
+def update_by_id(model, *attr_names: str) -> Update:
+    """
+    Sets the attrs of the object with id :target_id to the
+    "new_<attr_name>" parameters (column names can't be used for parameters
+    of an UPDATE), returning all of its columns (no row if there is no such
+    object).
+    """
+
+    def build() -> Update:
+        table = model.__table__
+        return (
+            update(model)
+            .where(model.id == bindparam("target_id"))
+            .values(
+                {
+                    name: bindparam(f"new_{name}", type_=table.c[name].type)
+                    for name in attr_names
+                }
+            )
+            .returning(*table.c)
+        )
+
+    return statement_cache.get((model, "update", attr_names), build)
+
+
+def increment_by_id(model, attr_name: str) -> Update:
+    """
+    Adds one to the attr of the object with id :target_id, returning its new
+    value (no row if there is no such object).
+    """
+
+    def build() -> Update:
+        column = getattr(model, attr_name)
+        return (
+            update(model)
+            .where(model.id == bindparam("target_id"))
+            .values({attr_name: column + 1})
+            .returning(column)
+        )
+
+    return statement_cache.get((model, "increment", attr_name), build)
+
+
+def select_where_positive(model, attr_name: str) -> Select:
+    """
+    (id, attr) rows of the objects whose attr is positive.
+    """
+
+    def build() -> Select:
+        column = getattr(model, attr_name)
+        return select(model.id, column).where(column > 0)
+
+    return statement_cache.get((model, "positive", attr_name), build)
@@ -0,0 +1,48 @@
+import json
+from typing import AsyncIterator, List
+from sqlalchemy import Row, Select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def stream_row_batches(
+    sessionmaker: async_sessionmaker,
+    statement: Select,
+    batch_size: int,
+) -> AsyncIterator[List[Row]]:
+    """
+    Fetches the rows of statement from a server-side cursor, batch_size rows
+    at a time, so only one batch is held in memory.
+    The session is owned by the stream (and closed when it ends), since the
+    response is sent after the request's dependencies have been cleaned up.
+    """
+    async with sessionmaker() as session:
+        result = await session.stream(statement)
+        async for batch in result.partitions(batch_size):
+            yield batch
+
+
+def row_to_json(row: Row) -> str:
+    return json.dumps(dict(row._mapping))
+
+
+async def stream_ndjson(batches: AsyncIterator[List[Row]]) -> AsyncIterator[str]:
+    """
+    One JSON object per line, one chunk per batch.
+    """
+    async for batch in batches:
+        yield "".join(f"{row_to_json(row)}\n" for row in batch)
+
+
+async def stream_json_array(
+    batches: AsyncIterator[List[Row]],
+) -> AsyncIterator[str]:
+    """
+    A JSON array of objects, one chunk per batch.
+    """
+    separator = "["
+    async for batch in batches:
+        yield separator + ",".join(row_to_json(row) for row in batch)
+        separator = ","
+    yield "]" if separator == "," else "[]"
@@ -2,9 +2,17 @@ EXPIRED_TOKEN = "Token has expired."
 INVALID_AUTHORIZATION_HEADER = "Authorization header missing or invalid."
 INVALID_PASSWORD = "Invalid password."
 INVALID_TOKEN = "Token is invalid."
+REVOKED_TOKEN = "Token has been revoked."
+INVALID_REFRESH_TOKEN = "Refresh token is invalid, expired or already used."
 INVALID_ROLE = "The provided role is invalid."
 USER_ALREADY_EXISTS = "User with that email already exists."
 EMPLOYER_ALREADY_EXISTS = "Employer with that email already exists."
 INSUFFICIENT_PRIVILEGES = "You do not have permission to perform this action."
 MISSING_CONTEXT = "Strawberry context is missing."
 ALREADY_APPLIED = "You already have an application for this job."
+INVALID_CURSOR = "Cursor is invalid."
+INVALID_PAGE_SIZE = "first and last must be between 0 and the maximum page size."
+FIRST_AND_LAST = "first and last can't be used together."
+TOO_MANY_ITEMS = "Too many items in one batch."
+VALUE_TOO_LONG = "Value too long for: {fields}."
+EMPTY_FILTER = "At least one filter must be provided."
@@ -1,24 +1,27 @@
 from strawberry.dataloader import DataLoader
-from typing import List, Tuple
-from sqlalchemy.orm import Session
-from app.db.models import Application as Application_sql
+from typing import List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.gql.types import Application_gql
 from app.db.repositories.application_repository import ApplicationRepository
 from collections import defaultdict
 
 
 class UserApplicationsFromJobLoader(DataLoader):
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: AsyncSession):
         super().__init__(load_fn=self.batch_load_fn)
         self.db_session = db_session
 
     async def batch_load_fn(
         self,
         job_user_id_tuples: List[Tuple[int, int]],
-    ) -> List[Application_sql]:
+    ) -> List[Application_gql]:
 
-        applications = ApplicationRepository.get_all_applications_from_job_user_ids(
-            self.db_session,
-            job_user_id_tuples,
+        applications = (
+            await ApplicationRepository.get_all_applications_from_job_user_ids(
+                self.db_session,
+                job_user_id_tuples,
+                gql=True,
+            )
         )
 
         # Return in correct order.
@@ -29,14 +32,27 @@ class UserApplicationsFromJobLoader(DataLoader):
 
 
 class AllApplicationsFromJobLoader(DataLoader):
-    def __init__(self, db_session: Session):
+    """
+    First applications (with id > after) of each job.
+    """
+
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        first: int,
+        after: Optional[int] = None,
+    ):
         super().__init__(load_fn=self.batch_load_fn)
         self.db_session = db_session
+        self.first = first
+        self.after = after
 
-    async def batch_load_fn(self, job_ids: List[int]) -> List[List[Application_sql]]:
-        applications = ApplicationRepository.get_applications_from_job_ids(
+    async def batch_load_fn(self, job_ids: List[int]) -> List[List[Application_gql]]:
+        applications = await ApplicationRepository.get_first_applications_from_job_ids(
             self.db_session,
             job_ids,
+            self.first,
+            self.after,
         )
 
         # Return in correct order.
@@ -48,13 +64,27 @@ class AllApplicationsFromJobLoader(DataLoader):
 
 
 class AllApplicationsFromUserLoader(DataLoader):
-    def __init__(self, db_session: Session):
+    """
+    First applications (with id > after) of each user.
+    """
+
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        first: int,
+        after: Optional[int] = None,
+    ):
         super().__init__(load_fn=self.batch_load_fn)
         self.db_session = db_session
+        self.first = first
+        self.after = after
 
-    async def batch_load_fn(self, user_ids: List[int]) -> List[List[Application_sql]]:
-        applications = ApplicationRepository.get_applications_from_user_ids(
-            self.db_session, user_ids
+    async def batch_load_fn(self, user_ids: List[int]) -> List[List[Application_gql]]:
+        applications = await ApplicationRepository.get_first_applications_from_user_ids(
+            self.db_session,
+            user_ids,
+            self.first,
+            self.after,
         )
 
         # Return in correct order.
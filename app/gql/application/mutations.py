@@ -1,18 +1,38 @@
 import strawberry
 from strawberry.types import Info
+from typing import List
 from app.auth.roles import Role
 from app.auth.auth_utils import require_role
 from app.db.repositories.application_repository import ApplicationRepository
+from app.gql.bulk import BulkResult, validate_batch_size
+from app.gql.types import Application_gql
 
 
 @strawberry.type
 class ApplicationMutation:
     @strawberry.mutation
     @require_role([Role.USER])
-    def apply_to_job(self, job_id: int, info: Info) -> bool:
+    async def apply_to_job(self, job_id: int, info: Info) -> bool:
         user = info.context["user"]
         db_session = info.context["db_session"]
 
-        return ApplicationRepository.create_application(
+        return await ApplicationRepository.create_application(
             db_session=db_session, user_id=user.id, job_id=job_id
         )
+
+    @strawberry.mutation
+    @require_role([Role.USER])
+    async def apply_to_jobs(
+        self, job_ids: List[int], info: Info
+    ) -> BulkResult[Application_gql]:
+        """
+        Applies to all the given jobs in one transaction, and reports an error
+        for each job which doesn't exist or has already been applied to.
+        """
+        validate_batch_size(job_ids)
+        user = info.context["user"]
+        db_session = info.context["db_session"]
+
+        return await ApplicationRepository.create_applications(
+            db_session=db_session, user_id=user.id, job_ids=job_ids
+        )
@@ -1,6 +1,7 @@
 import strawberry
-from typing import List
+from typing import Optional
 from strawberry.types import Info
+from app.gql.pagination import Connection, Page
 from app.gql.types import Application_gql
 from app.auth.auth_utils import require_role
 from app.auth.roles import Role
@@ -11,13 +12,24 @@ from app.db.repositories.application_repository import ApplicationRepository
 class ApplicationQuery:
     @strawberry.field
     @require_role([Role.USER, Role.ADMIN])
-    def applications(self, info: Info) -> List[Application_gql]:
+    async def applications(
+        self,
+        info: Info,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None,
+    ) -> Connection[Application_gql]:
+        page = Page.from_args(first, after, last, before)
         user = info.context["user"]
         db_session = info.context["db_session"]
 
         if user.role == Role.ADMIN:
-            return ApplicationRepository.get_all_applications(db_session, gql=True)
+            applications = await ApplicationRepository.get_applications_page(
+                db_session, page
+            )
         else:
-            return ApplicationRepository.get_all_applications_by_user_id(
-                db_session, user.id, gql=True
+            applications = await ApplicationRepository.get_applications_page(
+                db_session, page, user_id=user.id
             )
+        return page.to_connection(applications)
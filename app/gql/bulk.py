@@ -0,0 +1,34 @@
+import strawberry
+from typing import Generic, List, TypeVar
+from graphql import GraphQLError
+from app.errors.error_messages import TOO_MANY_ITEMS, VALUE_TOO_LONG
+from app.settings.config import MAX_BATCH_SIZE
+
+T = TypeVar("T")
+
+
+def validate_batch_size(items: list):
+    if len(items) > MAX_BATCH_SIZE:
+        raise GraphQLError(TOO_MANY_ITEMS)
+
+
+def get_too_long_message(attr_names: List[str]) -> str:
+    return VALUE_TOO_LONG.format(fields=", ".join(attr_names))
+
+
+@strawberry.type
+class ItemError:
+    # Position of the item in the mutation's input list.
+    index: int
+    message: str
+
+
+@strawberry.type
+class BulkResult(Generic[T]):
+    """
+    Objects created by a bulk mutation, in the order of their input items.
+    Items which could not be created are left out and reported in errors.
+    """
+
+    created: List[T]
+    errors: List[ItemError]
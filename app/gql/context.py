@@ -0,0 +1,77 @@
+import asyncio
+from typing import Any, Optional
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from strawberry.fastapi import BaseContext
+from .loaders import LoaderRegistry
+
+
+class RequestContext(BaseContext):
+    """
+    Strawberry context of a GraphQL request.
+    The db session and the DataLoaders are only created when a resolver first
+    needs them, so requests which are rejected before execution (or don't
+    touch the db) never check out a connection.
+    Supports dict-style access (info.context["db_session"]).
+    """
+
+    def __init__(
+        self,
+        sessionmaker: async_sessionmaker,
+        replica_sessionmaker: async_sessionmaker,
+    ):
+        super().__init__()
+        self.sessionmaker = sessionmaker
+        self.replica_sessionmaker = replica_sessionmaker
+
+        # Set by DatabaseRoutingExtension before execution.
+        self.use_replica = False
+
+        # Set by get_token_claims, once per request: the verified claims of
+        # the request's token, or the reason it was rejected.
+        self.claims_decoded = False
+        self.claims: Optional[dict] = None
+        self.claims_error: Optional[str] = None
+
+        # Set by authenticate, once per request: the user of the request's
+        # token, or the reason it couldn't be authenticated.
+        self.authenticated = False
+        self.user = None
+        self.auth_error: Optional[str] = None
+        self.auth_lock = asyncio.Lock()
+
+        # Filled by get_selected_columns.
+        self.selected_columns = dict()
+
+        self._db_session: Optional[AsyncSession] = None
+        self._loaders: Optional[LoaderRegistry] = None
+
+    @property
+    def db_session(self) -> AsyncSession:
+        if self._db_session is None:
+            if self.use_replica:
+                self._db_session = self.replica_sessionmaker()
+            else:
+                self._db_session = self.sessionmaker()
+        return self._db_session
+
+    @property
+    def loaders(self) -> LoaderRegistry:
+        if self._loaders is None:
+            self._loaders = LoaderRegistry(lambda: self.db_session)
+        return self._loaders
+
+    async def close(self):
+        if self._db_session is not None:
+            await self._db_session.close()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        setattr(self, key, value)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
@@ -1,22 +1,29 @@
 from strawberry.dataloader import DataLoader
-from typing import List
-from sqlalchemy.orm import Session
-from app.db.models import Employer as Employer_sql
+from typing import List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.gql.types import Employer_gql
 from app.db.repositories.employer_repository import EmployerRepository
 
 
 class EmployerFromJobsDataLoader(DataLoader):
-    def __init__(self, db_session: Session):
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        columns: Optional[Tuple[str, ...]] = None,
+    ):
         super().__init__(load_fn=self.batch_load_fn)
         self.db_session = db_session
+        self.columns = columns
 
     async def batch_load_fn(
         self,
         employer_ids: List[int],
-    ) -> List[Employer_sql]:
-        employers = EmployerRepository.get_employers_by_ids(
+    ) -> List[Employer_gql]:
+        employers = await EmployerRepository.get_employers_by_ids(
             db_session=self.db_session,
             employer_ids=employer_ids,
+            columns=self.columns,
+            gql=True,
         )
 
         id_to_employer = dict()
@@ -1,6 +1,9 @@
 import strawberry
 from strawberry.types import Info
-from typing import List, Optional
+from typing import Optional
+from app.db.models import Employer as Employer_sql
+from app.gql.pagination import Connection, Page
+from app.gql.selection import get_selected_columns
 from app.gql.types import Employer_gql
 from app.db.repositories.employer_repository import EmployerRepository
 
@@ -8,15 +11,29 @@ from app.db.repositories.employer_repository import EmployerRepository
 @strawberry.type
 class EmployerQuery:
     @strawberry.field
-    def employers(self, info: Info) -> List[Employer_gql]:
+    async def employers(
+        self,
+        info: Info,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None,
+    ) -> Connection[Employer_gql]:
+        page = Page.from_args(first, after, last, before)
         db_session = info.context["db_session"]
-        return EmployerRepository.get_all_employers(db_session, gql=True)
+        employers = await EmployerRepository.get_employers_page(
+            db_session,
+            page,
+            columns=get_selected_columns(info, Employer_sql, within=("edges", "node")),
+        )
+        return page.to_connection(employers)
 
     @strawberry.field
-    def employer(self, id: int, info: Info) -> Optional[Employer_gql]:
+    async def employer(self, id: int, info: Info) -> Optional[Employer_gql]:
         db_session = info.context["db_session"]
-        return EmployerRepository.get_employer_by_id(
+        return await EmployerRepository.get_employer_by_id(
             db_session,
             id,
             gql=True,
+            columns=get_selected_columns(info, Employer_sql),
         )
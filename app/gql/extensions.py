@@ -0,0 +1,52 @@
+from typing import Optional
+from graphql import GraphQLError
+from strawberry.extensions import SchemaExtension
+from strawberry.types.graphql import OperationType
+from app.auth.auth_utils import get_token_claims
+from app.db.routing import write_tracker
+from app.gql.context import RequestContext
+
+
+def get_caller_key(context: RequestContext) -> Optional[str]:
+    """
+    Identifies the caller by the email in their token. Unauthenticated
+    callers aren't tracked: they can't read back what they wrote through
+    the API, and behind a proxy they would all share one address.
+    """
+    try:
+        return get_token_claims(context)["email"]
+    except GraphQLError:
+        return None
+
+
+class DatabaseRoutingExtension(SchemaExtension):
+    """
+    Picks the database an operation runs against, once it is known whether
+    the operation is a query or a mutation.
+    Mutations run against the primary. Queries run against the replica,
+    unless the caller has written recently (read-your-writes).
+    """
+
+    def on_execute(self):
+        context = self.execution_context.context
+        caller_key = get_caller_key(context)
+        is_mutation = self.execution_context.operation_type == OperationType.MUTATION
+
+        context["use_replica"] = not (
+            is_mutation
+            or (caller_key is not None and write_tracker.wrote_recently(caller_key))
+        )
+
+        yield
+
+        # The window starts once the mutation's writes have been committed.
+        # Failed or rejected mutations (e.g. a wrong password) haven't
+        # written anything.
+        result = self.execution_context.result
+        if (
+            is_mutation
+            and caller_key is not None
+            and result is not None
+            and not result.errors
+        ):
+            write_tracker.record_write(caller_key)
@@ -1,23 +1,39 @@
 from strawberry.dataloader import DataLoader
-from typing import List
-from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
 from collections import defaultdict
-from app.db.models import Job as Job_sql
+from app.gql.types import Job_gql
 from app.db.repositories.job_repository import JobRepository
 
 
 class JobsFromEmployerDataLoader(DataLoader):
-    def __init__(self, db_session: Session):
+    """
+    First jobs (with id > after) of each employer.
+    """
+
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        columns: Optional[Tuple[str, ...]],
+        first: int,
+        after: Optional[int] = None,
+    ):
         super().__init__(load_fn=self.batch_load_fn)
         self.db_session = db_session
+        self.columns = columns
+        self.first = first
+        self.after = after
 
     async def batch_load_fn(
         self,
         employer_ids: List[int],
-    ) -> List[List[Job_sql]]:
-        jobs = JobRepository.get_jobs_by_employer_ids(
+    ) -> List[List[Job_gql]]:
+        jobs = await JobRepository.get_first_jobs_by_employer_ids(
             db_session=self.db_session,
             employer_ids=employer_ids,
+            first=self.first,
+            after=self.after,
+            columns=self.columns,
         )
 
         grouped = defaultdict(list)
@@ -28,12 +44,19 @@ class JobsFromEmployerDataLoader(DataLoader):
 
 
 class JobsFromApplicationDataLoader(DataLoader):
-    def __init__(self, db_session: Session):
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        columns: Optional[Tuple[str, ...]] = None,
+    ):
         super().__init__(load_fn=self.batch_load_fn)
         self.db_session = db_session
+        self.columns = columns
 
-    async def batch_load_fn(self, job_ids: List[int]) -> List[Job_sql]:
-        jobs = JobRepository.get_jobs_by_ids(self.db_session, job_ids)
+    async def batch_load_fn(self, job_ids: List[int]) -> List[Job_gql]:
+        jobs = await JobRepository.get_jobs_by_ids(
+            self.db_session, job_ids, self.columns, gql=True
+        )
 
         job_id_to_job = dict()
         for job in jobs:
@@ -1,19 +1,35 @@
 import strawberry
 from strawberry.types import Info
 from app.gql.types import Job_gql
-from typing import Optional
+from typing import List, Optional
 from app.auth.roles import Role
 from app.auth.auth_utils import require_role
 from app.db.repositories.job_repository import JobRepository
+from app.gql.bulk import BulkResult, validate_batch_size
+from app.errors.error_messages import EMPTY_FILTER
+from graphql import GraphQLError
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@strawberry.input
+class JobInput:
+    title: str
+    description: str
+    employer_id: int
+
+
+@strawberry.input
+class JobsFilter:
+    ids: Optional[List[int]] = None
+    employer_id: Optional[int] = None
 
 
 @strawberry.type
 class JobMutation:
     @strawberry.mutation
     @require_role([Role.ADMIN])
-    def add_job(
+    async def add_job(
         self,
         title: str,
         description: str,
@@ -21,7 +37,7 @@ class JobMutation:
         info: Info,
     ) -> Job_gql:
         db_session = info.context["db_session"]
-        return JobRepository.add_job(
+        return await JobRepository.add_job(
             db_session=db_session,
             title=title,
             description=description,
@@ -30,7 +46,25 @@ class JobMutation:
 
     @strawberry.mutation
     @require_role([Role.ADMIN])
-    def update_job(
+    async def add_jobs(
+        self,
+        jobs: List[JobInput],
+        info: Info,
+    ) -> BulkResult[Job_gql]:
+        """
+        Adds all the valid jobs in one transaction, and reports an error for
+        each of the others.
+        """
+        validate_batch_size(jobs)
+        db_session = info.context["db_session"]
+        return await JobRepository.add_jobs(
+            db_session=db_session,
+            jobs=[strawberry.asdict(job) for job in jobs],
+        )
+
+    @strawberry.mutation
+    @require_role([Role.ADMIN])
+    async def update_job(
         self,
         job_id: int,
         info: Info,
@@ -43,7 +77,7 @@ class JobMutation:
         Throws error if no job with the given id has been found.
         """
         db_session = info.context["db_session"]
-        return JobRepository.update_job(
+        return await JobRepository.update_job(
             db_session=db_session,
             job_id=job_id,
             title=title,
@@ -53,10 +87,31 @@ class JobMutation:
 
     @strawberry.mutation
     @require_role([Role.ADMIN])
-    def delete_job(
+    async def delete_job(
         self,
         job_id: int,
         info: Info,
     ) -> bool:
-        db_session: Session = info.context["db_session"]
-        return JobRepository.delete_job(db_session=db_session, job_id=job_id)
+        db_session: AsyncSession = info.context["db_session"]
+        return await JobRepository.delete_job(db_session=db_session, job_id=job_id)
+
+    @strawberry.mutation
+    @require_role([Role.ADMIN])
+    async def delete_jobs(
+        self,
+        filter: JobsFilter,
+        info: Info,
+    ) -> int:
+        """
+        Deletes the jobs matching all the given filters, and their
+        applications, with one statement. Returns the number of deleted jobs.
+        """
+        if filter.ids is None and filter.employer_id is None:
+            raise GraphQLError(EMPTY_FILTER)
+
+        db_session: AsyncSession = info.context["db_session"]
+        return await JobRepository.delete_jobs(
+            db_session=db_session,
+            ids=filter.ids,
+            employer_id=filter.employer_id,
+        )
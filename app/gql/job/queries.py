@@ -1,6 +1,9 @@
 import strawberry
 from strawberry.types import Info
-from typing import List, Optional
+from typing import Optional
+from app.db.models import Job as Job_sql
+from app.gql.pagination import Connection, Page
+from app.gql.selection import get_selected_columns
 from app.gql.types import Job_gql
 from app.db.repositories.job_repository import JobRepository
 
@@ -8,11 +11,29 @@ from app.db.repositories.job_repository import JobRepository
 @strawberry.type
 class JobQuery:
     @strawberry.field
-    def jobs(self, info: Info) -> List[Job_gql]:
+    async def jobs(
+        self,
+        info: Info,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None,
+    ) -> Connection[Job_gql]:
+        page = Page.from_args(first, after, last, before)
         db_session = info.context["db_session"]
-        return JobRepository.get_all_jobs(db_session=db_session)
+        jobs = await JobRepository.get_jobs_page(
+            db_session=db_session,
+            page=page,
+            columns=get_selected_columns(info, Job_sql, within=("edges", "node")),
+        )
+        return page.to_connection(jobs)
 
     @strawberry.field
-    def job(self, id: int, info: Info) -> Optional[Job_gql]:
+    async def job(self, id: int, info: Info) -> Optional[Job_gql]:
         db_session = info.context["db_session"]
-        return JobRepository.get_job_by_id(db_session, id)
+        return await JobRepository.get_job_by_id(
+            db_session,
+            id,
+            gql=True,
+            columns=get_selected_columns(info, Job_sql),
+        )
@@ -0,0 +1,43 @@
+from typing import Callable, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from strawberry.dataloader import DataLoader
+from .job.dataloaders import (
+    JobsFromEmployerDataLoader,
+    JobsFromApplicationDataLoader,
+)
+from .employer.dataloaders import EmployerFromJobsDataLoader
+from .application.dataloaders import (
+    AllApplicationsFromJobLoader,
+    UserApplicationsFromJobLoader,
+    AllApplicationsFromUserLoader,
+)
+from .user.dataloaders import UsersFromApplicationDataLoader
+
+LOADER_CLASSES = {
+    "jobs_from_employer": JobsFromEmployerDataLoader,
+    "employer_from_jobs": EmployerFromJobsDataLoader,
+    "user_applications_from_job": UserApplicationsFromJobLoader,
+    "all_applications_from_job": AllApplicationsFromJobLoader,
+    "applications_from_user": AllApplicationsFromUserLoader,
+    "jobs_from_application": JobsFromApplicationDataLoader,
+    "users_from_application": UsersFromApplicationDataLoader,
+}
+
+
+class LoaderRegistry(dict):
+    """
+    Per-request DataLoaders, created on first access by name, or by
+    (name, *args) for loaders created with arguments, e.g. the columns to
+    load or the first/after page of children.
+    get_db_session is only called when the first loader is created.
+    """
+
+    def __init__(self, get_db_session: Callable[[], AsyncSession]):
+        super().__init__()
+        self.get_db_session = get_db_session
+
+    def __missing__(self, key: str | Tuple) -> DataLoader:
+        name, *args = key if isinstance(key, tuple) else (key,)
+        loader = LOADER_CLASSES[name](self.get_db_session(), *args)
+        self[key] = loader
+        return loader
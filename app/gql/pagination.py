@@ -0,0 +1,126 @@
+import base64
+import strawberry
+from dataclasses import dataclass
+from typing import Generic, List, Optional, TypeVar
+from graphql import GraphQLError
+from app.errors.error_messages import (
+    FIRST_AND_LAST,
+    INVALID_CURSOR,
+    INVALID_PAGE_SIZE,
+)
+from app.settings.config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+T = TypeVar("T")
+
+CURSOR_PREFIX = "id:"
+
+
+def encode_cursor(id: int) -> str:
+    return base64.b64encode(f"{CURSOR_PREFIX}{id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        decoded = base64.b64decode(cursor, validate=True).decode()
+        if not decoded.startswith(CURSOR_PREFIX):
+            raise ValueError(decoded)
+        return int(decoded.removeprefix(CURSOR_PREFIX))
+    except ValueError:
+        raise GraphQLError(INVALID_CURSOR)
+
+
+def validate_page_size(size: Optional[int]):
+    if size is not None and (size < 0 or size > MAX_PAGE_SIZE):
+        raise GraphQLError(INVALID_PAGE_SIZE)
+
+
+@strawberry.type
+class PageInfo:
+    has_next_page: bool
+    has_previous_page: bool
+    start_cursor: Optional[str]
+    end_cursor: Optional[str]
+
+
+@strawberry.type
+class Edge(Generic[T]):
+    cursor: str
+    node: T
+
+
+@strawberry.type
+class Connection(Generic[T]):
+    edges: List[Edge[T]]
+    page_info: PageInfo
+
+
+@dataclass
+class Page:
+    """
+    Keyset page requested through the Relay connection arguments
+    (first/after or last/before), over objects ordered by id.
+    """
+
+    size: int
+    after: Optional[int] = None
+    before: Optional[int] = None
+    backwards: bool = False
+
+    @classmethod
+    def from_args(
+        cls,
+        first: Optional[int],
+        after: Optional[str],
+        last: Optional[int],
+        before: Optional[str],
+    ) -> "Page":
+        if first is not None and last is not None:
+            raise GraphQLError(FIRST_AND_LAST)
+
+        size = first if last is None else last
+        if size is None:
+            size = DEFAULT_PAGE_SIZE
+        validate_page_size(size)
+
+        return cls(
+            size=size,
+            after=decode_cursor(after) if after is not None else None,
+            before=decode_cursor(before) if before is not None else None,
+            backwards=last is not None,
+        )
+
+    @property
+    def limit(self) -> int:
+        # One more object than the page size tells whether there are more.
+        return self.size + 1
+
+    def to_connection(self, nodes: list) -> Connection:
+        """
+        Builds the connection from the (at most limit) nodes loaded for the
+        page, in id order (descending for backwards pages).
+        As allowed by the Relay spec, whether there are objects before the
+        after cursor (or after the before cursor) is not checked; it is
+        assumed there are.
+        """
+        has_more = len(nodes) > self.size
+        nodes = nodes[: self.size]
+        if self.backwards:
+            nodes.reverse()
+
+        edges = [Edge(cursor=encode_cursor(node.id), node=node) for node in nodes]
+        if self.backwards:
+            has_next_page = self.before is not None
+            has_previous_page = has_more
+        else:
+            has_next_page = has_more
+            has_previous_page = self.after is not None
+
+        return Connection(
+            edges=edges,
+            page_info=PageInfo(
+                has_next_page=has_next_page,
+                has_previous_page=has_previous_page,
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+            ),
+        )
@@ -0,0 +1,84 @@
+from typing import Iterable, List, Set, Tuple
+from sqlalchemy import inspect
+from strawberry.types import Info
+from strawberry.types.nodes import SelectedField, Selection
+from strawberry.utils.str_converters import to_snake_case
+
+
+def get_selected_field_names(selections: Iterable[Selection]) -> Set[str]:
+    """
+    Names of the fields requested in a selection set, including the ones
+    requested through (inline) fragments.
+    """
+    field_names = set()
+    for selection in selections:
+        if isinstance(selection, SelectedField):
+            field_names.add(to_snake_case(selection.name))
+        else:
+            field_names |= get_selected_field_names(selection.selections)
+    return field_names
+
+
+def get_subfield_selections(
+    selections: Iterable[Selection], field_name: str
+) -> List[Selection]:
+    """
+    Selection sets of the subfields named field_name (in snake case),
+    including the ones requested through (inline) fragments.
+    """
+    subfield_selections = []
+    for selection in selections:
+        if isinstance(selection, SelectedField):
+            if to_snake_case(selection.name) == field_name:
+                subfield_selections.extend(selection.selections)
+        else:
+            subfield_selections.extend(
+                get_subfield_selections(selection.selections, field_name)
+            )
+    return subfield_selections
+
+
+def get_key_columns(model) -> Set[str]:
+    """
+    Primary and foreign key columns, which are always loaded since they are
+    needed to resolve nested fields.
+    """
+    return {
+        column_attr.key
+        for column_attr in inspect(model).column_attrs
+        if any(
+            column.primary_key or column.foreign_keys for column in column_attr.columns
+        )
+    }
+
+
+def get_selected_columns(
+    info: Info,
+    model,
+    within: Tuple[str, ...] = (),
+) -> Tuple[str, ...]:
+    """
+    Columns of model which are needed to resolve the current field: the ones
+    requested in its selection set, plus the key columns.
+    within is the path to the model's fields inside the selection set, e.g.
+    ("edges", "node") for connections.
+    The result is cached on the request context per field path (without list
+    indices), since nested fields are resolved once per parent object.
+    """
+    path = tuple(key for key in info.path.as_list() if isinstance(key, str))
+    cache = info.context["selected_columns"]
+    if (path, model) not in cache:
+        selections = [
+            selection
+            for selected_field in info.selected_fields
+            for selection in selected_field.selections
+        ]
+        for field_name in within:
+            selections = get_subfield_selections(selections, field_name)
+        field_names = get_selected_field_names(selections)
+
+        column_names = {column_attr.key for column_attr in inspect(model).column_attrs}
+        cache[(path, model)] = tuple(
+            sorted((field_names & column_names) | get_key_columns(model))
+        )
+    return cache[(path, model)]
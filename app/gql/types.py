@@ -1,14 +1,15 @@
 import strawberry
 from strawberry.types import Info
-from typing import List, Optional
+from typing import Optional
 from app.auth.auth_utils import require_role
 from app.auth.roles import Role
-from app.sql_to_gql import (
-    employer_to_gql,
-    job_to_gql,
-    application_to_gql,
-    user_to_gql,
+from app.db.models import (
+    Employer as Employer_sql,
+    Job as Job_sql,
+    User as User_sql,
 )
+from app.gql.pagination import Connection, Page
+from app.gql.selection import get_selected_columns
 
 
 class Base_gql:
@@ -23,10 +24,18 @@ class Employer_gql(Base_gql):
     industry: str
 
     @strawberry.field
-    async def jobs(self, info: Info) -> List["Job_gql"]:
-        loader = info.context["loaders"]["jobs_from_employer"]
-        jobs_sql = await loader.load(self.id)
-        return [job_to_gql(job) for job in jobs_sql]
+    async def jobs(
+        self,
+        info: Info,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> Connection["Job_gql"]:
+        page = Page.from_args(first, after, None, None)
+        columns = get_selected_columns(info, Job_sql, within=("edges", "node"))
+        loader = info.context["loaders"][
+            "jobs_from_employer", columns, page.limit, page.after
+        ]
+        return page.to_connection(await loader.load(self.id))
 
 
 @strawberry.type
@@ -38,31 +47,39 @@ class Job_gql(Base_gql):
 
     @strawberry.field
     async def employer(self, info: Info) -> Optional[Employer_gql]:
-        loader = info.context["loaders"]["employer_from_jobs"]
-        employer_sql = await loader.load(self.employer_id)
-        if employer_sql is None:
-            return None
-        return employer_to_gql(employer_sql)
+        columns = get_selected_columns(info, Employer_sql)
+        loader = info.context["loaders"]["employer_from_jobs", columns]
+        return await loader.load(self.employer_id)
 
     @strawberry.field
     @require_role([Role.USER, Role.ADMIN, Role.UNAUTHENTICATED])
-    async def applications(self, info: Info) -> List["Application_gql"]:
+    async def applications(
+        self,
+        info: Info,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> Connection["Application_gql"]:
+        page = Page.from_args(first, after, None, None)
         user = info.context["user"]
         if user is None:
-            return []
+            return page.to_connection([])
 
         if user.role == Role.USER:
             loader = info.context["loaders"]["user_applications_from_job"]
-            application_sql = await loader.load((self.id, user.id))
-            if application_sql is None:
-                return []
-            return [application_to_gql(application_sql)]
+            application = await loader.load((self.id, user.id))
+            # A user has at most one application per job.
+            if application is None or (
+                page.after is not None and application.id <= page.after
+            ):
+                return page.to_connection([])
+            return page.to_connection([application])
         elif user.role == Role.ADMIN:
-            loader = info.context["loaders"]["all_applications_from_job"]
-            applications_sql = await loader.load(self.id)
-            return [application_to_gql(app) for app in applications_sql]
+            loader = info.context["loaders"][
+                "all_applications_from_job", page.limit, page.after
+            ]
+            return page.to_connection(await loader.load(self.id))
         else:
-            return []
+            return page.to_connection([])
 
 
 @strawberry.type
@@ -74,17 +91,23 @@ class User_gql(Base_gql):
 
     @strawberry.field
     @require_role([Role.USER, Role.ADMIN, Role.UNAUTHENTICATED])
-    async def applications(self, info: Info) -> List["Application_gql"]:
+    async def applications(
+        self,
+        info: Info,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> Connection["Application_gql"]:
+        page = Page.from_args(first, after, None, None)
         # Only retrieve applications if request user matches this user
         # or the user is an admin.
         user = info.context["user"]
         if user is None or (user.role != Role.ADMIN and user.id != self.id):
-            return []
-
-        loader = info.context["loaders"]["applications_from_user"]
-        applications_sql = await loader.load(self.id)
+            return page.to_connection([])
 
-        return [application_to_gql(app) for app in applications_sql]
+        loader = info.context["loaders"][
+            "applications_from_user", page.limit, page.after
+        ]
+        return page.to_connection(await loader.load(self.id))
 
 
 @strawberry.type
@@ -99,12 +122,12 @@ class Application_gql(Base_gql):
         user = info.context["user"]
         if user is None or (user.role != Role.ADMIN and user.id != self.user_id):
             return []
-        loader = info.context["loaders"]["users_from_application"]
-        user_sql = await loader.load(self.user_id)
-        return user_to_gql(user_sql)
+        columns = get_selected_columns(info, User_sql)
+        loader = info.context["loaders"]["users_from_application", columns]
+        return await loader.load(self.user_id)
 
     @strawberry.field
     async def job(self, info: Info) -> Optional[Job_gql]:
-        loader = info.context["loaders"]["jobs_from_application"]
-        job_sql = await loader.load(self.job_id)
-        return job_to_gql(job_sql)
+        columns = get_selected_columns(info, Job_sql)
+        loader = info.context["loaders"]["jobs_from_application", columns]
+        return await loader.load(self.job_id)
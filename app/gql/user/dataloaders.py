@@ -1,17 +1,24 @@
 from strawberry.dataloader import DataLoader
-from typing import List
-from sqlalchemy.orm import Session
-from app.db.models import User as User_sql
+from typing import List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.gql.types import User_gql
 from app.db.repositories.user_repository import UserRepository
 
 
 class UsersFromApplicationDataLoader(DataLoader):
-    def __init__(self, db_session: Session):
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        columns: Optional[Tuple[str, ...]] = None,
+    ):
         super().__init__(load_fn=self.batch_load_fn)
         self.db_session = db_session
+        self.columns = columns
 
-    async def batch_load_fn(self, user_ids: List[int]) -> List[User_sql]:
-        users = UserRepository.get_users_by_ids(self.db_session, user_ids)
+    async def batch_load_fn(self, user_ids: List[int]) -> List[User_gql]:
+        users = await UserRepository.get_users_by_ids(
+            self.db_session, user_ids, self.columns, gql=True
+        )
 
         user_ids_to_user = dict()
         for user in users:
@@ -1,40 +1,107 @@
 import strawberry
 from strawberry.types import Info
-from app.db.models import User as User_sql
 from app.gql.types import User_gql
 from graphql import GraphQLError
 from app.auth.auth_utils import (
-    verify_password,
+    verify_password_async,
     generate_jwt_token,
-    hash_password,
+    generate_refresh_token,
+    hash_password_async,
+    hash_refresh_token,
+    password_needs_rehash,
     require_role,
 )
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import User as User_sql
+from app.db.repositories.refresh_token_repository import RefreshTokenRepository
 from app.db.repositories.user_repository import UserRepository
 from app.errors.custom_errors import ResourceNotFound
 from app.errors.error_messages import (
-    USER_ALREADY_EXISTS,
     INSUFFICIENT_PRIVILEGES,
     INVALID_ROLE,
 )
 from app.auth.roles import Role
-from app.sql_to_gql import user_to_gql
+from app.auth.token_versions import token_versions
+
+
+@strawberry.type
+class AuthTokens:
+    access_token: str
+    refresh_token: str
+
+
+async def authenticate_password(
+    db_session: AsyncSession, email: str, password: str
+) -> User_sql:
+    user_sql = await UserRepository.get_user_by_email(db_session, email)
+
+    if not user_sql:
+        raise ResourceNotFound("User")
+
+    await verify_password_async(user_sql.password_hash, password)
+    if password_needs_rehash(user_sql.password_hash):
+        # The hashing parameters have changed since the password was set.
+        password_hash = await hash_password_async(password)
+        await UserRepository.update_password_hash(
+            db_session, user_sql.id, password_hash
+        )
+    return user_sql
+
+
+def generate_access_token(user_sql: User_sql) -> str:
+    return generate_jwt_token(
+        user_sql.id, user_sql.email, user_sql.role, user_sql.token_version
+    )
 
 
 @strawberry.type
 class LoginMutation:
     @strawberry.mutation
     @require_role([Role.UNAUTHENTICATED])
-    def login_user(email: str, password: str, info: Info) -> str:
+    async def login_user(email: str, password: str, info: Info) -> str:
         db_session = info.context["db_session"]
+        user_sql = await authenticate_password(db_session, email, password)
+        return generate_access_token(user_sql)
 
-        user_sql = UserRepository.get_user_by_email(db_session, email)
+    @strawberry.mutation
+    @require_role([Role.UNAUTHENTICATED])
+    async def login_user_with_refresh_token(
+        email: str, password: str, info: Info
+    ) -> AuthTokens:
+        """
+        Like loginUser, also returning a refresh token, with which refreshToken
+        issues new access tokens without the password.
+        """
+        db_session = info.context["db_session"]
+        user_sql = await authenticate_password(db_session, email, password)
 
-        if not user_sql:
-            raise ResourceNotFound("User")
+        refresh_token = generate_refresh_token()
+        await RefreshTokenRepository.add_refresh_token(
+            db_session, user_sql, hash_refresh_token(refresh_token)
+        )
+        return AuthTokens(
+            access_token=generate_access_token(user_sql),
+            refresh_token=refresh_token,
+        )
 
-        verify_password(user_sql.password_hash, password)
-        token = generate_jwt_token(email)
-        return token
+    @strawberry.mutation
+    @require_role([Role.USER, Role.ADMIN, Role.UNAUTHENTICATED])
+    async def refresh_token(refresh_token: str, info: Info) -> AuthTokens:
+        """
+        Returns a new access token and a new refresh token. The given refresh
+        token can't be used again.
+        """
+        db_session = info.context["db_session"]
+        new_refresh_token = generate_refresh_token()
+        user_sql = await RefreshTokenRepository.rotate_refresh_token(
+            db_session,
+            hash_refresh_token(refresh_token),
+            hash_refresh_token(new_refresh_token),
+        )
+        return AuthTokens(
+            access_token=generate_access_token(user_sql),
+            refresh_token=new_refresh_token,
+        )
 
 
 @strawberry.type
@@ -42,7 +109,7 @@ class UserMutation:
 
     @strawberry.mutation
     @require_role([Role.ADMIN, Role.UNAUTHENTICATED])
-    def add_user(
+    async def add_user(
         username: str, email: str, password: str, role: str, info: Info
     ) -> User_gql:
         db_session = info.context["db_session"]
@@ -53,19 +120,32 @@ class UserMutation:
                 raise GraphQLError(INSUFFICIENT_PRIVILEGES)
 
         if role == Role.USER or role == Role.ADMIN:
-            user_to_add = UserRepository.get_user_by_email(db_session, email)
-
-            if user_to_add is not None:
-                raise GraphQLError(USER_ALREADY_EXISTS)
-
-            password_hash = hash_password(password)
-            user_to_add = User_sql(
-                username=username, email=email, password_hash=password_hash, role=role
+            # The email's uniqueness is checked by the insert.
+            return await UserRepository.add_user(
+                db_session=db_session,
+                username=username,
+                email=email,
+                password_hash=await hash_password_async(password),
+                role=role,
             )
-            db_session.add(user_to_add)
-            db_session.commit()
-            db_session.refresh(user_to_add)
-
-            return user_to_gql(user_to_add)
         else:
             raise GraphQLError(INVALID_ROLE)
+
+    @strawberry.mutation
+    @require_role([Role.USER, Role.ADMIN])
+    async def revoke_tokens(user_id: int, info: Info) -> bool:
+        """
+        Revokes all the tokens issued to the user so far, e.g. to log them out
+        of all their sessions. Non-admin users can only revoke their own tokens.
+        """
+        user = info.context["user"]
+        if user.role != Role.ADMIN and user.id != user_id:
+            raise GraphQLError(INSUFFICIENT_PRIVILEGES)
+
+        db_session = info.context["db_session"]
+        token_version = await UserRepository.revoke_tokens(db_session, user_id)
+        if token_version is None:
+            raise ResourceNotFound("User")
+
+        token_versions.record_version(user_id, token_version)
+        return True
@@ -1,6 +1,9 @@
 import strawberry
-from typing import List
+from typing import Optional
 from strawberry.types import Info
+from app.db.models import User as User_sql
+from app.gql.pagination import Connection, Page
+from app.gql.selection import get_selected_columns
 from app.gql.types import User_gql
 from app.auth.auth_utils import require_role
 from app.auth.roles import Role
@@ -12,13 +15,32 @@ class UserQuery:
 
     @strawberry.field
     @require_role([Role.ADMIN, Role.USER])
-    def users(self, info: Info) -> List[User_gql]:
+    async def users(
+        self,
+        info: Info,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None,
+    ) -> Connection[User_gql]:
+        page = Page.from_args(first, after, last, before)
         db_session = info.context["db_session"]
         user = info.context.get("user", None)
+        columns = get_selected_columns(info, User_sql, within=("edges", "node"))
 
         if user.role == Role.ADMIN:
-            return UserRepository.get_all_users(db_session, gql=True)
+            users = await UserRepository.get_users_page(
+                db_session,
+                page,
+                columns=columns,
+            )
         elif user.role == Role.USER:
-            user = UserRepository.get_user_by_id(db_session, id=user.id)
-            return [user] if user is not None else []
-        return []
+            users = await UserRepository.get_users_page(
+                db_session,
+                page,
+                columns=columns,
+                id=user.id,
+            )
+        else:
+            users = []
+        return page.to_connection(users)
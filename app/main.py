@@ -2,53 +2,77 @@ from strawberry import Schema
 from strawberry.fastapi import GraphQLRouter
 from strawberry.extensions import QueryDepthLimiter
 
-from fastapi import FastAPI, Depends, Request
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from contextlib import asynccontextmanager
+import logging
+import time
 
 from .gql.root_mutation import Mutation
 from .gql.root_query import Query
-from .db.database import prepare_database, get_session
-from .db.models import Employer as Employer_sql, Job as Job_sql
-from sqlalchemy.orm import Session
-from .gql.job.dataloaders import (
-    JobsFromEmployerDataLoader,
-    JobsFromApplicationDataLoader,
+from .db.database import (
+    prepare_database,
+    get_sessionmaker,
+    get_replica_sessionmaker,
+    engine,
+    replica_engine,
 )
-from .gql.employer.dataloaders import EmployerFromJobsDataLoader
-from .gql.application.dataloaders import (
-    AllApplicationsFromJobLoader,
-    UserApplicationsFromJobLoader,
-    AllApplicationsFromUserLoader,
+from .db.pool import get_pool_status
+from .db.statements import statement_cache, compiled_cache_stats, select_all
+from .db.streaming import (
+    NDJSON_MEDIA_TYPE,
+    stream_row_batches,
+    stream_ndjson,
+    stream_json_array,
 )
-from .gql.user.dataloaders import UsersFromApplicationDataLoader
+from .db.models import Employer as Employer_sql, Job as Job_sql
+from .settings.config import STREAM_BATCH_SIZE
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from .gql.extensions import DatabaseRoutingExtension
+from .gql.context import RequestContext
+from .auth.auth_utils import authenticate
+from .auth.roles import Role
+from .errors.error_messages import INSUFFICIENT_PRIVILEGES
+from graphql import GraphQLError
+
+# Logged through uvicorn's logger, which is configured by `fastapi run`.
+logger = logging.getLogger("uvicorn.error")
+
+# Filled in by lifespan, served at /metrics/startup.
+startup_metrics = dict()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    prepare_database()
+    start = time.perf_counter()
+    applied_versions = await prepare_database()
+    startup_metrics["database_seconds"] = time.perf_counter() - start
+    startup_metrics["applied_migrations"] = applied_versions
+    logger.info(
+        "Database prepared in %.3fs, applied migrations: %s.",
+        startup_metrics["database_seconds"],
+        applied_versions or "none",
+    )
     yield
 
 
-async def get_context(request: Request, db_session: Session = Depends(get_session)):
-    return {
-        "db_session": db_session,
-        "request": request,
-        "loaders": {
-            "jobs_from_employer": JobsFromEmployerDataLoader(db_session),
-            "employer_from_jobs": EmployerFromJobsDataLoader(db_session),
-            "user_applications_from_job": UserApplicationsFromJobLoader(db_session),
-            "all_applications_from_job": AllApplicationsFromJobLoader(db_session),
-            "applications_from_user": AllApplicationsFromUserLoader(db_session),
-            "jobs_from_application": JobsFromApplicationDataLoader(db_session),
-            "users_from_application": UsersFromApplicationDataLoader(db_session),
-        },
-    }
+async def get_context(
+    sessionmaker: async_sessionmaker = Depends(get_sessionmaker),
+    replica_sessionmaker: async_sessionmaker = Depends(get_replica_sessionmaker),
+):
+    context = RequestContext(sessionmaker, replica_sessionmaker)
+    try:
+        yield context
+    finally:
+        await context.close()
 
 
 schema = Schema(
     query=Query,
     mutation=Mutation,
-    extensions=[QueryDepthLimiter(max_depth=5)],
+    # Each list connection adds two levels (edges, node): 11 allows 5 levels
+    # through three lists, e.g. employers > jobs > employer > jobs > employer.
+    extensions=[QueryDepthLimiter(max_depth=11), DatabaseRoutingExtension],
 )
 graphql_app = GraphQLRouter(schema, context_getter=get_context)
 
@@ -56,13 +80,90 @@ app = FastAPI(lifespan=lifespan)
 app.include_router(graphql_app, prefix="/graphql")
 
 
+def stream_all(
+    model,
+    sessionmaker: async_sessionmaker,
+    request: Request,
+) -> StreamingResponse:
+    """
+    Streams all rows of model's table, as NDJSON if the client accepts it,
+    else as a JSON array.
+    """
+    batches = stream_row_batches(
+        sessionmaker,
+        select_all(model, rows=True),
+        STREAM_BATCH_SIZE,
+    )
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return StreamingResponse(stream_ndjson(batches), media_type=NDJSON_MEDIA_TYPE)
+    return StreamingResponse(
+        stream_json_array(batches),
+        media_type="application/json",
+    )
+
+
 @app.get("/employers")
-def get_employers(session: Session = Depends(get_session)):
-    employers = session.query(Employer_sql).all()
-    return employers
+async def get_employers(
+    request: Request,
+    sessionmaker: async_sessionmaker = Depends(get_replica_sessionmaker),
+):
+    return stream_all(Employer_sql, sessionmaker, request)
 
 
 @app.get("/jobs")
-def get_jobs(session: Session = Depends(get_session)):
-    jobs = session.query(Job_sql).all()
-    return jobs
+async def get_jobs(
+    request: Request,
+    sessionmaker: async_sessionmaker = Depends(get_replica_sessionmaker),
+):
+    return stream_all(Job_sql, sessionmaker, request)
+
+
+async def require_admin(
+    request: Request,
+    sessionmaker: async_sessionmaker = Depends(get_sessionmaker),
+    replica_sessionmaker: async_sessionmaker = Depends(get_replica_sessionmaker),
+):
+    """
+    Lets only admins through, authenticated like GraphQL requests.
+    """
+    context = RequestContext(sessionmaker, replica_sessionmaker)
+    context.request = request
+    try:
+        user = await authenticate(context)
+    except GraphQLError as e:
+        raise HTTPException(status_code=401, detail=e.message)
+    finally:
+        await context.close()
+    if user.role != Role.ADMIN:
+        raise HTTPException(status_code=403, detail=INSUFFICIENT_PRIVILEGES)
+
+
+# Operational metrics, only served to admins.
+metrics_router = APIRouter(prefix="/metrics", dependencies=[Depends(require_admin)])
+
+
+@metrics_router.get("/db-pool")
+def get_db_pool_metrics():
+    return get_pool_status(engine.pool)
+
+
+@metrics_router.get("/db-pool/replica")
+def get_replica_db_pool_metrics():
+    # Same as the primary's metrics if no replica is configured.
+    return get_pool_status(replica_engine.pool)
+
+
+@metrics_router.get("/statement-cache")
+def get_statement_cache_metrics():
+    return {
+        "statements": statement_cache.stats(),
+        "compiled_sql": compiled_cache_stats.stats(),
+    }
+
+
+@metrics_router.get("/startup")
+def get_startup_metrics():
+    return startup_metrics
+
+
+app.include_router(metrics_router)
@@ -14,6 +14,58 @@ PORT = os.getenv("PORT")
 # postgresql+psycopg = "dialect"
 DATABASE_URL = f"postgresql+psycopg://{USER}:{PASSWORD}@{HOST}:{PORT}/{DATABASE}"
 
+# Optional read replica, GraphQL queries are routed to it when set.
+REPLICA_HOST = os.getenv("REPLICA_HOST")
+REPLICA_PORT = os.getenv("REPLICA_PORT", PORT)
+REPLICA_DATABASE_URL = (
+    f"postgresql+psycopg://{USER}:{PASSWORD}@{REPLICA_HOST}:{REPLICA_PORT}/{DATABASE}"
+    if REPLICA_HOST
+    else None
+)
+
+# Seconds after a caller's write during which their reads go to the primary,
+# so that they don't read stale data from a lagging replica.
+READ_YOUR_WRITES_WINDOW_SECONDS = float(
+    os.getenv("READ_YOUR_WRITES_WINDOW_SECONDS", "5")
+)
+
+# Page sizes of the top-level GraphQL list connections.
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "20"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "100"))
+
+# Rows fetched per round trip by the streaming REST endpoints.
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "1000"))
+
+# Rows resolved and sent per COPY by the bulk importer.
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "10000"))
+
+# Items accepted by one bulk mutation.
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "1000"))
+
 JWT_KEY = os.getenv("JWT_KEY")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM")
 JWT_EXPIRATION_TIME_MINUTES = int(os.getenv("JWT_EXPIRATION_TIME_MINUTES"))
+# Refresh tokens are single use, each refresh issues a new one.
+REFRESH_TOKEN_EXPIRATION_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRATION_DAYS", "30"))
+# Argon2 cost parameters of new password hashes (argon2-cffi's defaults).
+# Hashes made with other parameters are rehashed on the user's next login.
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST_KIB = int(os.getenv("ARGON2_MEMORY_COST_KIB", "65536"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+# Threads hashing and verifying passwords, off the event loop.
+PASSWORD_HASHING_THREADS = int(os.getenv("PASSWORD_HASHING_THREADS", "2"))
+# Seconds between reloads of the revoked token versions, i.e. the longest a
+# revocation made by another worker takes to apply.
+TOKEN_VERSIONS_REFRESH_SECONDS = float(
+    os.getenv("TOKEN_VERSIONS_REFRESH_SECONDS", "30")
+)
+
+# Connection pool.
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Seconds after which a connection is replaced, -1 to disable.
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Seconds to wait for a connection before giving up.
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
@@ -1,3 +1,7 @@
+import dataclasses
+from functools import cache
+from typing import Iterable, List, Tuple
+from sqlalchemy import Row, inspect
 from .db.models import (
     Employer as Employer_sql,
     Job as Job_sql,
@@ -6,14 +10,22 @@ from .db.models import (
 )
 
 
+def get_loaded(sql_object, attr_name: str):
+    """
+    Value of an attribute, or None if it was not loaded (because it was not
+    requested). Unloaded attributes are never lazily loaded.
+    """
+    return inspect(sql_object).dict.get(attr_name)
+
+
 def employer_to_gql(employer_sql: Employer_sql) -> "Employer_gql":
     from app.gql.types import Employer_gql
 
     return Employer_gql(
-        id=employer_sql.id,
-        name=employer_sql.name,
-        contact_email=employer_sql.contact_email,
-        industry=employer_sql.industry,
+        id=get_loaded(employer_sql, "id"),
+        name=get_loaded(employer_sql, "name"),
+        contact_email=get_loaded(employer_sql, "contact_email"),
+        industry=get_loaded(employer_sql, "industry"),
     )
 
 
@@ -21,10 +33,10 @@ def job_to_gql(job_sql: Job_sql) -> "Job_gql":
     from app.gql.types import Job_gql
 
     return Job_gql(
-        id=job_sql.id,
-        title=job_sql.title,
-        description=job_sql.description,
-        employer_id=job_sql.employer_id,
+        id=get_loaded(job_sql, "id"),
+        title=get_loaded(job_sql, "title"),
+        description=get_loaded(job_sql, "description"),
+        employer_id=get_loaded(job_sql, "employer_id"),
     )
 
 
@@ -32,9 +44,9 @@ def application_to_gql(application_sql: Application_sql) -> "Application_gql":
     from app.gql.types import Application_gql
 
     return Application_gql(
-        id=application_sql.id,
-        user_id=application_sql.user_id,
-        job_id=application_sql.job_id,
+        id=get_loaded(application_sql, "id"),
+        user_id=get_loaded(application_sql, "user_id"),
+        job_id=get_loaded(application_sql, "job_id"),
     )
 
 
@@ -42,8 +54,26 @@ def user_to_gql(user_sql: User_sql) -> "User_gql":
     from app.gql.types import User_gql
 
     return User_gql(
-        id=user_sql.id,
-        username=user_sql.username,
-        email=user_sql.email,
-        role=user_sql.role,
+        id=get_loaded(user_sql, "id"),
+        username=get_loaded(user_sql, "username"),
+        email=get_loaded(user_sql, "email"),
+        role=get_loaded(user_sql, "role"),
     )
+
+
+@cache
+def get_gql_field_names(gql_type: type) -> Tuple[str, ...]:
+    """
+    Names of the fields a Strawberry type is constructed with (its columns),
+    i.e. excluding the resolved fields.
+    """
+    return tuple(field.name for field in dataclasses.fields(gql_type) if field.init)
+
+
+def rows_to_gql(gql_type: type, rows: Iterable[Row]) -> List:
+    """
+    Builds Strawberry objects straight from Core rows, without going through
+    ORM instances. Fields whose columns were not selected are None.
+    """
+    unselected = dict.fromkeys(get_gql_field_names(gql_type))
+    return [gql_type(**{**unselected, **row._mapping}) for row in rows]
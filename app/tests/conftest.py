@@ -1,20 +1,30 @@
+import os
+import jwt
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.pool import StaticPool
 from sqlalchemy.exc import OperationalError as SQLAlchemyOperationalError
-from app.db.database import get_session
+from anyio.from_thread import start_blocking_portal
+from app.db.database import (
+    get_session,
+    get_replica_session,
+    get_sessionmaker,
+    get_replica_sessionmaker,
+    SerializedAsyncSession,
+)
 from app.db.models import Base
 from app.main import app
-from contextlib import asynccontextmanager
 from fastapi.testclient import TestClient
+from .databases import WorkerDatabases
 from .utils import (
-    load_test_tables,
-    get_test_admin_email,
-    get_test_first_non_admin_email,
+    generate_test_jwt_admin_token,
+    generate_test_jwt_user_token,
+    get_test_first_non_admin_user,
 )
-from app.auth.auth_utils import generate_jwt_token
-from app.settings.config import DATABASE_URL
+from app.auth.token_versions import token_versions
+from app.settings.config import DATABASE_URL, JWT_ALGORITHM
+from app.db.migrations.runner import MIGRATIONS_TABLE
 
 
 # Assumption: Docker container containing test db has to be running
@@ -36,55 +46,144 @@ def pytest_sessionstart(session):
 
 
 @pytest.fixture(scope="session")
-def db_url(request):
-    return DATABASE_URL
+def test_databases():
+    """
+    This worker's clone of the seeded template database (see databases.py).
+    """
+    # Set by pytest-xdist in its workers, e.g. "gw0".
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    databases = WorkerDatabases(DATABASE_URL, worker_id)
+    databases.create()
+    yield databases
+    databases.drop_worker_databases()
+
+
+@pytest.fixture(scope="session")
+def db_url(test_databases):
+    url = test_databases.get_url(test_databases.name)
+    return url.render_as_string(hide_password=False)
+
+
+@pytest.fixture(scope="session")
+def empty_db_url(test_databases):
+    url = test_databases.get_url(test_databases.empty_name)
+    return url.render_as_string(hide_password=False)
+
+
+@pytest.fixture(scope="function")
+def portal():
+    """
+    Event loop shared by the test client and the test db session, since
+    an async connection can only be used from the loop it was created in.
+    """
+    with start_blocking_portal() as portal:
+        yield portal
 
 
 @pytest.fixture(scope="function")
-def db_session(db_url):
-    engine = create_engine(
+def db_session(db_url, portal):
+    """
+    Session on the worker's seeded database, inside a transaction which is
+    rolled back after the test. The session works in a SAVEPOINT of that
+    transaction, so its commits and rollbacks stay within the test.
+    """
+    engine = create_async_engine(
         db_url,
         poolclass=StaticPool,
     )
 
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    async def setup():
+        connection = await engine.connect()
+        transaction = await connection.begin()
+        # Sequences aren't rolled back, so objects created by a test get the
+        # ids following the sample data's.
+        for table in Base.metadata.sorted_tables:
+            await connection.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"coalesce(max(id), 0) + 1, false) FROM {table.name}"
+                )
+            )
+        session = SerializedAsyncSession(
+            bind=connection,
+            autoflush=False,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        return connection, transaction, session
 
-    # Create tables in the database.
-    Base.metadata.create_all(bind=engine)
-    connection = engine.connect()
-    transaction = connection.begin()
-    session = TestingSessionLocal(bind=connection)
+    async def teardown():
+        await session.close()
+        if transaction.is_active:
+            await transaction.rollback()
+        await connection.close()
+        await engine.dispose()
 
-    # Initialise test db.
-    load_test_tables(session)
+    connection, transaction, session = portal.call(setup)
+    # Token versions revoked by earlier tests have been rolled back.
+    token_versions.clear()
 
     yield session
 
-    Base.metadata.drop_all(bind=engine)
-    session.close()
-    transaction.rollback()
-    connection.close()
+    portal.call(teardown)
+
 
+@pytest.fixture(scope="function")
+def migrations_engine(empty_db_url, portal):
+    """
+    Engine of an empty test database, without tables or migrations.
+    """
+    engine = create_async_engine(empty_db_url)
 
-# Dummy lifespan, since I don't want to get DB up / tear it down here.
-@asynccontextmanager
-async def dummy_lifespan(app):
-    yield
+    async def drop_schema():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+            await connection.execute(text(f"DROP TABLE IF EXISTS {MIGRATIONS_TABLE}"))
+
+    portal.call(drop_schema)
+    yield engine
+    portal.call(drop_schema)
+    portal.call(engine.dispose)
 
 
 @pytest.fixture(scope="function")
-def test_client(db_session):
-    def override_get_session():
+def test_client(db_session, portal):
+    async def override_get_session():
         try:
             yield db_session
         finally:
-            db_session.close()
+            await db_session.close()
+
+    def override_get_sessionmaker():
+        return lambda: db_session
 
     app.dependency_overrides[get_session] = override_get_session
-    app.router.lifespan_context = dummy_lifespan
+    app.dependency_overrides[get_replica_session] = override_get_session
+    app.dependency_overrides[get_sessionmaker] = override_get_sessionmaker
+    app.dependency_overrides[get_replica_sessionmaker] = override_get_sessionmaker
+
+    # Requests are served on the shared portal instead of one owned by the
+    # client. The lifespan is not run, since I don't want to get the DB
+    # up / tear it down here.
+    test_client = TestClient(app)
+    test_client.portal = portal
+    yield test_client
+
+
+@pytest.fixture(scope="function")
+def executed_statements(db_session):
+    """
+    SQL statements sent to the database during the test.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, params, context, many):
+        statements.append(statement)
 
-    with TestClient(app) as test_client:
-        yield test_client
+    sync_engine = db_session.bind.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(sync_engine, "before_cursor_execute", before_cursor_execute)
 
 
 @pytest.fixture(scope="function")
@@ -104,22 +203,27 @@ def graphql_endpoint():
 
 @pytest.fixture(scope="session")
 def admin_header() -> str:
-    admin_email = get_test_admin_email()
-    token = generate_jwt_token(admin_email)
+    token = generate_test_jwt_admin_token()
     header = {"Authorization": f"Bearer {token}"}
     return header
 
 
 @pytest.fixture(scope="session")
 def user_header() -> str:
-    user_email = get_test_first_non_admin_email()
-    token = generate_jwt_token(user_email)
+    token = generate_test_jwt_user_token()
     header = {"Authorization": f"Bearer {token}"}
     return header
 
 
 @pytest.fixture(scope="session")
 def invalid_token_header() -> str:
-    email = "not even an email"
-    token = generate_jwt_token(email)
+    # Claims of an existing user, signed with another key.
+    idx, user = get_test_first_non_admin_user()
+    payload = {
+        "sub": str(idx + 1),
+        "email": user["email"],
+        "role": user["role"],
+        "ver": 0,
+    }
+    token = jwt.encode(payload, "not the key of this app" * 2, algorithm=JWT_ALGORITHM)
     return {"Authorization": f"Bearer {token}"}
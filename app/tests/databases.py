@@ -0,0 +1,146 @@
+"""
+Test databases, all on the server of the configured test database:
+- a template database with the schema and the sample data, built once and
+  reused by later runs for as long as the models and the data don't change
+  (its name ends with a fingerprint of both);
+- one clone of the template per pytest-xdist worker (CREATE DATABASE ...
+  TEMPLATE copies files, so it is much faster than creating and seeding);
+- one empty database per worker, for the tests which build a schema.
+"""
+
+import asyncio
+import hashlib
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlalchemy.schema import CreateIndex, CreateTable
+from app.db.data import APPLICATIONS_DATA, EMPLOYERS_DATA, JOBS_DATA, USERS_DATA
+from app.db.migrations import MIGRATIONS, stamp_migrations
+from app.db.models import Base
+from app.db.seed import load_sample_data
+
+# Key of the advisory lock under which test databases are created, so that
+# concurrent workers build the template only once.
+TEST_DATABASES_LOCK_KEY = 2_093_145_788
+
+
+def get_fingerprint() -> str:
+    dialect = postgresql.dialect()
+    ddl = [
+        str(CreateTable(table).compile(dialect=dialect))
+        for table in Base.metadata.sorted_tables
+    ]
+    ddl += [
+        str(CreateIndex(index).compile(dialect=dialect))
+        for table in Base.metadata.sorted_tables
+        for index in sorted(table.indexes, key=lambda index: index.name)
+    ]
+    data = repr((EMPLOYERS_DATA, JOBS_DATA, USERS_DATA, APPLICATIONS_DATA))
+    migrations = repr([migration.VERSION for migration in MIGRATIONS])
+    content = "\n".join(ddl + [data, migrations])
+    return hashlib.sha256(content.encode()).hexdigest()[:12]
+
+
+async def build_template(url: URL):
+    engine = create_async_engine(url, poolclass=NullPool)
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        await stamp_migrations(engine, MIGRATIONS)
+        async with AsyncSession(engine) as session:
+            await load_sample_data(session)
+            await session.commit()
+    finally:
+        await engine.dispose()
+
+
+class WorkerDatabases:
+    def __init__(self, url: str, worker_id: str):
+        self.url = make_url(url)
+        self.template_name = f"{self.url.database}_template_{get_fingerprint()}"
+        self.name = f"{self.url.database}_{worker_id}"
+        self.empty_name = f"{self.url.database}_{worker_id}_empty"
+        # Databases are created and dropped from the maintenance database.
+        self.admin_engine = create_engine(
+            self.url.set(database="postgres"),
+            isolation_level="AUTOCOMMIT",
+            poolclass=NullPool,
+        )
+
+    def get_url(self, name: str) -> URL:
+        return self.url.set(database=name)
+
+    def exists(self, connection, name: str) -> bool:
+        return (
+            connection.execute(
+                text("SELECT 1 FROM pg_database WHERE datname = :name"),
+                {"name": name},
+            ).scalar()
+            is not None
+        )
+
+    def drop(self, connection, name: str):
+        connection.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+
+    def create(self):
+        """
+        Creates the worker's databases, and the template first if needed.
+        """
+        with self.admin_engine.connect() as connection:
+            connection.execute(
+                text("SELECT pg_advisory_lock(:key)"),
+                {"key": TEST_DATABASES_LOCK_KEY},
+            )
+            try:
+                if not self.exists(connection, self.template_name):
+                    self.drop_stale_templates(connection)
+                    # Built under a temporary name, so that a failed build
+                    # isn't mistaken for a template by the next run.
+                    building_name = f"{self.template_name}_building"
+                    self.drop(connection, building_name)
+                    connection.execute(text(f'CREATE DATABASE "{building_name}"'))
+                    asyncio.run(build_template(self.get_url(building_name)))
+                    connection.execute(
+                        text(
+                            f'ALTER DATABASE "{building_name}" '
+                            f'RENAME TO "{self.template_name}"'
+                        )
+                    )
+
+                for name in (self.name, self.empty_name):
+                    self.drop(connection, name)
+                connection.execute(
+                    text(
+                        f'CREATE DATABASE "{self.name}" '
+                        f'TEMPLATE "{self.template_name}"'
+                    )
+                )
+                connection.execute(text(f'CREATE DATABASE "{self.empty_name}"'))
+            finally:
+                connection.execute(
+                    text("SELECT pg_advisory_unlock(:key)"),
+                    {"key": TEST_DATABASES_LOCK_KEY},
+                )
+
+    def drop_stale_templates(self, connection):
+        prefix = f"{self.url.database}_template_"
+        names = (
+            connection.execute(
+                text(
+                    "SELECT datname FROM pg_database WHERE starts_with(datname, :prefix)"
+                ),
+                {"prefix": prefix},
+            )
+            .scalars()
+            .all()
+        )
+        for name in names:
+            self.drop(connection, name)
+
+    def drop_worker_databases(self):
+        with self.admin_engine.connect() as connection:
+            for name in (self.name, self.empty_name):
+                self.drop(connection, name)
+        self.admin_engine.dispose()
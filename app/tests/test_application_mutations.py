@@ -1,15 +1,21 @@
 import pytest
 from app.db.data import APPLICATIONS_DATA, JOBS_DATA
-from .utils import post_graphql, get_job_ids_for_user, get_test_first_non_admin_id
+from .utils import (
+    post_graphql,
+    get_job_ids_for_user,
+    get_test_first_non_admin_id,
+    get_nodes,
+)
 from app.errors.error_messages import ALREADY_APPLIED
 from app.errors.custom_errors import ResourceNotFound
 from app.db.repositories.application_repository import ApplicationRepository
 
 
-def assert_no_new_application_added(db_session):
-    applications = ApplicationRepository.get_all_applications(
-        db_session=db_session,
-        gql=False,
+def assert_no_new_application_added(portal, db_session):
+    applications = portal.call(
+        ApplicationRepository.get_all_applications,
+        db_session,
+        False,
     )
     assert len(applications) == len(APPLICATIONS_DATA)
 
@@ -34,15 +40,19 @@ def test_add_new_application(test_client, graphql_endpoint, user_header):
     query = """
         query {
             applications {
-                jobId
-                userId
-                id
+                edges {
+                    node {
+                        jobId
+                        userId
+                        id
+                    }
+                }
             }
         }
     """
     result = post_graphql(test_client, graphql_endpoint, query, headers=user_header)
     assert "errors" not in result
-    applications = result["data"]["applications"]
+    applications = get_nodes(result["data"]["applications"])
     found_new_application = False
     for application in applications:
         if application["id"] == len(APPLICATIONS_DATA) + 1:
@@ -83,3 +93,87 @@ def test_add_application_to_nonexistent_job(test_client, graphql_endpoint, user_
     result = post_graphql(test_client, graphql_endpoint, query, headers=user_header)
     assert "errors" in result
     assert result["errors"][0]["message"] == ResourceNotFound.get_message("Job")
+
+
+@pytest.mark.api
+@pytest.mark.mutation
+@pytest.mark.auth
+def test_apply_to_jobs(test_client, graphql_endpoint, user_header):
+    user_id = get_test_first_non_admin_id()
+    new_job_id = get_job_ids_for_user(user_id, applied=False)[0]
+    applied_job_id = get_job_ids_for_user(user_id, applied=True)[0]
+    missing_job_id = len(JOBS_DATA) + 1
+
+    query = f"""
+        mutation {{
+            applyToJobs(jobIds: [{new_job_id}, {applied_job_id}, {missing_job_id}, {new_job_id}]) {{
+                created {{
+                    id
+                    userId
+                    jobId
+                }}
+                errors {{
+                    index
+                    message
+                }}
+            }}
+        }}
+    """
+    result = post_graphql(test_client, graphql_endpoint, query, headers=user_header)
+    assert "errors" not in result
+    assert result["data"]["applyToJobs"]["created"] == [
+        {"id": len(APPLICATIONS_DATA) + 1, "userId": user_id, "jobId": new_job_id}
+    ]
+    assert result["data"]["applyToJobs"]["errors"] == [
+        {"index": 1, "message": ALREADY_APPLIED},
+        {"index": 2, "message": ResourceNotFound.get_message("Job")},
+        {"index": 3, "message": ALREADY_APPLIED},
+    ]
+
+
+@pytest.mark.api
+@pytest.mark.mutation
+@pytest.mark.auth
+def test_apply_to_jobs_as_admin(
+    test_client, graphql_endpoint, admin_header, portal, db_session
+):
+    query = """
+        mutation {
+            applyToJobs(jobIds: [1]) {
+                created {
+                    id
+                }
+            }
+        }
+    """
+    result = post_graphql(test_client, graphql_endpoint, query, headers=admin_header)
+    assert "errors" in result
+    assert_no_new_application_added(portal, db_session)
+
+
+@pytest.mark.api
+@pytest.mark.mutation
+@pytest.mark.auth
+def test_apply_to_job_in_one_statement(
+    test_client, graphql_endpoint, user_header, executed_statements
+):
+    user_id = get_test_first_non_admin_id()
+    job_ids = [
+        get_job_ids_for_user(user_id, applied=False)[0],
+        get_job_ids_for_user(user_id, applied=True)[0],
+        len(JOBS_DATA) + 1,
+    ]
+    for job_id in job_ids:
+        executed_statements.clear()
+        query = f"""
+            mutation {{
+                applyToJob(jobId: {job_id})
+            }}
+        """
+        post_graphql(test_client, graphql_endpoint, query, headers=user_header)
+
+        # The job check, the duplicate check and the insert, all in one
+        # statement.
+        statements = [s for s in executed_statements if "applications" in s]
+        assert len(statements) == 1
+        assert "ON CONFLICT" in statements[0]
@@ -1,12 +1,27 @@
+import asyncio
+import threading
+from app.auth import auth_utils
 from app.auth.auth_utils import (
     generate_jwt_token,
     decode_jwt_token_return_email,
     hash_password,
+    hash_password_async,
     verify_password,
+    verify_password_async,
 )
 import pytest
 from freezegun import freeze_time
 from graphql import GraphQLError
+from app.auth.token_versions import TokenVersionCache
+from app.db.data import USERS_DATA
+from app.db.repositories.user_repository import UserRepository
+from app.errors.error_messages import INSUFFICIENT_PRIVILEGES, REVOKED_TOKEN
+from .utils import (
+    BaseQueries,
+    SessionmakerSpy,
+    get_test_first_non_admin_id,
+    post_graphql,
+)
 
 
 @pytest.mark.auth
@@ -22,11 +37,33 @@ def test_hash_password():
         assert verify_password(password_hash, "incorrectpass")
 
 
+@pytest.mark.auth
+def test_hash_password_off_the_event_loop(portal, monkeypatch):
+    hashing_threads = []
+
+    def record_hash_password(password: str) -> str:
+        hashing_threads.append(threading.current_thread())
+        return hash_password(password)
+
+    monkeypatch.setattr(auth_utils, "hash_password", record_hash_password)
+
+    async def hash_and_verify():
+        password_hash = await hash_password_async("abc123")
+        assert await verify_password_async(password_hash, "abc123")
+        with pytest.raises(GraphQLError):
+            await verify_password_async(password_hash, "incorrectpass")
+        return threading.current_thread()
+
+    loop_thread = portal.call(hash_and_verify)
+    assert len(hashing_threads) == 1
+    assert hashing_threads[0] is not loop_thread
+
+
 @pytest.mark.auth
 def test_jwt_encode_decode():
     email = "abc@example.com"
     with freeze_time("2025-04-03 12:00:00"):
-        token = generate_jwt_token(email)
+        token = generate_jwt_token(1, email, "user")
 
     # Token still fresh.
     with freeze_time("2025-04-03 12:10:00"):
@@ -36,3 +73,85 @@ def test_jwt_encode_decode():
     with freeze_time("2025-04-03 12:15:01"):
         with pytest.raises(GraphQLError):
             decode_jwt_token_return_email(token)
+
+
+@pytest.mark.api
+@pytest.mark.auth
+def test_user_is_authenticated_once_per_request(
+    test_client, graphql_endpoint, admin_header, executed_statements
+):
+    query = """
+    query { jobs { edges { node { applications { edges { node { id } } } } } } }
+    """
+    result = post_graphql(test_client, graphql_endpoint, query, headers=admin_header)
+    assert "errors" not in result
+    assert len(result["data"]["jobs"]["edges"]) > 1
+
+    # Only the revoked token versions are loaded, once.
+    statements = [s for s in executed_statements if "FROM users" in s]
+    assert len(statements) == 1
+    assert "token_version > " in statements[0]
+
+    # The user is then authenticated from their token's claims alone.
+    executed_statements.clear()
+    post_graphql(test_client, graphql_endpoint, query, headers=admin_header)
+    assert not [s for s in executed_statements if "FROM users" in s]
+
+
+@pytest.mark.api
+@pytest.mark.auth
+def test_revoke_tokens(test_client, graphql_endpoint, user_header, admin_header):
+    user_id = get_test_first_non_admin_id()
+    query = BaseQueries.APPLICATIONS
+    assert "errors" not in post_graphql(
+        test_client, graphql_endpoint, query, headers=user_header
+    )
+
+    # Users can't revoke other users' tokens.
+    revoke = f"mutation {{ revokeTokens(userId: {user_id + 1}) }}"
+    result = post_graphql(test_client, graphql_endpoint, revoke, headers=user_header)
+    assert result["errors"][0]["message"] == INSUFFICIENT_PRIVILEGES
+
+    revoke = f"mutation {{ revokeTokens(userId: {user_id}) }}"
+    result = post_graphql(test_client, graphql_endpoint, revoke, headers=user_header)
+    assert result["data"]["revokeTokens"]
+
+    result = post_graphql(test_client, graphql_endpoint, query, headers=user_header)
+    assert result["errors"][0]["message"] == REVOKED_TOKEN
+    # Other users' tokens are still valid.
+    assert "errors" not in post_graphql(
+        test_client, graphql_endpoint, query, headers=admin_header
+    )
+
+    # New tokens carry the new version.
+    user = USERS_DATA[user_id - 1]
+    token = generate_jwt_token(user_id, user["email"], user["role"], 1)
+    headers = {"Authorization": f"Bearer {token}"}
+    assert "errors" not in post_graphql(
+        test_client, graphql_endpoint, query, headers=headers
+    )
+
+
+@pytest.mark.auth
+def test_token_versions_are_refreshed(db_session, portal):
+    cache = TokenVersionCache(refresh_seconds=0)
+    sessionmaker = SessionmakerSpy(db_session)
+    assert portal.call(cache.get_version, sessionmaker, 1) == 0
+
+    # Revoked by another worker.
+    portal.call(UserRepository.revoke_tokens, db_session, 1)
+    assert portal.call(cache.get_version, sessionmaker, 1) == 1
+
+
+@pytest.mark.auth
+def test_token_versions_are_loaded_once_by_concurrent_requests(db_session, portal):
+    cache = TokenVersionCache(refresh_seconds=60)
+    sessionmaker = SessionmakerSpy(db_session)
+
+    async def get_versions():
+        return await asyncio.gather(
+            *(cache.get_version(sessionmaker, 1) for _ in range(5))
+        )
+
+    assert portal.call(get_versions) == [0] * 5
+    assert sessionmaker.calls == 1
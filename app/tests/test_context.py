@@ -0,0 +1,86 @@
+import pytest
+from app.db.database import get_sessionmaker, get_replica_sessionmaker
+from app.gql.context import RequestContext
+from app.main import app
+from .utils import post_graphql, SessionmakerSpy
+
+
+@pytest.fixture(scope="function")
+def sessionmaker_spy(test_client, db_session):
+    sessionmaker_spy = SessionmakerSpy(db_session)
+    app.dependency_overrides[get_sessionmaker] = lambda: sessionmaker_spy
+    app.dependency_overrides[get_replica_sessionmaker] = lambda: sessionmaker_spy
+    return sessionmaker_spy
+
+
+@pytest.mark.ops
+def test_loaders_are_created_on_first_access():
+    sessionmaker_spy = SessionmakerSpy(session=object())
+    context = RequestContext(sessionmaker_spy, sessionmaker_spy)
+    assert sessionmaker_spy.calls == 0
+
+    loader = context["loaders"]["user_applications_from_job"]
+    assert context["loaders"]["user_applications_from_job"] is loader
+    assert list(context["loaders"]) == ["user_applications_from_job"]
+
+    context["loaders"]["employer_from_jobs"]
+    assert sessionmaker_spy.calls == 1
+
+
+@pytest.mark.ops
+@pytest.mark.query
+def test_session_is_created_on_first_use(
+    test_client,
+    graphql_endpoint,
+    sessionmaker_spy,
+):
+    result = post_graphql(
+        test_client, graphql_endpoint, "query { jobs { edges { node { title } } } }"
+    )
+    assert "errors" not in result
+    assert sessionmaker_spy.calls == 1
+
+
+@pytest.mark.ops
+@pytest.mark.query
+def test_rejected_query_does_not_create_session(
+    test_client,
+    graphql_endpoint,
+    sessionmaker_spy,
+):
+    query = """
+    query {
+        employers {
+            edges {
+                node {
+                    jobs {
+                        edges {
+                            node {
+                                employer {
+                                    jobs {
+                                        edges {
+                                            node {
+                                                employer {
+                                                    jobs {
+                                                        edges {
+                                                            node {
+                                                                id
+                                                            }
+                                                        }
+                                                    }
+                                                }
+                                            }
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+    """
+    result = post_graphql(test_client, graphql_endpoint, query)
+    assert "errors" in result
+    assert sessionmaker_spy.calls == 0
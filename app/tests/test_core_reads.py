@@ -0,0 +1,48 @@
+import pytest
+from app.db.data import JOBS_DATA, USERS_DATA
+from app.db.models import Job as Job_sql
+from app.db.repositories.job_repository import JobRepository
+from app.db.repositories.user_repository import UserRepository
+from app.gql.types import Job_gql, User_gql
+from app.sql_to_gql import get_gql_field_names, rows_to_gql
+
+
+@pytest.mark.sql
+def test_gql_reads_skip_the_orm(db_session, portal):
+    async def read_jobs():
+        db_session.expunge_all()
+        jobs = await JobRepository.get_all_jobs(db_session, gql=True)
+        return jobs, len(db_session.identity_map)
+
+    jobs, identity_map_size = portal.call(read_jobs)
+    assert identity_map_size == 0
+    assert all(isinstance(job, Job_gql) for job in jobs)
+    assert sorted(job.title for job in jobs) == sorted(
+        job["title"] for job in JOBS_DATA
+    )
+
+
+def get_selected_column_names(statement: str) -> set:
+    select_list = statement.split("SELECT", 1)[1].split("FROM", 1)[0]
+    return {column.strip().split(".")[-1] for column in select_list.split(",")}
+
+
+@pytest.mark.sql
+def test_gql_reads_only_select_gql_columns(db_session, portal, executed_statements):
+    users = portal.call(UserRepository.get_all_users, db_session, True)
+    assert len(users) == len(USERS_DATA)
+    assert all(isinstance(user, User_gql) for user in users)
+
+    statements = [s for s in executed_statements if "FROM users" in s]
+    assert len(statements) == 1
+    column_names = get_selected_column_names(statements[0])
+    assert column_names == set(get_gql_field_names(User_gql))
+    assert "password_hash" not in column_names
+
+
+@pytest.mark.sql
+def test_unselected_columns_are_none(db_session, portal):
+    rows = portal.call(Job_sql.get_all, db_session, ("id", "title"), True)
+    jobs = rows_to_gql(Job_gql, rows)
+    assert len(jobs) == len(JOBS_DATA)
+    assert all(job.description is None and job.employer_id is None for job in jobs)
@@ -1,3 +1,4 @@
+from sqlalchemy import select
 from sqlalchemy.orm import joinedload
 from app.db.models import (
     Job as Job_sql,
@@ -7,21 +8,36 @@ from app.db.data import JOBS_DATA, EMPLOYERS_DATA
 import pytest
 
 
-@pytest.mark.ops
-def test_jobs_query(db_session):
+async def query_jobs_and_employers(db_session):
     # Query jobs with their employers
-    jobs = db_session.query(Job_sql).options(joinedload(Job_sql.employer)).all()
+    jobs = (
+        await db_session.scalars(
+            select(Job_sql).options(joinedload(Job_sql.employer)),
+        )
+    ).all()
+
+    # Query employers and their posted jobs.
+    employers = (
+        (
+            await db_session.scalars(
+                select(Employer_sql).options(joinedload(Employer_sql.jobs)),
+            )
+        )
+        .unique()
+        .all()
+    )
+    return jobs, employers
+
+
+@pytest.mark.ops
+def test_jobs_query(db_session, portal):
+    jobs, employers = portal.call(query_jobs_and_employers, db_session)
 
     # Job assertions
     assert len(jobs) == len(JOBS_DATA)
     assert jobs[0].title == JOBS_DATA[0]["title"]
     assert jobs[0].employer.name == EMPLOYERS_DATA[0]["name"]
 
-    # Query employers and their posted jobs.
-    employers = (
-        db_session.query(Employer_sql).options(joinedload(Employer_sql.jobs)).all()
-    )
-
     # Employer assertions.
     assert len(employers) == len(EMPLOYERS_DATA)
     assert (employers[0].name) == EMPLOYERS_DATA[0]["name"]
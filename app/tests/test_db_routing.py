@@ -0,0 +1,223 @@
+import pytest
+from freezegun import freeze_time
+from app.auth import auth_utils
+from app.auth.auth_utils import decode_jwt_token
+from app.db.database import get_replica_sessionmaker, get_sessionmaker
+from app.db.routing import WriteTracker
+from app.main import app
+from .utils import (
+    post_graphql,
+    BaseQueries,
+    SessionmakerSpy,
+    get_test_first_non_admin_email,
+)
+
+
+@pytest.fixture(scope="function")
+def replica_sessionmaker(test_client, db_session):
+    # The test session stands in for the replica.
+    replica_sessionmaker = SessionmakerSpy(db_session)
+    app.dependency_overrides[get_replica_sessionmaker] = lambda: replica_sessionmaker
+    return replica_sessionmaker
+
+
+@pytest.fixture(scope="function")
+def write_tracker(monkeypatch):
+    write_tracker = WriteTracker(window_seconds=5)
+    monkeypatch.setattr("app.gql.extensions.write_tracker", write_tracker)
+    return write_tracker
+
+
+@pytest.mark.ops
+def test_write_tracker_window():
+    write_tracker = WriteTracker(window_seconds=5)
+    with freeze_time("2025-04-03 12:00:00"):
+        write_tracker.record_write("caller")
+        assert write_tracker.wrote_recently("caller")
+        assert not write_tracker.wrote_recently("other caller")
+
+    with freeze_time("2025-04-03 12:00:06"):
+        assert not write_tracker.wrote_recently("caller")
+
+
+@pytest.mark.ops
+@pytest.mark.query
+def test_query_runs_against_replica(
+    test_client,
+    graphql_endpoint,
+    replica_sessionmaker,
+    write_tracker,
+):
+    result = post_graphql(test_client, graphql_endpoint, BaseQueries.QUERY_ALL_JOBS)
+    assert "errors" not in result
+    assert replica_sessionmaker.calls
+
+
+@pytest.mark.ops
+@pytest.mark.query
+@pytest.mark.auth
+def test_token_versions_are_read_from_primary(
+    test_client,
+    graphql_endpoint,
+    db_session,
+    replica_sessionmaker,
+    write_tracker,
+    user_header,
+):
+    # Revocations may not have reached the replica yet.
+    sessionmaker = SessionmakerSpy(db_session)
+    app.dependency_overrides[get_sessionmaker] = lambda: sessionmaker
+    result = post_graphql(
+        test_client, graphql_endpoint, BaseQueries.APPLICATIONS, headers=user_header
+    )
+    assert "errors" not in result
+    assert replica_sessionmaker.calls
+    assert sessionmaker.calls == 1
+
+
+@pytest.mark.ops
+@pytest.mark.mutation
+def test_mutation_runs_against_primary(
+    test_client,
+    graphql_endpoint,
+    replica_sessionmaker,
+    write_tracker,
+    admin_header,
+):
+    result = post_graphql(
+        test_client, graphql_endpoint, BaseQueries.ADD_JOB, headers=admin_header
+    )
+    assert "errors" not in result
+    assert not replica_sessionmaker.calls
+
+
+@pytest.mark.ops
+@pytest.mark.query
+def test_query_after_own_write_sticks_to_primary(
+    test_client,
+    graphql_endpoint,
+    replica_sessionmaker,
+    write_tracker,
+    admin_header,
+    user_header,
+):
+    post_graphql(
+        test_client, graphql_endpoint, BaseQueries.ADD_JOB, headers=admin_header
+    )
+
+    # The writer reads from the primary.
+    result = post_graphql(
+        test_client,
+        graphql_endpoint,
+        BaseQueries.QUERY_ALL_JOBS,
+        headers=admin_header,
+    )
+    assert "errors" not in result
+    assert not replica_sessionmaker.calls
+
+    # Other callers read from the replica.
+    result = post_graphql(
+        test_client,
+        graphql_endpoint,
+        BaseQueries.QUERY_ALL_JOBS,
+        headers=user_header,
+    )
+    assert "errors" not in result
+    assert replica_sessionmaker.calls
+
+
+@pytest.mark.ops
+@pytest.mark.mutation
+def test_failed_mutation_is_not_recorded(
+    test_client,
+    graphql_endpoint,
+    write_tracker,
+    user_header,
+):
+    # Rejected, only admins can add jobs.
+    result = post_graphql(
+        test_client, graphql_endpoint, BaseQueries.ADD_JOB, headers=user_header
+    )
+    assert "errors" in result
+    assert not write_tracker.wrote_recently(get_test_first_non_admin_email())
+
+    result = post_graphql(
+        test_client,
+        graphql_endpoint,
+        BaseQueries.CREATE_APPLICATION,
+        headers=user_header,
+    )
+    assert "errors" not in result
+    assert write_tracker.wrote_recently(get_test_first_non_admin_email())
+
+
+@pytest.mark.ops
+@pytest.mark.auth
+def test_token_is_verified_once_per_request(
+    test_client,
+    graphql_endpoint,
+    write_tracker,
+    admin_header,
+    monkeypatch,
+):
+    decoded_tokens = []
+
+    def record_decode_jwt_token(jwt_token: str) -> dict:
+        decoded_tokens.append(jwt_token)
+        return decode_jwt_token(jwt_token)
+
+    monkeypatch.setattr(auth_utils, "decode_jwt_token", record_decode_jwt_token)
+    result = post_graphql(
+        test_client, graphql_endpoint, BaseQueries.ADD_JOB, headers=admin_header
+    )
+    assert "errors" not in result
+    assert len(decoded_tokens) == 1
+
+
+@pytest.mark.ops
+def test_write_tracker_prunes_once_per_window():
+    with freeze_time("2025-04-03 12:00:00"):
+        write_tracker = WriteTracker(window_seconds=5)
+        write_tracker.record_write("caller")
+    with freeze_time("2025-04-03 12:00:02"):
+        write_tracker.record_write("second caller")
+    with freeze_time("2025-04-03 12:00:06"):
+        # Prunes the first caller, whose window has passed.
+        write_tracker.record_write("third caller")
+        assert len(write_tracker._last_write_times) == 2
+    with freeze_time("2025-04-03 12:00:08"):
+        # The second caller's window has passed too, but the tracker was
+        # pruned less than a window ago.
+        write_tracker.record_write("fourth caller")
+        assert len(write_tracker._last_write_times) == 3
+        assert not write_tracker.wrote_recently("second caller")
+
+
+@pytest.mark.ops
+@pytest.mark.mutation
+def test_unauthenticated_writes_are_not_tracked(
+    test_client,
+    graphql_endpoint,
+    replica_sessionmaker,
+    write_tracker,
+):
+    query = """
+    mutation {
+        addUser(
+            username: "New User",
+            email: "anonymous@example.com",
+            password: "newpass123",
+            role: "user"
+        ) {
+            id
+        }
+    }
+    """
+    result = post_graphql(test_client, graphql_endpoint, query)
+    assert "errors" not in result
+    assert not write_tracker._last_write_times
+
+    # Anonymous readers still read from the replica.
+    result = post_graphql(test_client, graphql_endpoint, BaseQueries.QUERY_ALL_JOBS)
+    assert "errors" not in result
+    assert replica_sessionmaker.calls
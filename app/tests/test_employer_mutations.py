@@ -1,6 +1,6 @@
 import pytest
 from app.db.data import EMPLOYERS_DATA, JOBS_DATA
-from .utils import post_graphql
+from .utils import post_graphql, get_nodes
 from app.db.repositories.employer_repository import EmployerRepository
 from app.db.repositories.job_repository import JobRepository
 from app.db.repositories.application_repository import ApplicationRepository
@@ -61,6 +61,49 @@ def test_add_employer_existing_email(
     assert result["errors"][0]["message"] == EMPLOYER_ALREADY_EXISTS
 
 
+@pytest.mark.api
+@pytest.mark.mutation
+def test_add_employers(
+    test_client,
+    graphql_endpoint,
+    admin_header,
+):
+    existing_email = EMPLOYERS_DATA[0]["contact_email"]
+    query = f"""
+    mutation {{
+        addEmployers(employers: [
+            {{name: "X", contactEmail: "x@example.com", industry: "X industry"}},
+            {{name: "Y", contactEmail: "{existing_email}", industry: "Y industry"}},
+            {{name: "Z", contactEmail: "x@example.com", industry: "Z industry"}},
+            {{name: "W", contactEmail: "w@example.com", industry: "W industry"}},
+        ]) {{
+            created {{
+                id
+                name
+                contactEmail
+            }}
+            errors {{
+                index
+                message
+            }}
+        }}
+    }}
+    """
+    result = post_graphql(test_client, graphql_endpoint, query, headers=admin_header)
+    assert "errors" not in result
+
+    employers = result["data"]["addEmployers"]["created"]
+    assert employers == [
+        {"id": len(EMPLOYERS_DATA) + 1, "name": "X", "contactEmail": "x@example.com"},
+        {"id": len(EMPLOYERS_DATA) + 2, "name": "W", "contactEmail": "w@example.com"},
+    ]
+    # Emails taken either in the database or earlier in the batch.
+    assert result["data"]["addEmployers"]["errors"] == [
+        {"index": 1, "message": EMPLOYER_ALREADY_EXISTS},
+        {"index": 2, "message": EMPLOYER_ALREADY_EXISTS},
+    ]
+
+
 @pytest.mark.api
 @pytest.mark.mutation
 def test_successfully_update_existing_employer_name(
@@ -83,6 +126,56 @@ def test_successfully_update_existing_employer_name(
     assert employer["name"] == updated_name
 
 
+@pytest.mark.api
+@pytest.mark.mutation
+def test_update_employer_contact_email(
+    test_client,
+    graphql_endpoint,
+    admin_header,
+):
+    query = """
+    mutation {
+        updateEmployer(employerId: 2, contactEmail: "new@example.com") {
+            id
+            name
+            contactEmail
+        }
+    }
+    """
+    result = post_graphql(test_client, graphql_endpoint, query, headers=admin_header)
+    assert result["data"]["updateEmployer"] == {
+        "id": 2,
+        "name": EMPLOYERS_DATA[1]["name"],
+        "contactEmail": "new@example.com",
+    }
+
+
+@pytest.mark.api
+@pytest.mark.mutation
+def test_update_employer_to_existing_email(
+    test_client,
+    graphql_endpoint,
+    admin_header,
+    db_session,
+    portal,
+):
+    other_email = EMPLOYERS_DATA[0]["contact_email"]
+    query = f"""
+    mutation {{
+        updateEmployer(employerId: 2, contactEmail: "{other_email}") {{
+            id
+        }}
+    }}
+    """
+    result = post_graphql(test_client, graphql_endpoint, query, headers=admin_header)
+    assert result["data"] is None
+    assert result["errors"][0]["message"] == EMPLOYER_ALREADY_EXISTS
+
+    # The session is still usable, and the employer unchanged.
+    employer = portal.call(EmployerRepository.get_employer_by_id, db_session, 2)
+    assert employer.contact_email == EMPLOYERS_DATA[1]["contact_email"]
+
+
 @pytest.mark.api
 @pytest.mark.mutation
 def test_update_nonexisting_employer(
@@ -111,6 +204,7 @@ def test_delete_existing_employer(
     test_client,
     graphql_endpoint,
     db_session,
+    portal,
     admin_header,
 ):
     employer_id = 1
@@ -123,18 +217,16 @@ def test_delete_existing_employer(
     assert result["data"]["deleteEmployer"]
 
     # Check that the employer has actually been deleted.
-    employer = EmployerRepository.get_employer_by_id(
-        db_session=db_session,
-        id=employer_id,
-        gql=False,
+    employer = portal.call(
+        EmployerRepository.get_employer_by_id,
+        db_session,
+        employer_id,
+        False,
     )
     assert employer is None
 
     # Check that the jobs belonging to the employer have been deleted.
-    jobs = JobRepository.get_all_jobs(
-        db_session=db_session,
-        gql=False,
-    )
+    jobs = portal.call(JobRepository.get_all_jobs, db_session, False)
     remaining_job_ids = []
     for job_sql in jobs:
         assert job_sql.employer_id != employer_id
@@ -142,8 +234,8 @@ def test_delete_existing_employer(
 
     # Check that the applications corresponding to the deleted jobs
     # have been deleted.
-    remaining_applications = ApplicationRepository.get_all_applications(
-        db_session=db_session, gql=False
+    remaining_applications = portal.call(
+        ApplicationRepository.get_all_applications, db_session, False
     )
     for application in remaining_applications:
         assert application.job_id in remaining_job_ids
@@ -203,12 +295,16 @@ def test_add_jobs_to_new_employer(
     query {{
         employer(id: {new_employer_id}) {{
             jobs {{
-                id
+                edges {{
+                    node {{
+                        id
+                    }}
+                }}
             }}
         }}
     }}
     """
     result = post_graphql(test_client, graphql_endpoint, query, headers=admin_header)
-    jobs = result["data"]["employer"]["jobs"]
+    jobs = get_nodes(result["data"]["employer"]["jobs"])
     assert len(jobs) == 2
     assert sorted([job["id"] for job in jobs]) == [1, len(JOBS_DATA) + 1]
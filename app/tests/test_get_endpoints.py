@@ -1,5 +1,8 @@
+import json
 import pytest
+from app import main
 from app.db.data import JOBS_DATA, EMPLOYERS_DATA
+from app.db.streaming import NDJSON_MEDIA_TYPE
 
 
 @pytest.mark.api
@@ -24,3 +27,65 @@ def test_get_employers(test_client, employers_endpoint):
     assert len(response_json) == len(EMPLOYERS_DATA)
     for idx, employer_json in enumerate(response_json):
         assert employer_json["name"] == EMPLOYERS_DATA[idx]["name"]
+
+
+@pytest.mark.api
+@pytest.mark.sql
+def test_get_jobs_as_ndjson(test_client, jobs_endpoint, monkeypatch):
+    # Several batches (chunks) per response.
+    monkeypatch.setattr(main, "STREAM_BATCH_SIZE", 3)
+    response = test_client.get(jobs_endpoint, headers={"Accept": NDJSON_MEDIA_TYPE})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == NDJSON_MEDIA_TYPE
+
+    jobs = [json.loads(line) for line in response.text.splitlines()]
+    assert [job["title"] for job in jobs] == [job["title"] for job in JOBS_DATA]
+
+
+@pytest.mark.api
+@pytest.mark.sql
+def test_get_employers_in_batches(test_client, employers_endpoint, monkeypatch):
+    monkeypatch.setattr(main, "STREAM_BATCH_SIZE", 1)
+    response = test_client.get(employers_endpoint)
+    assert response.status_code == 200
+    assert [employer["name"] for employer in response.json()] == [
+        employer["name"] for employer in EMPLOYERS_DATA
+    ]
+
+
+@pytest.mark.api
+@pytest.mark.ops
+def test_get_db_pool_metrics(test_client, admin_header):
+    response = test_client.get("/metrics/db-pool", headers=admin_header)
+    assert response.status_code == 200
+
+    response_json = response.json()
+    for key in ["size", "checked_out", "overflow", "checkout_timeouts"]:
+        assert key in response_json
+    assert "+Inf" in response_json["wait_time_seconds_histogram"]
+
+
+@pytest.mark.api
+@pytest.mark.ops
+def test_get_statement_cache_metrics(test_client, jobs_endpoint, admin_header):
+    test_client.get(jobs_endpoint)
+    response = test_client.get("/metrics/statement-cache", headers=admin_header)
+    assert response.status_code == 200
+
+    response_json = response.json()
+    assert response_json["statements"]["statements"] > 0
+    assert "hit_rate" in response_json["compiled_sql"]
+
+
+@pytest.mark.api
+@pytest.mark.ops
+@pytest.mark.auth
+def test_metrics_are_only_served_to_admins(test_client, user_header):
+    for endpoint in (
+        "/metrics/db-pool",
+        "/metrics/db-pool/replica",
+        "/metrics/statement-cache",
+        "/metrics/startup",
+    ):
+        assert test_client.get(endpoint).status_code == 401
+        assert test_client.get(endpoint, headers=user_header).status_code == 403
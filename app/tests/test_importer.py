@@ -0,0 +1,136 @@
+import csv
+import json
+import pytest
+from app.auth.auth_utils import verify_password
+from app.db.data import EMPLOYERS_DATA, JOBS_DATA
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.db import importer
+from app.db.importer import InvalidImportError, import_rows, read_rows
+from app.db.repositories.employer_repository import EmployerRepository
+from app.db.repositories.job_repository import JobRepository
+from app.db.repositories.user_repository import UserRepository
+
+
+def write_csv(path, rows: list):
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_jsonl(path, rows: list):
+    with open(path, "w") as file:
+        file.writelines(f"{json.dumps(row)}\n" for row in rows)
+
+
+def run_import(portal, db_session, table_name: str, rows, batch_size: int = 2):
+    async def run():
+        connection = await db_session.connection()
+        return await import_rows(connection, table_name, rows, batch_size)
+
+    return portal.call(run)
+
+
+@pytest.mark.sql
+def test_import_employers_then_jobs_by_employer_email(db_session, portal, tmp_path):
+    employers_path = tmp_path / "employers.csv"
+    write_csv(
+        employers_path,
+        [
+            {"name": f"E{i}", "contact_email": f"e{i}@example.com", "industry": "X"}
+            for i in range(3)
+        ],
+    )
+    num_rows = run_import(
+        portal, db_session, "employers", read_rows(employers_path, "csv")
+    )
+    assert num_rows == 3
+
+    jobs_path = tmp_path / "jobs.jsonl"
+    employer_emails = [
+        "e0@example.com",
+        "e2@example.com",
+        EMPLOYERS_DATA[0]["contact_email"],
+    ]
+    write_jsonl(
+        jobs_path,
+        [
+            {"title": f"J{i}", "description": "D", "employer_email": email}
+            for i, email in enumerate(employer_emails)
+        ],
+    )
+    num_rows = run_import(portal, db_session, "jobs", read_rows(jobs_path, "jsonl"))
+    assert num_rows == 3
+
+    employers = portal.call(EmployerRepository.get_all_employers, db_session, True)
+    employer_ids = {employer.contact_email: employer.id for employer in employers}
+    jobs = portal.call(JobRepository.get_all_jobs, db_session, True)
+    imported_jobs = [job for job in jobs if job.id > len(JOBS_DATA)]
+    imported_jobs.sort(key=lambda job: job.id)
+    assert [job.employer_id for job in imported_jobs] == [
+        employer_ids[email] for email in employer_emails
+    ]
+
+
+@pytest.mark.sql
+def test_import_unknown_reference(db_session, portal):
+    rows = [{"title": "J", "description": "D", "employer_email": "x@example.com"}]
+    with pytest.raises(InvalidImportError):
+        run_import(portal, db_session, "jobs", rows)
+
+
+@pytest.mark.sql
+@pytest.mark.parametrize(
+    "last_row",
+    [
+        {"name": "E", "contact_email": "c@example.com", "industry": "X", "x": 1},
+        {"name": "E", "contact_email": "c@example.com"},
+        {"id": 100, "name": "E", "contact_email": "c@example.com", "industry": "X"},
+    ],
+)
+def test_import_rows_with_other_columns(db_session, portal, last_row):
+    # The last row is in a later batch than the first one.
+    rows = [
+        {"name": "E", "contact_email": f"{i}@example.com", "industry": "X"}
+        for i in range(2)
+    ] + [last_row]
+    with pytest.raises(InvalidImportError):
+        run_import(portal, db_session, "employers", rows)
+
+
+@pytest.mark.sql
+def test_import_with_ids_moves_sequence(db_session, portal):
+    rows = [{"id": 100, "name": "E", "contact_email": "e@example.com", "industry": "X"}]
+    run_import(portal, db_session, "employers", rows)
+
+    result = portal.call(
+        EmployerRepository.add_employers,
+        db_session,
+        [{"name": "F", "contact_email": "f@example.com", "industry": "X"}],
+    )
+    assert [employer.id for employer in result.created] == [101]
+
+
+@pytest.mark.sql
+def test_import_users_hashes_passwords(db_session, portal):
+    rows = [
+        {"username": "u", "email": "u@example.com", "password": "pw", "role": "user"}
+    ]
+    run_import(portal, db_session, "users", rows)
+
+    user = portal.call(UserRepository.get_user_by_email, db_session, "u@example.com")
+    assert verify_password(user.password_hash, "pw")
+
+
+@pytest.mark.sql
+@pytest.mark.parametrize("content", [None, '{"name": "E"\n'])
+def test_main_reports_unreadable_files(
+    empty_db_url, portal, monkeypatch, tmp_path, capsys, content
+):
+    monkeypatch.setattr(importer, "engine", create_async_engine(empty_db_url))
+    path = tmp_path / "employers.jsonl"
+    if content is not None:
+        path.write_text(content)
+
+    assert portal.call(importer.main, ["employers", str(path)]) == 1
+    assert capsys.readouterr().err.startswith("Import failed: ")
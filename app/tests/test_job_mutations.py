@@ -1,7 +1,12 @@
 import pytest
 from app.db.data import EMPLOYERS_DATA, JOBS_DATA
-from .utils import post_graphql
+from .utils import post_graphql, get_nodes
 from app.db.repositories.application_repository import ApplicationRepository
+from app.errors.custom_errors import ResourceNotFound
+from app.errors.error_messages import EMPTY_FILTER, TOO_MANY_ITEMS
+from app.db.repositories.job_repository import JobRepository
+from app.gql import bulk
+from app.gql.bulk import get_too_long_message
 
 
 @pytest.mark.api
@@ -124,13 +129,17 @@ def test_successfully_update_existing_job_employer(
     query {{
         employer(id: {updated_employer_id}) {{
             jobs {{
-                id
+                edges {{
+                    node {{
+                        id
+                    }}
+                }}
             }}
         }}
     }}
     """
     result = post_graphql(test_client, graphql_endpoint, query)
-    jobs = result["data"]["employer"]["jobs"]
+    jobs = get_nodes(result["data"]["employer"]["jobs"])
     assert 1 in [job["id"] for job in jobs]
 
 
@@ -156,11 +165,36 @@ def test_update_nonexisting_job(
     assert "not found" in result["errors"][0]["message"]
 
 
+@pytest.mark.api
+@pytest.mark.mutation
+def test_update_job_to_nonexisting_employer(
+    test_client,
+    graphql_endpoint,
+    admin_header,
+):
+    query = """
+    mutation {
+        updateJob(jobId: 1, employerId: 999) {
+            id
+        }
+    }
+    """
+    result = post_graphql(test_client, graphql_endpoint, query, headers=admin_header)
+    assert result["data"] is None
+    assert result["errors"][0]["message"] == ResourceNotFound.get_message("Employer")
+
+    # The job is unchanged and the session is still usable.
+    query = "query { job(id: 1) { employerId } }"
+    result = post_graphql(test_client, graphql_endpoint, query)
+    assert result["data"]["job"]["employerId"] == JOBS_DATA[0]["employer_id"]
+
+
 @pytest.mark.api
 @pytest.mark.mutation
 def test_delete_existing_job(
     test_client,
     db_session,
+    portal,
     graphql_endpoint,
     admin_header,
 ):
@@ -185,8 +219,177 @@ def test_delete_existing_job(
     assert result["data"]["job"] is None
 
     # Test cascade delete on applications.
-    applications = ApplicationRepository.get_all_applications_by_job_id(
-        db_session=db_session, job_id=job_id, gql=False
+    applications = portal.call(
+        ApplicationRepository.get_all_applications_by_job_id,
+        db_session,
+        job_id,
+        False,
     )
     for application in applications:
         assert application.job_id != job_id
+
+
+@pytest.mark.api
+@pytest.mark.mutation
+def test_add_jobs(
+    test_client,
+    graphql_endpoint,
+    admin_header,
+    executed_statements,
+):
+    missing_employer_id = len(EMPLOYERS_DATA) + 1
+    long_title = "x" * 151
+    query = f"""
+    mutation {{
+        addJobs(jobs: [
+            {{title: "A", description: "A descr", employerId: 1}},
+            {{title: "B", description: "B descr", employerId: {missing_employer_id}}},
+            {{title: "{long_title}", description: "C descr", employerId: 1}},
+            {{title: "D", description: "D descr", employerId: 2}},
+        ]) {{
+            created {{
+                id
+                title
+                employerId
+            }}
+            errors {{
+                index
+                message
+            }}
+        }}
+    }}
+    """
+    result = post_graphql(test_client, graphql_endpoint, query, headers=admin_header)
+    assert "errors" not in result
+
+    jobs = result["data"]["addJobs"]["created"]
+    assert jobs == [
+        {"id": len(JOBS_DATA) + 1, "title": "A", "employerId": 1},
+        {"id": len(JOBS_DATA) + 2, "title": "D", "employerId": 2},
+    ]
+    assert result["data"]["addJobs"]["errors"] == [
+        {"index": 1, "message": ResourceNotFound.get_message("Employer")},
+        {"index": 2, "message": get_too_long_message(["title"])},
+    ]
+
+    # All the valid jobs are added by one statement.
+    inserts = [s for s in executed_statements if s.startswith("INSERT INTO jobs")]
+    assert len(inserts) == 1
+
+
+@pytest.mark.api
+@pytest.mark.mutation
+def test_add_too_many_jobs(
+    test_client,
+    graphql_endpoint,
+    admin_header,
+    monkeypatch,
+):
+    monkeypatch.setattr(bulk, "MAX_BATCH_SIZE", 1)
+    query = """
+    mutation {
+        addJobs(jobs: [
+            {title: "A", description: "A descr", employerId: 1},
+            {title: "B", description: "B descr", employerId: 1},
+        ]) {
+            created {
+                id
+            }
+        }
+    }
+    """
+    result = post_graphql(test_client, graphql_endpoint, query, headers=admin_header)
+    assert result["errors"][0]["message"] == TOO_MANY_ITEMS
+
+
+@pytest.mark.api
+@pytest.mark.mutation
+def test_delete_jobs(
+    test_client,
+    db_session,
+    portal,
+    graphql_endpoint,
+    admin_header,
+    executed_statements,
+):
+    employer_job_ids = [
+        idx + 1 for idx, job in enumerate(JOBS_DATA) if job["employer_id"] == 1
+    ]
+    # Only the employer's jobs among the ids are deleted.
+    query = f"""
+    mutation {{
+        deleteJobs(filter: {{ids: [{employer_job_ids[0]}, {len(JOBS_DATA)}], employerId: 1}})
+    }}
+    """
+    result = post_graphql(test_client, graphql_endpoint, query, headers=admin_header)
+    assert result["data"]["deleteJobs"] == 1
+
+    query = """
+    mutation {
+        deleteJobs(filter: {employerId: 1})
+    }
+    """
+    result = post_graphql(test_client, graphql_endpoint, query, headers=admin_header)
+    assert result["data"]["deleteJobs"] == len(employer_job_ids) - 1
+
+    # One DELETE per mutation: the applications are deleted by the database,
+    # without being loaded.
+    assert len([s for s in executed_statements if s.startswith("DELETE")]) == 2
+    assert not [s for s in executed_statements if "applications" in s]
+
+    jobs = portal.call(JobRepository.get_all_jobs, db_session, False)
+    assert sorted(job.id for job in jobs) == [
+        idx + 1 for idx, job in enumerate(JOBS_DATA) if job["employer_id"] != 1
+    ]
+    applications = portal.call(
+        ApplicationRepository.get_all_applications, db_session, False
+    )
+    assert all(
+        application.job_id not in employer_job_ids for application in applications
+    )
+
+
+@pytest.mark.api
+@pytest.mark.mutation
+def test_delete_jobs_without_filter(
+    test_client,
+    graphql_endpoint,
+    admin_header,
+):
+    query = """
+    mutation {
+        deleteJobs(filter: {})
+    }
+    """
+    result = post_graphql(test_client, graphql_endpoint, query, headers=admin_header)
+    assert result["errors"][0]["message"] == EMPTY_FILTER
+
+
+@pytest.mark.api
+@pytest.mark.mutation
+def test_update_job_in_one_statement(
+    test_client,
+    graphql_endpoint,
+    admin_header,
+    executed_statements,
+):
+    query = """
+    mutation {
+        updateJob(jobId: 2, description: "New descr") {
+            id
+            title
+            description
+        }
+    }
+    """
+    result = post_graphql(test_client, graphql_endpoint, query, headers=admin_header)
+    assert result["data"]["updateJob"] == {
+        "id": 2,
+        "title": JOBS_DATA[1]["title"],
+        "description": "New descr",
+    }
+
+    # Only the given field is set, and the job isn't loaded first.
+    jobs_statements = [s for s in executed_statements if "jobs" in s]
+    assert len(jobs_statements) == 1
+    assert jobs_statements[0].startswith("UPDATE jobs SET description=")
@@ -1,8 +1,22 @@
 import pytest
+from datetime import datetime, timedelta, timezone
+from freezegun import freeze_time
 from app.db.data import USERS_DATA
 from .utils import post_graphql
-from app.auth.auth_utils import decode_jwt_token_return_email
-from app.errors.error_messages import INVALID_PASSWORD
+from argon2 import PasswordHasher
+from app.auth import auth_utils
+from app.auth.auth_utils import (
+    decode_jwt_token_return_email,
+    password_needs_rehash,
+    verify_password,
+)
+from app.db.repositories.user_repository import UserRepository
+from app.errors.error_messages import (
+    INVALID_PASSWORD,
+    INVALID_REFRESH_TOKEN,
+    REVOKED_TOKEN,
+)
+from app.settings.config import REFRESH_TOKEN_EXPIRATION_DAYS
 from app.errors.custom_errors import ResourceNotFound
 
 
@@ -55,3 +69,103 @@ def test_login_incorrect_password(test_client, graphql_endpoint):
     assert "errors" in result
     error_msgs = [error["message"] for error in result["errors"]]
     assert INVALID_PASSWORD in error_msgs
+
+
+@pytest.mark.api
+@pytest.mark.mutation
+def test_login_rehashes_password_with_old_parameters(
+    test_client, graphql_endpoint, db_session, portal
+):
+    user = USERS_DATA[0]
+    old_hasher = PasswordHasher(time_cost=1, memory_cost=8192, parallelism=1)
+    old_hash = old_hasher.hash(user["password"])
+    portal.call(UserRepository.update_password_hash, db_session, 1, old_hash)
+    assert password_needs_rehash(old_hash)
+
+    query = f"""
+    mutation {{
+        loginUser(email: "{user["email"]}", password: "{user["password"]}")
+    }}
+    """
+    result = post_graphql(test_client, graphql_endpoint, query)
+    assert "errors" not in result
+
+    user_sql = portal.call(UserRepository.get_user_by_email, db_session, user["email"])
+    assert user_sql.password_hash != old_hash
+    assert not password_needs_rehash(user_sql.password_hash)
+    assert verify_password(user_sql.password_hash, user["password"])
+
+
+def login_with_refresh_token(test_client, graphql_endpoint, user: dict) -> dict:
+    query = f"""
+    mutation {{
+        loginUserWithRefreshToken(
+            email: "{user["email"]}", password: "{user["password"]}"
+        ) {{
+            accessToken
+            refreshToken
+        }}
+    }}
+    """
+    result = post_graphql(test_client, graphql_endpoint, query)
+    return result["data"]["loginUserWithRefreshToken"]
+
+
+def refresh_token(test_client, graphql_endpoint, token: str) -> dict:
+    query = f"""
+    mutation {{
+        refreshToken(refreshToken: "{token}") {{
+            accessToken
+            refreshToken
+        }}
+    }}
+    """
+    return post_graphql(test_client, graphql_endpoint, query)
+
+
+@pytest.mark.api
+@pytest.mark.mutation
+def test_refresh_token_rotates(test_client, graphql_endpoint, monkeypatch):
+    user = USERS_DATA[0]
+    tokens = login_with_refresh_token(test_client, graphql_endpoint, user)
+    assert user["email"] == decode_jwt_token_return_email(tokens["accessToken"])
+
+    # Refreshing doesn't verify the password.
+    def fail_verify_password(*args):
+        raise AssertionError("The password was verified.")
+
+    monkeypatch.setattr(auth_utils, "verify_password", fail_verify_password)
+    result = refresh_token(test_client, graphql_endpoint, tokens["refreshToken"])
+    new_tokens = result["data"]["refreshToken"]
+    assert user["email"] == decode_jwt_token_return_email(new_tokens["accessToken"])
+    assert new_tokens["refreshToken"] != tokens["refreshToken"]
+
+    # Refresh tokens can only be used once.
+    result = refresh_token(test_client, graphql_endpoint, tokens["refreshToken"])
+    assert result["errors"][0]["message"] == INVALID_REFRESH_TOKEN
+    result = refresh_token(test_client, graphql_endpoint, new_tokens["refreshToken"])
+    assert "errors" not in result
+
+
+@pytest.mark.api
+@pytest.mark.mutation
+def test_refresh_token_expires(test_client, graphql_endpoint):
+    tokens = login_with_refresh_token(test_client, graphql_endpoint, USERS_DATA[0])
+    expired_time = datetime.now(timezone.utc) + timedelta(
+        days=REFRESH_TOKEN_EXPIRATION_DAYS, seconds=1
+    )
+    with freeze_time(expired_time):
+        result = refresh_token(test_client, graphql_endpoint, tokens["refreshToken"])
+    assert result["errors"][0]["message"] == INVALID_REFRESH_TOKEN
+
+
+@pytest.mark.api
+@pytest.mark.mutation
+def test_refresh_token_of_revoked_user(
+    test_client, graphql_endpoint, db_session, portal
+):
+    tokens = login_with_refresh_token(test_client, graphql_endpoint, USERS_DATA[0])
+    portal.call(UserRepository.revoke_tokens, db_session, 1)
+
+    result = refresh_token(test_client, graphql_endpoint, tokens["refreshToken"])
+    assert result["errors"][0]["message"] == REVOKED_TOKEN
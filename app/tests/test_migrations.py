@@ -0,0 +1,90 @@
+import pytest
+from sqlalchemy import text
+from app.db.migrations import MIGRATIONS, run_migrations, get_applied_versions
+from app.db.migrations import (
+    v0002_hot_lookup_indexes,
+    v0003_keyset_indexes,
+    v0004_nested_page_indexes,
+    v0005_user_token_versions,
+)
+
+
+async def get_valid_index_names(engine) -> set:
+    async with engine.connect() as connection:
+        result = await connection.execute(
+            text(
+                "SELECT c.relname FROM pg_index i "
+                "JOIN pg_class c ON c.oid = i.indexrelid WHERE i.indisvalid"
+            )
+        )
+        return set(result.scalars().all())
+
+
+@pytest.mark.ops
+def test_migrations_build_schema_from_scratch(migrations_engine, portal):
+    applied = portal.call(run_migrations, migrations_engine, MIGRATIONS)
+    assert applied == [migration.VERSION for migration in MIGRATIONS]
+
+    index_names = portal.call(get_valid_index_names, migrations_engine)
+    dropped_index_names = v0004_nested_page_indexes.DROPPED_INDEXES
+    for name, _, _, _ in (
+        v0002_hot_lookup_indexes.INDEXES
+        + v0003_keyset_indexes.INDEXES
+        + v0004_nested_page_indexes.INDEXES
+    ):
+        if name not in dropped_index_names:
+            assert name in index_names
+    for name in dropped_index_names:
+        assert name not in index_names
+    assert v0005_user_token_versions.INDEX[0] in index_names
+
+    # Running again is a no-op.
+    assert portal.call(run_migrations, migrations_engine, MIGRATIONS) == []
+
+
+@pytest.mark.ops
+def test_migrations_keep_existing_data(migrations_engine, portal):
+    async def create_populated_initial_schema():
+        await run_migrations(migrations_engine, MIGRATIONS[:1])
+        async with migrations_engine.begin() as connection:
+            await connection.execute(
+                text(
+                    "INSERT INTO employers (name, contact_email, industry) "
+                    "VALUES ('A', 'a@example.com', 'Tech')"
+                )
+            )
+
+    async def count_employers() -> int:
+        async with migrations_engine.connect() as connection:
+            result = await connection.execute(text("SELECT count(*) FROM employers"))
+            return result.scalar()
+
+    portal.call(create_populated_initial_schema)
+    applied = portal.call(run_migrations, migrations_engine, MIGRATIONS)
+
+    assert applied == [migration.VERSION for migration in MIGRATIONS[1:]]
+    assert portal.call(get_applied_versions, migrations_engine) == {
+        migration.VERSION for migration in MIGRATIONS
+    }
+    assert portal.call(count_employers) == 1
+
+
+@pytest.mark.ops
+def test_unique_email_migration_rejects_duplicates(migrations_engine, portal):
+    async def create_duplicate_users():
+        await run_migrations(migrations_engine, MIGRATIONS[:1])
+        async with migrations_engine.begin() as connection:
+            for _ in range(2):
+                await connection.execute(
+                    text(
+                        "INSERT INTO users (username, email, password_hash, role) "
+                        "VALUES ('a', 'a@example.com', 'x', 'user')"
+                    )
+                )
+
+    portal.call(create_duplicate_users)
+    with pytest.raises(Exception):
+        portal.call(run_migrations, migrations_engine, MIGRATIONS)
+
+    # The failed migration is not recorded, so it can be retried.
+    assert 2 not in portal.call(get_applied_versions, migrations_engine)
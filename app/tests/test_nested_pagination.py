@@ -0,0 +1,198 @@
+import pytest
+from app.db.data import APPLICATIONS_DATA
+from app.errors.error_messages import INVALID_CURSOR, INVALID_PAGE_SIZE
+from app.gql.pagination import encode_cursor
+from .utils import post_graphql, get_nodes
+
+
+def get_application_ids_by_user(user_id: int) -> list:
+    return [
+        idx + 1
+        for idx, application in enumerate(APPLICATIONS_DATA)
+        if application["user_id"] == user_id
+    ]
+
+
+@pytest.mark.api
+@pytest.mark.query
+def test_first_jobs_of_each_employer(
+    test_client,
+    graphql_endpoint,
+    executed_statements,
+):
+    query = f"""
+    query {{
+        employers {{
+            edges {{
+                node {{
+                    first: jobs(first: 1) {{
+                        edges {{
+                            node {{
+                                id
+                            }}
+                        }}
+                        pageInfo {{
+                            hasNextPage
+                            endCursor
+                        }}
+                    }}
+                    next: jobs(first: 1, after: "{encode_cursor(1)}") {{
+                        edges {{
+                            node {{
+                                id
+                            }}
+                        }}
+                    }}
+                }}
+            }}
+        }}
+    }}
+    """
+    result = post_graphql(test_client, graphql_endpoint, query)
+    assert "errors" not in result
+    employers = get_nodes(result["data"]["employers"])
+    assert [
+        [job["id"] for job in get_nodes(employer["first"])] for employer in employers
+    ] == [[1], [3]]
+    assert [employer["first"]["pageInfo"] for employer in employers] == [
+        {"hasNextPage": True, "endCursor": encode_cursor(1)},
+        {"hasNextPage": True, "endCursor": encode_cursor(3)},
+    ]
+    assert [
+        [job["id"] for job in get_nodes(employer["next"])] for employer in employers
+    ] == [[2], [3]]
+
+    # One statement per nested field, for all employers.
+    jobs_statements = [s for s in executed_statements if "FROM jobs" in s]
+    assert len(jobs_statements) == 2
+    assert all("LATERAL" in statement for statement in jobs_statements)
+
+
+@pytest.mark.api
+@pytest.mark.query
+def test_nested_lists_default_to_a_page(test_client, graphql_endpoint, monkeypatch):
+    monkeypatch.setattr("app.gql.pagination.DEFAULT_PAGE_SIZE", 1)
+    query = """
+    query {
+        employers(first: 10) {
+            edges {
+                node {
+                    jobs {
+                        edges {
+                            node {
+                                id
+                            }
+                        }
+                        pageInfo {
+                            hasNextPage
+                        }
+                    }
+                }
+            }
+        }
+    }
+    """
+    result = post_graphql(test_client, graphql_endpoint, query)
+    assert "errors" not in result
+    employers = get_nodes(result["data"]["employers"])
+    assert [
+        [job["id"] for job in get_nodes(employer["jobs"])] for employer in employers
+    ] == [[1], [3]]
+    # The truncated lists tell so.
+    assert all(employer["jobs"]["pageInfo"]["hasNextPage"] for employer in employers)
+
+
+@pytest.mark.api
+@pytest.mark.query
+@pytest.mark.auth
+def test_first_applications_of_each_user(test_client, graphql_endpoint, admin_header):
+    query = f"""
+    query {{
+        users {{
+            edges {{
+                node {{
+                    id
+                    first: applications(first: 1) {{
+                        edges {{
+                            node {{
+                                id
+                            }}
+                        }}
+                    }}
+                    rest: applications(after: "{encode_cursor(1)}") {{
+                        edges {{
+                            node {{
+                                id
+                            }}
+                        }}
+                    }}
+                }}
+            }}
+        }}
+    }}
+    """
+    result = post_graphql(test_client, graphql_endpoint, query, headers=admin_header)
+    assert "errors" not in result
+    for user in get_nodes(result["data"]["users"]):
+        application_ids = get_application_ids_by_user(user["id"])
+        assert [app["id"] for app in get_nodes(user["first"])] == application_ids[:1]
+        assert [app["id"] for app in get_nodes(user["rest"])] == [
+            id for id in application_ids if id > 1
+        ]
+
+
+@pytest.mark.api
+@pytest.mark.query
+@pytest.mark.auth
+def test_first_applications_of_each_job(
+    test_client, graphql_endpoint, admin_header, user_header
+):
+    query = """
+    query {
+        jobs {
+            edges {
+                node {
+                    applications(first: 0) {
+                        edges {
+                            node {
+                                id
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+    """
+    for header in [admin_header, user_header]:
+        result = post_graphql(test_client, graphql_endpoint, query, headers=header)
+        assert "errors" not in result
+        for job in get_nodes(result["data"]["jobs"]):
+            assert get_nodes(job["applications"]) == []
+
+
+@pytest.mark.api
+@pytest.mark.query
+@pytest.mark.parametrize(
+    "arguments, message",
+    [
+        ("first: -1", INVALID_PAGE_SIZE),
+        ('after: "1"', INVALID_CURSOR),
+    ],
+)
+def test_invalid_nested_page(test_client, graphql_endpoint, arguments, message):
+    query = f"""
+    query {{
+        employer(id: 1) {{
+            jobs({arguments}) {{
+                edges {{
+                    node {{
+                        id
+                    }}
+                }}
+            }}
+        }}
+    }}
+    """
+    result = post_graphql(test_client, graphql_endpoint, query)
+    assert result["errors"][0]["message"] == message
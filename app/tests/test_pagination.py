@@ -0,0 +1,137 @@
+import pytest
+from app.db.data import APPLICATIONS_DATA, JOBS_DATA
+from app.db.models import Job as Job_sql
+from app.db.statements import select_page
+from app.errors.error_messages import FIRST_AND_LAST, INVALID_CURSOR, INVALID_PAGE_SIZE
+from app.gql.pagination import encode_cursor
+from app.settings.config import MAX_PAGE_SIZE
+from .utils import post_graphql, get_nodes, get_test_first_non_admin_id
+
+JOBS_PAGE_QUERY = """
+    query {{
+        jobs({arguments}) {{
+            edges {{
+                cursor
+                node {{
+                    id
+                }}
+            }}
+            pageInfo {{
+                hasNextPage
+                hasPreviousPage
+                startCursor
+                endCursor
+            }}
+        }}
+    }}
+"""
+
+
+def get_jobs_page(test_client, graphql_endpoint, arguments: str) -> dict:
+    query = JOBS_PAGE_QUERY.format(arguments=arguments)
+    result = post_graphql(test_client, graphql_endpoint, query)
+    assert "errors" not in result
+    return result["data"]["jobs"]
+
+
+@pytest.mark.api
+@pytest.mark.query
+def test_paginate_forwards(test_client, graphql_endpoint):
+    job_ids = []
+    arguments = "first: 3"
+    while True:
+        page = get_jobs_page(test_client, graphql_endpoint, arguments)
+        job_ids += [node["id"] for node in get_nodes(page)]
+        assert page["pageInfo"]["hasPreviousPage"] == (arguments != "first: 3")
+        if not page["pageInfo"]["hasNextPage"]:
+            break
+        arguments = f'first: 3, after: "{page["pageInfo"]["endCursor"]}"'
+
+    assert job_ids == list(range(1, len(JOBS_DATA) + 1))
+
+
+@pytest.mark.api
+@pytest.mark.query
+def test_paginate_backwards(test_client, graphql_endpoint):
+    page = get_jobs_page(test_client, graphql_endpoint, "last: 2")
+    assert [node["id"] for node in get_nodes(page)] == [
+        len(JOBS_DATA) - 1,
+        len(JOBS_DATA),
+    ]
+    assert page["pageInfo"]["hasPreviousPage"] == (len(JOBS_DATA) > 2)
+    assert not page["pageInfo"]["hasNextPage"]
+    assert page["pageInfo"]["startCursor"] == page["edges"][0]["cursor"]
+
+    before = encode_cursor(len(JOBS_DATA) - 1)
+    page = get_jobs_page(test_client, graphql_endpoint, f'last: 1, before: "{before}"')
+    assert [node["id"] for node in get_nodes(page)] == [len(JOBS_DATA) - 2]
+    assert page["pageInfo"]["hasNextPage"]
+
+
+@pytest.mark.api
+@pytest.mark.query
+def test_empty_page(test_client, graphql_endpoint):
+    after = encode_cursor(len(JOBS_DATA))
+    page = get_jobs_page(test_client, graphql_endpoint, f'after: "{after}"')
+    assert page["edges"] == []
+    assert not page["pageInfo"]["hasNextPage"]
+    assert page["pageInfo"]["startCursor"] is None
+    assert page["pageInfo"]["endCursor"] is None
+
+
+@pytest.mark.api
+@pytest.mark.query
+@pytest.mark.parametrize(
+    "arguments,message",
+    [
+        ('after: "not a cursor"', INVALID_CURSOR),
+        ("first: 1, last: 1", FIRST_AND_LAST),
+        ("first: -1", INVALID_PAGE_SIZE),
+        (f"first: {MAX_PAGE_SIZE + 1}", INVALID_PAGE_SIZE),
+    ],
+)
+def test_invalid_page_arguments(test_client, graphql_endpoint, arguments, message):
+    query = JOBS_PAGE_QUERY.format(arguments=arguments)
+    result = post_graphql(test_client, graphql_endpoint, query)
+    assert result["errors"][0]["message"] == message
+
+
+@pytest.mark.api
+@pytest.mark.query
+@pytest.mark.auth
+def test_paginate_user_applications(test_client, graphql_endpoint, user_header):
+    query = """
+    query {
+        applications(first: 1) {
+            edges {
+                node {
+                    userId
+                }
+            }
+            pageInfo {
+                hasNextPage
+            }
+        }
+    }
+    """
+    result = post_graphql(test_client, graphql_endpoint, query, headers=user_header)
+    applications = result["data"]["applications"]
+    user_id = get_test_first_non_admin_id()
+    assert [node["userId"] for node in get_nodes(applications)] == [user_id]
+
+    user_application_count = sum(
+        application["user_id"] == user_id for application in APPLICATIONS_DATA
+    )
+    assert applications["pageInfo"]["hasNextPage"] == (user_application_count > 1)
+
+
+@pytest.mark.sql
+def test_pages_are_ordered_and_limited_by_id():
+    sql = str(select_page(Job_sql, after=True))
+    assert "jobs.id > :after" in sql
+    assert "ORDER BY jobs.id ASC" in sql
+    assert "LIMIT :limit" in sql
+
+    sql = str(select_page(Job_sql, before=True, backwards=True))
+    assert "jobs.id < :before" in sql
+    assert "ORDER BY jobs.id DESC" in sql
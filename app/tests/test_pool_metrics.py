@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.db.pool import PoolMetrics, InstrumentedAsyncQueuePool, get_pool_status
+
+
+@pytest.mark.ops
+def test_wait_time_histogram_is_cumulative():
+    metrics = PoolMetrics(buckets=[0.1, 1])
+    metrics.observe_checkout(0.05)
+    metrics.observe_checkout(0.5)
+    metrics.observe_checkout(2, timed_out=True)
+
+    assert metrics.checkouts == 2
+    assert metrics.checkout_timeouts == 1
+    assert metrics.wait_time_histogram() == {"0.1": 1, "1": 2, "+Inf": 3}
+
+
+@pytest.mark.ops
+def test_pool_status_counts_checkouts_and_timeouts(db_url, portal):
+    engine = create_async_engine(
+        db_url,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+
+    async def exhaust_pool():
+        async with engine.connect():
+            checked_out_status = get_pool_status(engine.pool)
+            with pytest.raises(PoolTimeoutError):
+                await engine.connect()
+        return checked_out_status, get_pool_status(engine.pool)
+
+    try:
+        checked_out_status, status = portal.call(exhaust_pool)
+    finally:
+        portal.call(engine.dispose)
+
+    assert checked_out_status["checked_out"] == 1
+    assert checked_out_status["overflow"] == 0
+    assert checked_out_status["checkouts"] == 1
+
+    assert status["checked_out"] == 0
+    assert status["checkouts"] == 1
+    assert status["checkout_timeouts"] == 1
+    assert status["wait_time_seconds_histogram"]["+Inf"] == 2
+    # Only the timed out checkout waited for a connection, opening the
+    # first one isn't counted as waiting.
+    assert status["wait_time_seconds_histogram"]["0.001"] == 1
+    assert status["wait_time_seconds_sum"] >= 0.1
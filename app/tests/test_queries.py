@@ -2,6 +2,7 @@ import pytest
 from app.db.data import JOBS_DATA, EMPLOYERS_DATA, USERS_DATA, APPLICATIONS_DATA
 from .utils import (
     post_graphql,
+    get_nodes,
     get_test_first_non_admin_id,
     get_test_first_non_admin_email,
     get_job_ids_for_user,
@@ -17,12 +18,16 @@ def test_get_all_jobs(test_client, graphql_endpoint):
     query = """
         query {
             jobs {
-                title
+                edges {
+                    node {
+                        title
+                    }
+                }
             }
         }
     """
     result = post_graphql(test_client, graphql_endpoint, query)
-    jobs = result["data"]["jobs"]
+    jobs = get_nodes(result["data"]["jobs"])
     assert len(jobs) == len(JOBS_DATA)
     assert sorted([job["title"] for job in jobs]) == sorted(
         job["title"] for job in JOBS_DATA
@@ -47,9 +52,13 @@ def test_get_job_by_id_all_roles(
                     name
                 }}
                 applications {{
-                    id
-                    jobId
-                    userId
+                    edges {{
+                        node {{
+                            id
+                            jobId
+                            userId
+                        }}
+                    }}
                 }}
             }}
         }}
@@ -58,19 +67,20 @@ def test_get_job_by_id_all_roles(
         result = post_graphql(test_client, graphql_endpoint, query, headers="")
         job = result["data"]["job"]
         assert job["title"] == JOBS_DATA[job_id - 1]["title"]
-        assert job["applications"] == []
+        assert get_nodes(job["applications"]) == []
         assert EMPLOYERS_DATA[job["employerId"] - 1]["name"] == job["employer"]["name"]
 
         # User.
         result = post_graphql(test_client, graphql_endpoint, query, headers=user_header)
         job = result["data"]["job"]
         assert job["title"] == JOBS_DATA[job_id - 1]["title"]
+        applications = get_nodes(job["applications"])
         if job_id in user_job_ids:
-            assert len(job["applications"]) == 1
-            assert job["applications"][0]["userId"] == 2
-            assert job["applications"][0]["jobId"] == job_id
+            assert len(applications) == 1
+            assert applications[0]["userId"] == 2
+            assert applications[0]["jobId"] == job_id
         else:
-            assert len(job["applications"]) == 0
+            assert len(applications) == 0
 
         # Admin.
         result = post_graphql(
@@ -80,8 +90,9 @@ def test_get_job_by_id_all_roles(
         assert job["title"] == JOBS_DATA[job_id - 1]["title"]
 
         application_ids = get_application_ids_for_job(job_id)
-        assert len(job["applications"]) == len(application_ids)
-        retrieved_app_ids = [x["id"] for x in job["applications"]]
+        applications = get_nodes(job["applications"])
+        assert len(applications) == len(application_ids)
+        retrieved_app_ids = [x["id"] for x in applications]
         assert sorted(application_ids) == sorted(
             retrieved_app_ids
         ), f"Job_id: {job_id} expected {sorted(application_ids)}, got {sorted(retrieved_app_ids)}"
@@ -95,25 +106,33 @@ def test_get_all_jobs_admin(test_client, graphql_endpoint, admin_header):
     query = """
         query {
             jobs {
-                id
-                title
-                employer {
-                    name
-                }
-                applications {
-                    jobId
-                    userId
+                edges {
+                    node {
+                        id
+                        title
+                        employer {
+                            name
+                        }
+                        applications {
+                            edges {
+                                node {
+                                    jobId
+                                    userId
+                                }
+                            }
+                        }
+                    }
                 }
             }
         }
     """
     result = post_graphql(test_client, graphql_endpoint, query, headers=admin_header)
-    jobs = result["data"]["jobs"]
+    jobs = get_nodes(result["data"]["jobs"])
     assert len(jobs) == len(JOBS_DATA)
 
     unique_apps = set()
     for job in jobs:
-        for application in job["applications"]:
+        for application in get_nodes(job["applications"]):
             assert {
                 "user_id": application["userId"],
                 "job_id": application["jobId"],
@@ -131,26 +150,33 @@ def test_get_all_jobs_user(test_client, graphql_endpoint, user_header):
     query = """
         query {
             jobs {
-                id
-                title
-                employer {
-                    name
-                }
-                applications {
-                    jobId
-                    userId
+                edges {
+                    node {
+                        id
+                        title
+                        employer {
+                            name
+                        }
+                        applications {
+                            edges {
+                                node {
+                                    jobId
+                                    userId
+                                }
+                            }
+                        }
+                    }
                 }
             }
         }
     """
     result = post_graphql(test_client, graphql_endpoint, query, headers=user_header)
-    jobs = result["data"]["jobs"]
+    jobs = get_nodes(result["data"]["jobs"])
     assert len(jobs) == len(JOBS_DATA)
 
     for job in jobs:
-        if len(job["applications"]) > 0:
-            for application in job["applications"]:
-                assert application["userId"] == get_test_first_non_admin_id()
+        for application in get_nodes(job["applications"]):
+            assert application["userId"] == get_test_first_non_admin_id()
 
 
 @pytest.mark.api
@@ -161,24 +187,32 @@ def test_get_all_jobs_unauth(test_client, graphql_endpoint):
     query = """
         query {
             jobs {
-                id
-                title
-                employer {
-                    name
-                }
-                applications {
-                    jobId
-                    userId
+                edges {
+                    node {
+                        id
+                        title
+                        employer {
+                            name
+                        }
+                        applications {
+                            edges {
+                                node {
+                                    jobId
+                                    userId
+                                }
+                            }
+                        }
+                    }
                 }
             }
         }
     """
     result = post_graphql(test_client, graphql_endpoint, query)
-    jobs = result["data"]["jobs"]
+    jobs = get_nodes(result["data"]["jobs"])
     assert len(jobs) == len(JOBS_DATA)
 
     for job in jobs:
-        assert job["applications"] is None or len(job["applications"]) == 0
+        assert get_nodes(job["applications"]) == []
 
 
 @pytest.mark.api
@@ -187,12 +221,16 @@ def test_get_all_employers(test_client, graphql_endpoint):
     query = """
     query {
         employers {
-            name
+            edges {
+                node {
+                    name
+                }
+            }
         }
     }
     """
     result = post_graphql(test_client, graphql_endpoint, query)
-    employers = result["data"]["employers"]
+    employers = get_nodes(result["data"]["employers"])
     assert len(employers) == len(EMPLOYERS_DATA)
     assert sorted([employer["name"] for employer in employers]) == sorted(
         employer["name"] for employer in EMPLOYERS_DATA
@@ -243,7 +281,11 @@ def test_get_jobs_from_employer(test_client, graphql_endpoint):
         employer(id: 1) {
             name
             jobs {
-            title
+                edges {
+                    node {
+                        title
+                    }
+                }
             }
         }
     }
@@ -251,8 +293,9 @@ def test_get_jobs_from_employer(test_client, graphql_endpoint):
     result = post_graphql(test_client, graphql_endpoint, query)
     employer = result["data"]["employer"]
     assert employer["name"] == EMPLOYERS_DATA[0]["name"]
-    assert len(employer["jobs"]) == 2
-    assert sorted([job["title"] for job in employer["jobs"]]) == sorted(
+    jobs = get_nodes(employer["jobs"])
+    assert len(jobs) == 2
+    assert sorted([job["title"] for job in jobs]) == sorted(
         [job["title"] for job in JOBS_DATA[:2]]
     )
 
@@ -264,15 +307,19 @@ def test_get_all_users_as_admin(test_client, graphql_endpoint, admin_header):
     query = """
     query {
         users {
-            id
-            email
-            username
-            role
+            edges {
+                node {
+                    id
+                    email
+                    username
+                    role
+                }
+            }
         }
     }
     """
     result = post_graphql(test_client, graphql_endpoint, query, headers=admin_header)
-    users = result["data"]["users"]
+    users = get_nodes(result["data"]["users"])
     assert len(users) == len(USERS_DATA)
     assert sorted([user["username"] for user in users]) == sorted(
         user["username"] for user in USERS_DATA
@@ -286,15 +333,19 @@ def test_get_all_users_as_user(test_client, graphql_endpoint, user_header):
     query = """
     query {
         users {
-            id
-            email
-            username
-            role
+            edges {
+                node {
+                    id
+                    email
+                    username
+                    role
+                }
+            }
         }
     }
     """
     result = post_graphql(test_client, graphql_endpoint, query, headers=user_header)
-    users = result["data"]["users"]
+    users = get_nodes(result["data"]["users"])
     assert len(users) == 1
     assert users[0]["id"] == get_test_first_non_admin_id()
     assert users[0]["email"] == get_test_first_non_admin_email()
@@ -306,21 +357,25 @@ def test_get_all_applications_as_admin(test_client, graphql_endpoint, admin_head
     query = """
     query {
         applications {
-            jobId
-            job {
-                id
-                title
-            }
-            userId
-            user {
-                id
-                username
+            edges {
+                node {
+                    jobId
+                    job {
+                        id
+                        title
+                    }
+                    userId
+                    user {
+                        id
+                        username
+                    }
+                }
             }
         }
     }
     """
     result = post_graphql(test_client, graphql_endpoint, query, headers=admin_header)
-    applications = result["data"]["applications"]
+    applications = get_nodes(result["data"]["applications"])
     assert len(applications) == len(APPLICATIONS_DATA)
 
     # Testing correct relationship retrieval.
@@ -352,21 +407,25 @@ def test_get_all_applications_as_user(test_client, graphql_endpoint, user_header
     query = """
     query {
         applications {
-            jobId
-            job {
-                id
-                title
-            }
-            userId
-            user {
-                id
-                username
+            edges {
+                node {
+                    jobId
+                    job {
+                        id
+                        title
+                    }
+                    userId
+                    user {
+                        id
+                        username
+                    }
+                }
             }
         }
     }
     """
     result = post_graphql(test_client, graphql_endpoint, query, headers=user_header)
-    applications = result["data"]["applications"]
+    applications = get_nodes(result["data"]["applications"])
 
     # Get the authenticated user's ID.
     auth_user_id = get_test_first_non_admin_id()
@@ -389,27 +448,35 @@ def test_get_all_applications_for_user(test_client, graphql_endpoint, user_heade
     query = """
     query {
         users {
-            id
-            username
-            email
-            applications {
-                id
-                userId
-                jobId
+            edges {
+                node {
+                    id
+                    username
+                    email
+                    applications {
+                        edges {
+                            node {
+                                id
+                                userId
+                                jobId
+                            }
+                        }
+                    }
+                }
             }
         }
     }
     """
     result = post_graphql(test_client, graphql_endpoint, query, headers=user_header)
 
-    users = result["data"]["users"]
+    users = get_nodes(result["data"]["users"])
     assert len(users) == 1
 
     user_id = get_test_first_non_admin_id()
     user = users[0]
     assert user["id"] == user_id
 
-    applications = user["applications"]
+    applications = get_nodes(user["applications"])
     retrieved_app_ids = [app["id"] for app in applications]
     expected_app_ids = get_application_ids_for_user(user_id)
 
@@ -425,20 +492,28 @@ def test_get_all_applications_for_admin(test_client, graphql_endpoint, admin_hea
     query = """
     query {
         users {
-            id
-            username
-            email
-            applications {
-                id
-                userId
-                jobId
+            edges {
+                node {
+                    id
+                    username
+                    email
+                    applications {
+                        edges {
+                            node {
+                                id
+                                userId
+                                jobId
+                            }
+                        }
+                    }
+                }
             }
         }
     }
     """
     result = post_graphql(test_client, graphql_endpoint, query, headers=admin_header)
 
-    users = result["data"]["users"]
+    users = get_nodes(result["data"]["users"])
     assert len(users) == len(USERS_DATA)
 
     for user_id in range(1, len(users) + 1):
@@ -450,7 +525,7 @@ def test_get_all_applications_for_admin(test_client, graphql_endpoint, admin_hea
 
         assert found, f"User with id {user_id} not found."
 
-        applications = user["applications"]
+        applications = get_nodes(user["applications"])
         retrieved_app_ids = [app["id"] for app in applications]
         expected_app_ids = get_application_ids_for_user(user_id)
 
@@ -465,11 +540,23 @@ def test_query_max_depth(test_client, graphql_endpoint, user_header):
     query = """
     query {
         employers {
-            jobs {
-                employer {
+            edges {
+                node {
                     jobs {
-                        employer {
-                            id
+                        edges {
+                            node {
+                                employer {
+                                    jobs {
+                                        edges {
+                                            node {
+                                                employer {
+                                                    id
+                                                }
+                                            }
+                                        }
+                                    }
+                                }
+                            }
                         }
                     }
                 }
@@ -483,12 +570,28 @@ def test_query_max_depth(test_client, graphql_endpoint, user_header):
     query = """
     query {
         employers {
-            jobs {
-                employer {
+            edges {
+                node {
                     jobs {
-                        employer {
-                            jobs {
-                                id
+                        edges {
+                            node {
+                                employer {
+                                    jobs {
+                                        edges {
+                                            node {
+                                                employer {
+                                                    jobs {
+                                                        edges {
+                                                            node {
+                                                                id
+                                                            }
+                                                        }
+                                                    }
+                                                }
+                                            }
+                                        }
+                                    }
+                                }
                             }
                         }
                     }
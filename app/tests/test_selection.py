@@ -0,0 +1,107 @@
+import pytest
+from app.db.data import JOBS_DATA
+from app.db.models import Job as Job_sql
+from app.db.repositories.job_repository import JobRepository
+from app.sql_to_gql import job_to_gql
+from .utils import post_graphql, get_nodes
+
+
+@pytest.mark.sql
+@pytest.mark.query
+def test_only_selected_columns_are_loaded(
+    test_client,
+    graphql_endpoint,
+    executed_statements,
+):
+    query = """
+        query {
+            jobs {
+                edges {
+                    node {
+                        id
+                        title
+                    }
+                }
+            }
+        }
+    """
+    result = post_graphql(test_client, graphql_endpoint, query)
+    assert "errors" not in result
+    assert sorted(job["title"] for job in get_nodes(result["data"]["jobs"])) == sorted(
+        job["title"] for job in JOBS_DATA
+    )
+
+    [statement] = [s for s in executed_statements if "FROM jobs" in s]
+    assert "jobs.title" in statement
+    assert "jobs.employer_id" in statement
+    assert "jobs.description" not in statement
+
+
+@pytest.mark.sql
+@pytest.mark.query
+def test_fragment_fields_are_loaded(
+    test_client,
+    graphql_endpoint,
+    executed_statements,
+):
+    query = """
+        query {
+            employer(id: 1) {
+                ... on EmployerGql {
+                    name
+                }
+                jobs {
+                    edges {
+                        node {
+                            ...JobFields
+                        }
+                    }
+                }
+            }
+        }
+
+        fragment JobFields on JobGql {
+            description
+        }
+    """
+    result = post_graphql(test_client, graphql_endpoint, query)
+    assert "errors" not in result
+    assert result["data"]["employer"]["name"] is not None
+    jobs = get_nodes(result["data"]["employer"]["jobs"])
+    assert all(job["description"] for job in jobs)
+
+    [employer_statement] = [s for s in executed_statements if "FROM employers" in s]
+    assert "employers.name" in employer_statement
+    assert "employers.industry" not in employer_statement
+
+    [jobs_statement] = [s for s in executed_statements if "FROM jobs" in s]
+    assert "jobs.description" in jobs_statement
+    assert "jobs.title" not in jobs_statement
+
+
+@pytest.mark.sql
+def test_partially_loaded_objects_are_completed(db_session, portal):
+    async def load_jobs():
+        db_session.expunge_all()
+        partial_job = await JobRepository.get_job_by_id(
+            db_session, 1, columns=("employer_id", "id", "title")
+        )
+        assert "description" not in partial_job.__dict__
+
+        full_job = await JobRepository.get_job_by_id(db_session, 1)
+        assert full_job is partial_job
+        return full_job.description
+
+    assert portal.call(load_jobs) == JOBS_DATA[0]["description"]
+
+
+@pytest.mark.sql
+def test_unloaded_columns_are_not_converted(db_session, portal):
+    async def load_job():
+        db_session.expunge_all()
+        jobs = await Job_sql.get_where_equal(db_session, ("id", "title"), id=1)
+        return job_to_gql(jobs[0])
+
+    job = portal.call(load_job)
+    assert job.title == JOBS_DATA[0]["title"]
+    assert job.description is None
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import event
+from app import main
+from app.db.data import EMPLOYERS_DATA, USERS_DATA
+from app.db.database import prepare_database
+from app.db.migrations import MIGRATIONS
+from app.db.models import Employer as Employer_sql, User as User_sql
+from app.db.seed import seed_database
+
+DDL_KEYWORDS = ("CREATE", "ALTER", "DROP")
+
+
+async def count_rows(engine, model) -> int:
+    async with engine.connect() as connection:
+        result = await connection.execute(model.__table__.select())
+        return len(result.all())
+
+
+@pytest.mark.ops
+def test_prepare_up_to_date_database_runs_no_ddl(migrations_engine, portal):
+    applied = portal.call(prepare_database, migrations_engine)
+    assert applied == [migration.VERSION for migration in MIGRATIONS]
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement.strip().upper())
+
+    event.listen(
+        migrations_engine.sync_engine, "before_cursor_execute", before_cursor_execute
+    )
+    assert portal.call(prepare_database, migrations_engine) == []
+    assert statements
+    assert not [s for s in statements if s.startswith(DDL_KEYWORDS)]
+
+
+@pytest.mark.ops
+def test_prepare_database_does_not_seed(migrations_engine, portal):
+    portal.call(prepare_database, migrations_engine)
+    assert portal.call(count_rows, migrations_engine, User_sql) == 0
+
+
+@pytest.mark.ops
+def test_seed_database_once(migrations_engine, portal):
+    assert portal.call(seed_database, migrations_engine)
+    assert not portal.call(seed_database, migrations_engine)
+    assert portal.call(count_rows, migrations_engine, User_sql) == len(USERS_DATA)
+    assert portal.call(count_rows, migrations_engine, Employer_sql) == len(
+        EMPLOYERS_DATA
+    )
+
+    # Reset reloads the sample data into fresh tables.
+    assert portal.call(seed_database, migrations_engine, True)
+    assert portal.call(count_rows, migrations_engine, User_sql) == len(USERS_DATA)
+
+
+@pytest.mark.ops
+def test_startup_time_is_reported(test_client, admin_header, monkeypatch, portal):
+    async def prepare_up_to_date_database():
+        return []
+
+    async def run_lifespan():
+        async with main.lifespan(main.app):
+            pass
+
+    monkeypatch.setattr(main, "prepare_database", prepare_up_to_date_database)
+    portal.call(run_lifespan)
+
+    metrics = test_client.get("/metrics/startup", headers=admin_header).json()
+    assert metrics["applied_migrations"] == []
+    assert metrics["database_seconds"] >= 0
@@ -0,0 +1,74 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+from app.db.data import APPLICATIONS_DATA, JOBS_DATA
+from app.db.models import Job as Job_sql, Application as Application_sql
+from app.db.statements import (
+    StatementCache,
+    CompiledCacheStats,
+    select_where_in,
+    select_where_equal,
+    select_where_tuple_in,
+)
+
+
+@pytest.mark.sql
+def test_statements_are_built_once():
+    assert select_where_in(Job_sql, "id") is select_where_in(Job_sql, "id")
+    assert select_where_in(Job_sql, "id") is not select_where_in(Job_sql, "employer_id")
+    assert select_where_equal(Job_sql, "id") is not select_where_in(Job_sql, "id")
+
+
+@pytest.mark.sql
+def test_statement_cache_hit_rate():
+    statement_cache = StatementCache()
+    statement_cache.get("key", lambda: "statement")
+    statement_cache.get("key", lambda: "statement")
+    statement_cache.get("other key", lambda: "statement")
+
+    stats = statement_cache.stats()
+    assert stats["statements"] == 2
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+@pytest.mark.sql
+def test_batches_of_any_size_reuse_compiled_sql(db_session, portal):
+    compiled_cache_stats = CompiledCacheStats()
+    compiled_cache_stats.listen(db_session.bind.sync_engine)
+
+    async def load_batches():
+        for job_ids in [[1], [1, 2], [1, 2, 3]]:
+            jobs = await Job_sql.get_where_in(db_session, "id", job_ids)
+            assert len(jobs) == len(job_ids)
+
+    portal.call(load_batches)
+    assert compiled_cache_stats.hits == 2
+    assert compiled_cache_stats.misses <= 1
+
+
+@pytest.mark.sql
+def test_composite_key_lookup(db_session, portal):
+    job_user_ids = [
+        (application["job_id"], application["user_id"])
+        for application in APPLICATIONS_DATA
+    ]
+    missing_key = (len(JOBS_DATA) + 1, 1)
+
+    async def lookup(keys):
+        return await Application_sql.get_where_tuple_in(
+            db_session, ("job_id", "user_id"), keys
+        )
+
+    applications = portal.call(lookup, job_user_ids[:2] + [missing_key])
+    assert sorted((app.job_id, app.user_id) for app in applications) == sorted(
+        job_user_ids[:2]
+    )
+    assert portal.call(lookup, []) == []
+
+
+@pytest.mark.sql
+def test_composite_key_lookup_sql_is_stable():
+    statement = select_where_tuple_in(Application_sql, "job_id", "user_id")
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "unnest" in sql
+    assert " OR " not in sql
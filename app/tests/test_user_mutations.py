@@ -9,8 +9,8 @@ from app.errors.error_messages import (
 from app.db.repositories.user_repository import UserRepository
 
 
-def assert_no_new_user_added(db_session):
-    users = UserRepository.get_all_users(db_session, gql=False)
+def assert_no_new_user_added(portal, db_session):
+    users = portal.call(UserRepository.get_all_users, db_session, False)
     assert len(users) == len(USERS_DATA)
 
 
@@ -76,7 +76,7 @@ def test_add_new_user_unauth_invalid_role(test_client, graphql_endpoint):
 @pytest.mark.api
 @pytest.mark.mutation
 @pytest.mark.auth
-def test_add_existing_user_unauth(test_client, graphql_endpoint, db_session):
+def test_add_existing_user_unauth(test_client, graphql_endpoint, db_session, portal):
     username = "New User"
     email = USERS_DATA[0]["email"]
     password = "newpass123"
@@ -100,13 +100,13 @@ def test_add_existing_user_unauth(test_client, graphql_endpoint, db_session):
     assert "errors" in result
     assert result["errors"][0]["message"] == USER_ALREADY_EXISTS
 
-    assert_no_new_user_added(db_session)
+    assert_no_new_user_added(portal, db_session)
 
 
 @pytest.mark.api
 @pytest.mark.mutation
 @pytest.mark.auth
-def test_add_new_admin_unauth(test_client, graphql_endpoint, db_session):
+def test_add_new_admin_unauth(test_client, graphql_endpoint, db_session, portal):
     username = "New User"
     email = "new_email@example.com"
     password = "newpass123"
@@ -130,7 +130,7 @@ def test_add_new_admin_unauth(test_client, graphql_endpoint, db_session):
     assert "errors" in result
     assert result["errors"][0]["message"] == INSUFFICIENT_PRIVILEGES
 
-    assert_no_new_user_added(db_session)
+    assert_no_new_user_added(portal, db_session)
 
 
 @pytest.mark.api
@@ -141,6 +141,7 @@ def test_add_new_admin_bad_token(
     graphql_endpoint,
     invalid_token_header,
     db_session,
+    portal,
 ):
     username = "New User"
     email = "new_email@example.com"
@@ -169,7 +170,7 @@ def test_add_new_admin_bad_token(
     )
     assert "errors" in result
 
-    assert_no_new_user_added(db_session)
+    assert_no_new_user_added(portal, db_session)
 
 
 @pytest.mark.api
@@ -180,6 +181,7 @@ def test_add_new_admin_auth_as_user(
     graphql_endpoint,
     user_header,
     db_session,
+    portal,
 ):
     username = "New User"
     email = "new_email@example.com"
@@ -208,7 +210,7 @@ def test_add_new_admin_auth_as_user(
     )
     assert "errors" in result
     assert result["errors"][0]["message"] == INSUFFICIENT_PRIVILEGES
-    assert_no_new_user_added(db_session)
+    assert_no_new_user_added(portal, db_session)
 
 
 @pytest.mark.api
@@ -250,3 +252,34 @@ def test_add_new_admin_auth_as_admin(
     assert user["email"] == email
     assert user["role"] == role
     assert user["id"] == len(USERS_DATA) + 1
+
+
+@pytest.mark.api
+@pytest.mark.mutation
+def test_add_user_in_one_statement(
+    test_client, graphql_endpoint, executed_statements, db_session, portal
+):
+    for email in ("one_statement@example.com", USERS_DATA[0]["email"]):
+        executed_statements.clear()
+        query = f"""
+        mutation {{
+            addUser(
+                username: "New User",
+                email: "{email}",
+                password: "newpass123",
+                role: "user"
+            ) {{
+                id
+            }}
+        }}
+        """
+        result = post_graphql(test_client, graphql_endpoint, query)
+
+        # No lookup of the email before the insert.
+        statements = [s for s in executed_statements if "users" in s]
+        assert len(statements) == 1
+        assert "ON CONFLICT" in statements[0]
+
+    assert result["errors"][0]["message"] == USER_ALREADY_EXISTS
+    users = portal.call(UserRepository.get_all_users, db_session, False)
+    assert len(users) == len(USERS_DATA) + 1
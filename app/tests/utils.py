@@ -1,14 +1,7 @@
 from starlette.testclient import TestClient
-from sqlalchemy.orm import Session
-from app.db.data import EMPLOYERS_DATA, JOBS_DATA, APPLICATIONS_DATA, USERS_DATA
-from app.db.models import (
-    Employer as Employer_sql,
-    Job as Job_sql,
-    Application as Application_sql,
-    User as User_sql,
-)
-from copy import deepcopy
-from app.auth.auth_utils import hash_password, generate_jwt_token
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.data import JOBS_DATA, APPLICATIONS_DATA, USERS_DATA
+from app.auth.auth_utils import generate_jwt_token
 from typing import Tuple, List
 from enum import Enum
 
@@ -28,26 +21,23 @@ def post_graphql(
     return response.json()
 
 
-def load_test_tables(session: Session):
-    session.add_all([Employer_sql(**x) for x in EMPLOYERS_DATA])
-    session.flush()
-    session.add_all([Job_sql(**x) for x in JOBS_DATA])
-    session.flush()
+def get_nodes(connection: dict) -> List[dict]:
+    return [edge["node"] for edge in connection["edges"]]
 
-    users = []
-    for user in USERS_DATA:
-        # Deep copy needed since this is run once per test and we don't
-        # want to modify the global USERS_DATA.
-        user_copy = deepcopy(user)
-        user_copy["password_hash"] = hash_password(user_copy["password"])
-        del user_copy["password"]
-        users.append(User_sql(**user_copy))
 
-    session.add_all(users)
-    session.flush()
+class SessionmakerSpy:
+    """
+    Stands in for a sessionmaker, always returning the given session and
+    counting how many times it was asked for one.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.calls = 0
 
-    session.add_all([Application_sql(**x) for x in APPLICATIONS_DATA])
-    session.flush()
+    def __call__(self) -> AsyncSession:
+        self.calls += 1
+        return self.session
 
 
 def get_test_admin_email() -> str:
@@ -107,22 +97,25 @@ def get_application_ids_for_user(user_id: int) -> List[int]:
     return ids
 
 
+def generate_test_jwt_token(user_idx: int) -> str:
+    user = USERS_DATA[user_idx]
+    return generate_jwt_token(user_idx + 1, user["email"], user["role"])
+
+
 def generate_test_jwt_admin_token() -> str:
-    for user in USERS_DATA:
+    for idx, user in enumerate(USERS_DATA):
         if user["role"] == "admin":
-            return generate_jwt_token(user["email"])
+            return generate_test_jwt_token(idx)
     raise Exception("No admin user found in test data.")
 
 
 def generate_test_jwt_user_token() -> str:
-    for user in USERS_DATA:
-        if user["role"] == "user":
-            return generate_jwt_token(user["email"])
-    raise Exception("No admin user found in test data.")
+    idx, _ = get_test_first_non_admin_user()
+    return generate_test_jwt_token(idx)
 
 
 class BaseQueries(str, Enum):
-    APPLICATIONS = """query { applications { id } }"""
+    APPLICATIONS = """query { applications { edges { node { id } } } }"""
     CREATE_APPLICATION = """
         mutation {
             applyToJob(jobId: 2)
@@ -167,14 +160,18 @@ class BaseQueries(str, Enum):
     """
     DELETE_JOB = """mutation {deleteJob(jobId: 1)}"""
     QUERY_JOB_BY_ID = """query {job(id: 1) {title}}"""
-    QUERY_ALL_JOBS = """query {jobs {title}}"""
+    QUERY_ALL_JOBS = """query {jobs {edges {node {title}}}}"""
     QUERY_ALL_USERS = """
     query {
         users {
-            id
-            email
-            username
-            role
+            edges {
+                node {
+                    id
+                    email
+                    username
+                    role
+                }
+            }
         }
     }
     """
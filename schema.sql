@@ -1,16 +1,21 @@
 Table employers {
   id integer [pk]
   name varchar(40) [not null]
-  contact_email varchar(254) [not null]
+  contact_email varchar(254) [not null, unique]
   industry varchar(254) [not null]
 }
 
 Table users {
   id integer [pk]
   username varchar(30) [not null]
-  email varchar(254) [not null]
+  email varchar(254) [not null, unique]
   password_hash varchar(128) [not null]
   role varchar [not null]
+  token_version integer [not null, default: 0]
+
+  indexes {
+    (id, token_version) [name: 'ix_users_revoked_tokens', note: 'WHERE token_version > 0']
+  }
 }
 
 Table jobs {
@@ -18,10 +23,31 @@ Table jobs {
   title varchar(150) [not null]
   description varchar(1000) [not null]
   employer_id integer [not null, ref: > employers.id]
+
+  indexes {
+    (employer_id, id)
+  }
 }
 
 Table applications {
   id integer [pk]
   user_id integer [not null, ref: > users.id]
   job_id integer [not null, ref: > jobs.id]
-}
\ No newline at end of file
+
+  indexes {
+    (user_id, job_id) [unique]
+    (user_id, id)
+    (job_id, id)
+  }
+}
+Table refresh_tokens {
+  id integer [pk]
+  user_id integer [not null, ref: > users.id]
+  token_hash varchar(64) [not null, unique, note: 'SHA-256 of the token']
+  token_version integer [not null]
+  expires_at timestamptz [not null]
+
+  indexes {
+    user_id
+  }
+}